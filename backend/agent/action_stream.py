@@ -0,0 +1,161 @@
+"""
+Incremental parsing of microsoft_actions_tool input while the model is still generating it.
+
+The tool input arrives as JSON deltas of `{"actions": "<JSON array as a string>"}`. The
+parser decodes the `actions` string value as it streams in and returns each action object
+as soon as its closing brace arrives, so edits can be sent before the tool call completes.
+An `actions` value sent as a bare JSON array (instead of a string) is handled too.
+"""
+
+import json
+
+_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+
+class _ArrayObjectSplitter:
+    """Yields each top-level object of a JSON array as soon as it is complete."""
+
+    def __init__(self):
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.closed = False
+        self.buffer: list[str] = []
+
+    def feed(self, text: str) -> list[dict]:
+        objects = []
+        for char in text:
+            if self.closed:
+                break
+            if self.depth >= 2:
+                self.buffer.append(char)
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif char == "\\":
+                    self.escape = True
+                elif char == '"':
+                    self.in_string = False
+            elif char == '"':
+                self.in_string = True
+            elif char in "[{":
+                self.depth += 1
+                if self.depth == 2:
+                    self.buffer = [char]
+            elif char in "]}":
+                self.depth -= 1
+                if not self.depth:
+                    self.closed = True
+                elif self.depth == 1 and char == "}":
+                    obj = json.loads("".join(self.buffer))
+                    if isinstance(obj, dict):
+                        objects.append(obj)
+                    self.buffer = []
+        return objects
+
+
+class IncrementalActionParser:
+    """Feed raw tool-input deltas; get back the action objects completed by each delta."""
+
+    def __init__(self, field: str = "actions"):
+        self.field = field
+        self.splitter = _ArrayObjectSplitter()
+        self.count = 0
+        # Outer object scanner
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._key: list[str] = []
+        self._last_key: str | None = None
+        self._expect_value = False
+        # "string" while decoding the field's string value, "raw" for a bare array value, "done" after
+        self._mode: str | None = None
+        self._unicode: str | None = None
+        self._high_surrogate: str | None = None
+
+    def feed(self, delta: str) -> list[dict]:
+        if self._mode == "done" or not delta:
+            return []
+        decoded: list[str] = []
+        for char in delta:
+            if self._mode == "string":
+                self._feed_string_value(char, decoded)
+            elif self._mode == "raw":
+                decoded.append(char)
+            else:
+                self._scan_outer(char)
+                if self._mode == "raw":
+                    # Bare array value — the splitter reads it as-is and stops at its closing bracket
+                    decoded.append(char)
+            if self._mode == "done":
+                break
+
+        actions = self.splitter.feed("".join(decoded)) if decoded else []
+        if self.splitter.closed:
+            self._mode = "done"
+        self.count += len(actions)
+        return actions
+
+    def _scan_outer(self, char: str) -> None:
+        if self._in_string:
+            if self._escape:
+                self._escape = False
+                self._key.append(char)
+            elif char == "\\":
+                self._escape = True
+            elif char == '"':
+                self._in_string = False
+                self._last_key = "".join(self._key)
+            else:
+                self._key.append(char)
+        elif char == '"':
+            if self._depth == 1 and self._last_key == self.field and self._expect_value:
+                self._mode = "string"
+                return
+            self._in_string = True
+            self._key = []
+            self._expect_value = False
+        elif char == ":":
+            self._expect_value = True
+        elif char == "[" and self._depth == 1 and self._last_key == self.field and self._expect_value:
+            self._mode = "raw"
+        elif char in "[{":
+            self._depth += 1
+            self._expect_value = False
+        elif char in "]}":
+            self._depth -= 1
+        elif char == ",":
+            self._expect_value = False
+            self._last_key = None
+
+    def _feed_string_value(self, char: str, decoded: list[str]) -> None:
+        if self._unicode is not None:
+            self._unicode += char
+            if len(self._unicode) == 4:
+                self._emit_char(chr(int(self._unicode, 16)), decoded)
+                self._unicode = None
+        elif self._escape:
+            self._escape = False
+            if char == "u":
+                self._unicode = ""
+            else:
+                self._emit_char(_ESCAPES.get(char, char), decoded)
+        elif char == "\\":
+            self._escape = True
+        elif char == '"':
+            self._mode = "done"
+        else:
+            self._emit_char(char, decoded)
+
+    def _emit_char(self, char: str, decoded: list[str]) -> None:
+        # Join \\uD83D\\uDE00-style surrogate pairs back into one character
+        if self._high_surrogate is not None:
+            high, self._high_surrogate = self._high_surrogate, None
+            if "\udc00" <= char <= "\udfff":
+                decoded.append((high + char).encode("utf-16", "surrogatepass").decode("utf-16"))
+                return
+            decoded.append(high)
+        if "\ud800" <= char <= "\udbff":
+            self._high_surrogate = char
+            return
+        decoded.append(char)
@@ -0,0 +1,103 @@
+"""
+Pre-flight checks for microsoft_actions against the document the model was given.
+
+Catches what the task pane would otherwise only find when applying the actions: unknown
+actions, locations that do not exist, and withinPara.find text that is not in the
+paragraph. Each action is checked with dictionary lookups on the session's DocumentIndex.
+"""
+
+import re
+from agent.document_index import DocumentIndex
+from agent.utils import convert_from_placeholders
+
+PARAGRAPH_ACTIONS = {"replace", "append", "delete", "highlight", "format_bold", "format_italic", "strikethrough"}
+ROW_ACTIONS = {"delete_row", "insert_row"}
+TABLE_ACTIONS = {"delete_table"}
+ANCHOR_ACTIONS = {"create_table"}
+ACTIONS = PARAGRAPH_ACTIONS | ROW_ACTIONS | TABLE_ACTIONS | ANCHOR_ACTIONS
+
+ROW_LOC_RE = re.compile(r"^\d+\.t(\d+)\.r(\d+)$")
+TABLE_LOC_RE = re.compile(r"^\d+\.t(\d+)$")
+REGULAR_LOC_RE = re.compile(r"^\d+\.p\d+$")
+
+# Word's Range.search rejects longer search strings
+MAX_FIND_CHARS = 255
+
+
+def validate_action(action, index: DocumentIndex) -> list[str]:
+    """Problems with one action (empty if it can be applied as written)."""
+    if not isinstance(action, dict):
+        return ["not a JSON object"]
+    name = action.get("action")
+    loc = action.get("loc")
+    if name not in ACTIONS:
+        return [f"unknown action '{name}'. Expected one of: {', '.join(sorted(ACTIONS))}"]
+    if not isinstance(loc, str) or not loc:
+        return ["missing 'loc'"]
+
+    errors = []
+    if name in PARAGRAPH_ACTIONS:
+        position = index.by_address.get(loc)
+        if position is None:
+            errors.append(f"'{loc}' is not a paragraph in the document")
+        else:
+            errors.extend(_check_within_para(action.get("withinPara"), index.paragraphs[position][1]))
+        if name in ("replace", "append") and not isinstance(action.get("new_text"), str):
+            errors.append(f"'{name}' requires 'new_text'")
+
+    elif name in ROW_ACTIONS:
+        match = ROW_LOC_RE.match(loc)
+        if not match:
+            errors.append(f"'{loc}' is not a table row location (docPosition.tN.rM)")
+        elif int(match.group(2)) not in index.tables.get(int(match.group(1)), {}):
+            errors.append(f"table row '{loc}' does not exist")
+
+    elif name in TABLE_ACTIONS:
+        match = TABLE_LOC_RE.match(loc)
+        if not match:
+            errors.append(f"'{loc}' is not a table location (docPosition.tN)")
+        elif int(match.group(1)) not in index.tables:
+            errors.append(f"table '{loc}' does not exist")
+
+    elif name in ANCHOR_ACTIONS:
+        if not REGULAR_LOC_RE.match(loc) or loc not in index.by_address:
+            errors.append(f"'{loc}' is not a paragraph outside a table to insert the table after")
+        for field in ("rowCount", "columnCount"):
+            value = action.get(field)
+            if not isinstance(value, int) or value < 1:
+                errors.append(f"'{name}' requires a positive integer '{field}'")
+
+    return errors
+
+
+def _check_within_para(within_para, text: str) -> list[str]:
+    if within_para is None:
+        return []
+    if not isinstance(within_para, dict) or not isinstance(within_para.get("find"), str) or not within_para["find"]:
+        return ["'withinPara' needs a non-empty 'find'"]
+    find = convert_from_placeholders(within_para["find"])
+    occurrence = within_para.get("occurrence", 0)
+    if not isinstance(occurrence, int) or occurrence < 0:
+        return ["'withinPara.occurrence' must be a non-negative integer"]
+    if len(find) > MAX_FIND_CHARS:
+        return [f"'withinPara.find' is longer than {MAX_FIND_CHARS} characters — use a shorter unique phrase"]
+    # Same semantics as the task pane: case-sensitive, non-overlapping matches
+    count = text.count(find)
+    if count == 0:
+        return [f"'withinPara.find' text {within_para['find']!r} does not appear in the paragraph"]
+    if occurrence >= count:
+        return [f"'withinPara.occurrence' {occurrence} is out of range — the text appears {count} time(s) (0-based)"]
+    return []
+
+
+def validate_actions(actions, index: DocumentIndex) -> list[str]:
+    """Problems with a whole actions list, one line per problem, labelled by action number."""
+    if not isinstance(actions, list):
+        return ["'actions' must be a JSON array of action objects"]
+    errors = []
+    for number, action in enumerate(actions):
+        label = f"action {number}"
+        if isinstance(action, dict):
+            label += f" ({action.get('action')} {action.get('loc')})"
+        errors.extend(f"{label}: {error}" for error in validate_action(action, index))
+    return errors
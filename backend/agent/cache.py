@@ -0,0 +1,149 @@
+"""
+Bounded in-memory cache for session agents.
+
+Agents are kept in LRU order and evicted when the cache exceeds its entry limit,
+its (optional) byte budget, or when a session has been idle longer than the TTL.
+Evicted sessions are rebuilt from the session store on the next request.
+"""
+
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_agent_bytes(agent: Any) -> int:
+    """Approximate the memory held by an agent's conversation history (in characters)."""
+    total = 0
+    for message in getattr(agent, "messages", []):
+        for block in message.get("content", []):
+            if "text" in block:
+                total += len(block["text"])
+            elif "toolUse" in block:
+                total += len(json.dumps(block["toolUse"].get("input", {}), default=str))
+            elif "toolResult" in block:
+                for item in block["toolResult"].get("content", []):
+                    total += len(item.get("text", "")) if isinstance(item, dict) else 0
+    return total
+
+
+class _CacheEntry:
+    __slots__ = ("agent", "model_id", "size", "last_access")
+
+    def __init__(self, agent: Any, model_id: str, size: int):
+        self.agent = agent
+        self.model_id = model_id
+        self.size = size
+        self.last_access = time.monotonic()
+
+
+class AgentCache:
+    """
+    LRU cache of session_id -> (Agent, model_id) with entry, byte and idle-TTL limits.
+
+    A max_bytes or idle_ttl of 0 disables that limit. The most recently used entry is
+    never evicted for size reasons, so a single oversized session still works.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        max_bytes: int = 0,
+        idle_ttl: float = 0,
+        size_fn: Callable[[Any], int] = estimate_agent_bytes,
+    ):
+        self.max_entries = max(1, max_entries)
+        self.max_bytes = max_bytes
+        self.idle_ttl = idle_ttl
+        self._size_fn = size_fn
+        self._entries: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        self._total_bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = {"lru": 0, "bytes": 0, "ttl": 0}
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, session_id: str) -> tuple[Any, str] | None:
+        """Return (agent, model_id) and mark the session as recently used, or None on a miss."""
+        self.evict_expired()
+        entry = self._entries.get(session_id)
+        if entry is None:
+            self._misses += 1
+            return None
+
+        self._hits += 1
+        self._entries.move_to_end(session_id)
+        entry.last_access = time.monotonic()
+        # The conversation grew since the last access — re-measure before enforcing the budget
+        self._resize(entry, self._size_fn(entry.agent))
+        self._enforce_limits()
+        return entry.agent, entry.model_id
+
+    def put(self, session_id: str, agent: Any, model_id: str) -> None:
+        """Insert or replace a session's agent."""
+        self.pop(session_id)
+        entry = _CacheEntry(agent, model_id, self._size_fn(agent))
+        self._entries[session_id] = entry
+        self._total_bytes += entry.size
+        self.evict_expired()
+        self._enforce_limits()
+
+    def pop(self, session_id: str) -> tuple[Any, str] | None:
+        """Remove a session without counting it as an eviction."""
+        entry = self._entries.pop(session_id, None)
+        if entry is None:
+            return None
+        self._total_bytes -= entry.size
+        return entry.agent, entry.model_id
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._total_bytes = 0
+
+    def evict_expired(self) -> None:
+        """Drop sessions idle for longer than idle_ttl (oldest first)."""
+        if not self.idle_ttl:
+            return
+        cutoff = time.monotonic() - self.idle_ttl
+        while self._entries:
+            session_id, entry = next(iter(self._entries.items()))
+            if entry.last_access > cutoff:
+                break
+            self._evict(session_id, "ttl")
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "bytes": self._total_bytes,
+            "max_bytes": self.max_bytes,
+            "idle_ttl": self.idle_ttl,
+            "hits": self._hits,
+            "misses": self._misses,
+            "evictions": dict(self._evictions),
+        }
+
+    def _resize(self, entry: _CacheEntry, size: int) -> None:
+        self._total_bytes += size - entry.size
+        entry.size = size
+
+    def _enforce_limits(self) -> None:
+        while len(self._entries) > self.max_entries:
+            self._evict(next(iter(self._entries)), "lru")
+        if self.max_bytes:
+            while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+                self._evict(next(iter(self._entries)), "bytes")
+
+    def _evict(self, session_id: str, reason: str) -> None:
+        entry = self._entries.pop(session_id)
+        self._total_bytes -= entry.size
+        self._evictions[reason] += 1
+        logger.info("Evicted agent for session %s (reason: %s, ~%d bytes)", session_id, reason, entry.size)
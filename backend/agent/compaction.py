@@ -0,0 +1,146 @@
+"""
+History compaction run when each new user message is added, before the model is called.
+
+Every turn whose document changed carries a full <word_document> (or an outline of a
+large one, or a <word_document_changes> delta against the previous one), so long sessions pile up
+near-identical copies of the contract. Only the latest full snapshot and the deltas
+sent after it are still meaningful; older ones are replaced with short stubs.
+
+Optionally, large tool results from turns older than HISTORY_TRIM_TOOL_RESULTS_AFTER_TURNS
+are cut down to a stub as well.
+
+Stubs are fixed strings and messages are only rewritten when a newer snapshot arrives
+or a turn ages out of the window, so the conversation prefix stays byte-identical
+between compactions and prompt caching keeps hitting. The same rewrite is applied to
+the persisted session so a rehydrated agent starts compacted too.
+"""
+
+import logging
+import re
+from contextlib import nullcontext
+from config import (
+    HISTORY_COMPACT_DOCUMENTS,
+    HISTORY_TRIM_TOOL_RESULTS_AFTER_TURNS,
+    HISTORY_TRIM_TOOL_RESULTS_MIN_CHARS,
+)
+
+logger = logging.getLogger(__name__)
+
+DOCUMENT_RE = re.compile(r"<(word_document|word_document_outline)>.*?</\1>", re.DOTALL)
+CHANGES_RE = re.compile(r"<word_document_changes>.*?</word_document_changes>", re.DOTALL)
+
+STALE_DOCUMENT_STUB = "<word_document>[Earlier snapshot removed — superseded by a later <word_document> in this conversation]</word_document>"
+STALE_CHANGES_STUB = "<word_document_changes>[Earlier changes removed — superseded by a later <word_document> in this conversation]</word_document_changes>"
+TRIMMED_TOOL_RESULT = "[Tool output removed from history ({chars} characters)]"
+
+
+def _is_turn_start(message: dict) -> bool:
+    """A user message typed by the user, as opposed to one carrying tool results."""
+    return message["role"] == "user" and any("text" in block for block in message["content"])
+
+
+def is_snapshot(text: str) -> bool:
+    """Whether a user turn's first block is a full document snapshot (or a large document's outline)."""
+    return text.startswith(("<word_document>", "<word_document_outline>"))
+
+
+def _has_live_snapshot(message: dict) -> bool:
+    """Whether a user turn starts with a snapshot that has not been replaced by a stub.
+    Notes and deltas only mention <word_document>, so only the first block's prefix counts."""
+    if message["role"] != "user":
+        return False
+    text = next((block["text"] for block in message["content"] if "text" in block), "")
+    return is_snapshot(text) and not text.startswith(STALE_DOCUMENT_STUB)
+
+
+def _compact_documents(message: dict) -> bool:
+    changed = False
+    for block in message["content"]:
+        text = block.get("text")
+        if not text or "<word_document" not in text:
+            continue
+        compacted = CHANGES_RE.sub(STALE_CHANGES_STUB, DOCUMENT_RE.sub(STALE_DOCUMENT_STUB, text))
+        if compacted != text:
+            block["text"] = compacted
+            changed = True
+    return changed
+
+
+def _trim_tool_results(message: dict, min_chars: int) -> bool:
+    changed = False
+    for block in message["content"]:
+        if "toolResult" not in block:
+            continue
+        for item in block["toolResult"].get("content", []):
+            text = item.get("text") if isinstance(item, dict) else None
+            if text and len(text) >= min_chars:
+                item["text"] = TRIMMED_TOOL_RESULT.format(chars=len(text))
+                changed = True
+    return changed
+
+
+def compact_messages(
+    messages: list[dict],
+    new_snapshot: bool,
+    compact_documents: bool = HISTORY_COMPACT_DOCUMENTS,
+    trim_after_turns: int = HISTORY_TRIM_TOOL_RESULTS_AFTER_TURNS,
+    trim_min_chars: int = HISTORY_TRIM_TOOL_RESULTS_MIN_CHARS,
+) -> list[int]:
+    """
+    Compact `messages` in place and return the indices that changed.
+
+    `new_snapshot` means the message about to be sent carries a full <word_document>,
+    which makes every copy already in the history stale.
+    """
+    keep_from = 0
+    if compact_documents:
+        keep_from = len(messages)
+        if not new_snapshot:
+            # Keep the latest snapshot and the deltas sent after it
+            keep_from = next((i for i in range(len(messages) - 1, -1, -1) if _has_live_snapshot(messages[i])), 0)
+
+    trim_before = 0
+    if trim_after_turns > 0:
+        turn_starts = [i for i, message in enumerate(messages) if _is_turn_start(message)]
+        # The boundary moves in steps of `trim_after_turns` turns rather than every turn,
+        # so the cached prefix is rewritten once per step instead of on each request
+        boundary = (len(turn_starts) - trim_after_turns) // trim_after_turns * trim_after_turns
+        if boundary > 0:
+            trim_before = turn_starts[boundary]
+
+    changed = []
+    for i in range(max(keep_from, trim_before)):
+        message = messages[i]
+        updated = False
+        if i < keep_from and message["role"] == "user":
+            updated = _compact_documents(message)
+        if i < trim_before:
+            updated = _trim_tool_results(message, trim_min_chars) or updated
+        if updated:
+            changed.append(i)
+    return changed
+
+
+def compact_history(agent, new_snapshot: bool) -> int:
+    """
+    Compact the agent's in-memory history and its persisted session, once the new user
+    message has been added to both (it is left as is). Blocking (session I/O) — call from
+    a worker thread. Returns the number of messages rewritten.
+    """
+    changed = compact_messages(agent.messages[:-1], new_snapshot)
+    if not changed:
+        return 0
+
+    session_manager = getattr(agent, "_session_manager", None)
+    if session_manager is not None:
+        # Stored message ids need not match list positions, so the stored history is compacted on its own
+        repository = session_manager.session_repository
+        session_id = session_manager.session_id
+        stored = repository.list_messages(session_id, agent.agent_id)
+        # One commit for the rewrites, where the repository batches
+        with getattr(repository, "batch", nullcontext)():
+            for i in compact_messages([session_message.message for session_message in stored[:-1]], new_snapshot):
+                repository.update_message(session_id, agent.agent_id, stored[i])
+
+    logger.info("Compacted %d message(s) in session history", len(changed))
+    return len(changed)
@@ -0,0 +1,170 @@
+"""
+Per-session concurrency control for /invoke.
+
+Only one request may drive a session's agent at a time. What happens to a second
+request is set by SESSION_CONCURRENCY_POLICY:
+  - "queue":  wait for the running request to finish
+  - "reject": fail immediately with SessionBusyError (HTTP 409)
+  - "cancel": ask the running request to stop, then take over the session
+
+Each lease carries a request id, so a running request can also be cancelled
+explicitly (POST /invoke/{request_id}/cancel) or when its client disconnects.
+"""
+
+import asyncio
+import logging
+import uuid
+from strands.hooks import MessageAddedEvent
+from config import SESSION_CONCURRENCY_POLICY
+
+logger = logging.getLogger(__name__)
+
+POLICIES = ("queue", "reject", "cancel")
+
+CANCELLED_TOOL_RESULT = "Cancelled by the user before the tool finished."
+CANCELLED_RESPONSE = "[Response cancelled]"
+
+
+class SessionBusyError(Exception):
+    """Raised under the "reject" policy when the session already has a running request."""
+
+
+class SessionLease:
+    """Exclusive hold on a session for the duration of one request."""
+
+    def __init__(self, registry: "SessionLocks", session_id: str, request_id: str):
+        self.session_id = session_id
+        self.request_id = request_id
+        self.cancel_reason: str | None = None
+        self._registry = registry
+        self._cancelled = asyncio.Event()
+        self._released = False
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    @property
+    def cancel_event(self) -> asyncio.Event:
+        return self._cancelled
+
+    def cancel(self, reason: str = "cancelled") -> None:
+        """Ask the holder to stop. The first reason given is kept."""
+        if not self._cancelled.is_set():
+            self.cancel_reason = reason
+            self._cancelled.set()
+
+    async def wait_cancelled(self) -> None:
+        await self._cancelled.wait()
+
+    def release(self) -> None:
+        """Release the session. Safe to call more than once."""
+        if not self._released:
+            self._released = True
+            self._registry._release(self)
+
+
+class _SessionSlot:
+    __slots__ = ("lock", "holder", "waiters")
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.holder: SessionLease | None = None
+        self.waiters = 0
+
+
+class SessionLocks:
+    """Registry of per-session locks. Slots are dropped once idle."""
+
+    def __init__(self, policy: str = "queue"):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown session concurrency policy '{policy}'. Expected one of {POLICIES}")
+        self.policy = policy
+        self._slots: dict[str, _SessionSlot] = {}
+        self._requests: dict[str, SessionLease] = {}
+
+    def is_busy(self, session_id: str) -> bool:
+        slot = self._slots.get(session_id)
+        return slot is not None and slot.holder is not None
+
+    def holder(self, session_id: str) -> SessionLease | None:
+        slot = self._slots.get(session_id)
+        return slot.holder if slot else None
+
+    def cancel_request(self, request_id: str, reason: str = "cancelled") -> bool:
+        """Cancel the running request with this id. Returns False if no such request holds a session."""
+        lease = self._requests.get(request_id)
+        if lease is None:
+            return False
+        lease.cancel(reason)
+        return True
+
+    async def acquire(self, session_id: str, request_id: str | None = None) -> SessionLease:
+        slot = self._slots.setdefault(session_id, _SessionSlot())
+
+        if slot.holder is not None:
+            if self.policy == "reject":
+                raise SessionBusyError(f"Session {session_id} already has a request in progress")
+            if self.policy == "cancel":
+                logger.info("Session %s: cancelling in-flight request for newer one", session_id)
+                slot.holder.cancel("superseded")
+
+        slot.waiters += 1
+        try:
+            await slot.lock.acquire()
+        except asyncio.CancelledError:
+            if slot.holder is None and not slot.waiters - 1 and not slot.lock.locked():
+                self._slots.pop(session_id, None)
+            raise
+        finally:
+            slot.waiters -= 1
+
+        lease = SessionLease(self, session_id, request_id or uuid.uuid4().hex)
+        slot.holder = lease
+        self._requests[lease.request_id] = lease
+        return lease
+
+    def _release(self, lease: SessionLease) -> None:
+        if self._requests.get(lease.request_id) is lease:
+            del self._requests[lease.request_id]
+        slot = self._slots.get(lease.session_id)
+        if slot is None or slot.holder is not lease:
+            return
+        slot.holder = None
+        slot.lock.release()
+        if not slot.waiters:
+            del self._slots[lease.session_id]
+
+
+session_locks = SessionLocks(SESSION_CONCURRENCY_POLICY)
+
+
+async def close_interrupted_turn(agent, turn_start: int) -> int:
+    """
+    Leave a valid, visibly marked history after a turn was cut short at `turn_start`
+    (the message count before the turn): answer any toolUse still waiting for a result,
+    then end the turn with an assistant note. Messages go through the agent's hooks so the
+    session manager persists them. Returns the number of messages added.
+    """
+    if len(agent.messages) <= turn_start:
+        return 0
+
+    added = []
+    last = agent.messages[-1]
+    if last["role"] == "assistant":
+        pending_ids = [block["toolUse"]["toolUseId"] for block in last["content"] if "toolUse" in block]
+        if not pending_ids:
+            return 0
+        added.append({
+            "role": "user",
+            "content": [
+                {"toolResult": {"toolUseId": tool_use_id, "status": "error", "content": [{"text": CANCELLED_TOOL_RESULT}]}}
+                for tool_use_id in pending_ids
+            ],
+        })
+    added.append({"role": "assistant", "content": [{"text": CANCELLED_RESPONSE}]})
+
+    for message in added:
+        agent.messages.append(message)
+        await agent.hooks.invoke_callbacks_async(MessageAddedEvent(agent=agent, message=message))
+    return len(added)
@@ -0,0 +1,52 @@
+"""
+Request-scoped tool consent.
+
+strands_tools reads BYPASS_TOOL_CONSENT from the process environment and otherwise
+prompts on the server's stdin. That setting is global, so it is pinned to "true" once
+and each request's auto-approve preference is enforced by a hook instead, using a
+ContextVar that is local to the request's stream.
+"""
+
+import os
+from contextvars import ContextVar, Token
+from strands.hooks import HookProvider, HookRegistry, BeforeToolCallEvent
+
+# Never block a worker on an interactive stdin prompt; ToolConsentHook decides per request
+os.environ["BYPASS_TOOL_CONSENT"] = "true"
+
+_tool_consent: ContextVar[bool] = ContextVar("tool_consent", default=False)
+
+DECLINED_MESSAGE = (
+    "Tool call declined: the user has not enabled auto-approve for tools. "
+    "Continue without this tool or ask the user to enable auto-approve in Settings."
+)
+
+
+def set_tool_consent(approved: bool) -> Token:
+    """Set the tool consent for the current request context."""
+    return _tool_consent.set(approved)
+
+
+def reset_tool_consent(token: Token) -> None:
+    _tool_consent.reset(token)
+
+
+def _requires_consent(tool_use: dict) -> bool:
+    """Tools that would have prompted for confirmation without BYPASS_TOOL_CONSENT."""
+    name = tool_use.get("name")
+    if name == "shell":
+        return True
+    if name == "editor":
+        return tool_use.get("input", {}).get("command") != "view"
+    return False
+
+
+class ToolConsentHook(HookProvider):
+    """Cancels consent-gated tool calls unless the current request auto-approves tools."""
+
+    def register_hooks(self, registry: HookRegistry, **kwargs) -> None:
+        registry.add_callback(BeforeToolCallEvent, self._check_consent)
+
+    def _check_consent(self, event: BeforeToolCallEvent) -> None:
+        if not _tool_consent.get() and _requires_consent(event.tool_use):
+            event.cancel_tool = DECLINED_MESSAGE
@@ -0,0 +1,90 @@
+"""
+Parsing and diffing of the paragraph mapping sent by the frontend as <word_document>.
+
+Each line of the document is "{docPosition}.{key}: {text}", e.g. "0.p0: Title" or
+"2.t0.r0.c0.p0: Cell text". Paragraph text never contains the address prefix, so a
+line that does not start with an address is a continuation of the previous paragraph.
+"""
+
+import difflib
+import re
+
+ADDRESS_RE = re.compile(r"^(\d+\.(?:p\d+|t\d+\.r\d+\.c\d+\.p\d+)):[ ]?(.*)$")
+
+
+def parse_word_document(word_document: str) -> list[tuple[str, str]]:
+    """Split a <word_document> body into an ordered list of (address, text) pairs."""
+    paragraphs: list[tuple[str, str]] = []
+    if not word_document:
+        return paragraphs
+
+    for line in word_document.split("\n"):
+        match = ADDRESS_RE.match(line)
+        if match:
+            paragraphs.append((match.group(1), match.group(2)))
+        elif paragraphs:
+            address, text = paragraphs[-1]
+            paragraphs[-1] = (address, f"{text}\n{line}")
+    return paragraphs
+
+
+def _format_range(addresses: list[tuple[str, str]], start: int, end: int) -> str:
+    if end - start == 1:
+        return addresses[start][0]
+    return f"{addresses[start][0]}..{addresses[end - 1][0]}"
+
+
+def build_document_delta(
+    previous: list[tuple[str, str]],
+    current: list[tuple[str, str]],
+    full_size: int,
+) -> str | None:
+    """
+    Describe how `current` differs from the `previous` paragraphs the model has already seen.
+
+    Returns "" when nothing changed, None when the delta would not be smaller than
+    `full_size` (the caller should resend the whole document), otherwise a
+    <word_document_changes> block listing remapped, removed, changed and added paragraphs.
+    """
+    matcher = difflib.SequenceMatcher(
+        None,
+        [text for _, text in previous],
+        [text for _, text in current],
+        autojunk=False,
+    )
+
+    remapped: list[str] = []
+    removed: list[str] = []
+    changed: list[str] = []
+    added: list[str] = []
+
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            # Same text, possibly at a new address — only report blocks that moved
+            if previous[i1][0] != current[j1][0] or previous[i2 - 1][0] != current[j2 - 1][0]:
+                remapped.append(f"{_format_range(previous, i1, i2)} -> {_format_range(current, j1, j2)}")
+            continue
+
+        paired = min(i2 - i1, j2 - j1)
+        for offset in range(paired):
+            old_address = previous[i1 + offset][0]
+            new_address, text = current[j1 + offset]
+            if old_address != new_address:
+                remapped.append(f"{old_address} -> {new_address}")
+            changed.append(f"{new_address}: {text}")
+        removed.extend(address for address, _ in previous[i1 + paired:i2])
+        added.extend(f"{address}: {text}" for address, text in current[j1 + paired:j2])
+
+    if not (remapped or removed or changed or added):
+        return ""
+
+    sections = []
+    for name, lines in (("remapped", remapped), ("removed", removed), ("changed", changed), ("added", added)):
+        if lines:
+            body = "\n".join(lines)
+            sections.append(f"<{name}>\n{body}\n</{name}>")
+    delta = "<word_document_changes>\n" + "\n".join(sections) + "\n</word_document_changes>"
+
+    if len(delta) >= full_size:
+        return None
+    return delta
@@ -0,0 +1,127 @@
+"""
+Per-session index of the submitted <word_document>.
+
+Built from the parsed (address, text) pairs on every request whose document changed and
+kept on the session's agent. In large-document mode the model gets only `outline()` and
+reads the rest on demand through the read_document / search_document tools.
+"""
+
+import re
+
+ADDRESS_PARTS_RE = re.compile(r"^(\d+)\.(?:p(\d+)|t(\d+)\.r(\d+)\.c(\d+)\.p(\d+))$")
+
+# Lines that look like headings: numbered clauses, schedules/articles, or short all-caps titles
+CLAUSE_NUMBER_RE = re.compile(r"^\s*(?:(?:article|section|clause|schedule|annex|appendix|exhibit|part)\s+[\w.]+|\d+(?:\.\d+)*\.?(?=\s))", re.IGNORECASE)
+OUTLINE_LINE_CHARS = 80
+HEADING_MAX_CHARS = 120
+
+
+def _is_heading(text: str) -> bool:
+    stripped = text.strip()
+    if not stripped or len(stripped) > HEADING_MAX_CHARS:
+        return False
+    if CLAUSE_NUMBER_RE.match(stripped):
+        return True
+    letters = [char for char in stripped if char.isalpha()]
+    return len(letters) >= 3 and all(char.isupper() for char in letters)
+
+
+def _clip(text: str, limit: int) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= limit else text[:limit - 3] + "..."
+
+
+class DocumentIndex:
+    """Paragraphs in document order, addressable by docPosition or full address."""
+
+    def __init__(self, paragraphs: list[tuple[str, str]]):
+        self.paragraphs = paragraphs
+        self.size = sum(len(text) for _, text in paragraphs)
+        # address -> list position, docPosition -> list position
+        self.by_address: dict[str, int] = {}
+        self.by_position: dict[int, int] = {}
+        # table id -> {row id -> {col id -> [list positions]}}
+        self.tables: dict[int, dict[int, dict[int, list[int]]]] = {}
+
+        for i, (address, _) in enumerate(paragraphs):
+            self.by_address[address] = i
+            match = ADDRESS_PARTS_RE.match(address)
+            if not match:
+                continue
+            self.by_position[int(match.group(1))] = i
+            if match.group(3) is not None:
+                table, row, col = int(match.group(3)), int(match.group(4)), int(match.group(5))
+                self.tables.setdefault(table, {}).setdefault(row, {}).setdefault(col, []).append(i)
+
+    def __len__(self) -> int:
+        return len(self.paragraphs)
+
+    def resolve(self, ref: str | int) -> int | None:
+        """List position of a paragraph given its address ("12.p12") or docPosition ("12" or 12)."""
+        if isinstance(ref, int):
+            return self.by_position.get(ref)
+        ref = ref.strip()
+        if ref.isdigit():
+            return self.by_position.get(int(ref))
+        return self.by_address.get(ref)
+
+    def read_range(self, start: str | int, end: str | int | None = None, max_paragraphs: int = 200) -> list[tuple[str, str]]:
+        """Paragraphs from `start` to `end` inclusive (at most `max_paragraphs`)."""
+        first = self.resolve(start)
+        if first is None:
+            raise KeyError(f"Unknown paragraph '{start}'")
+        last = first if end in (None, "") else self.resolve(end)
+        if last is None:
+            raise KeyError(f"Unknown paragraph '{end}'")
+        if last < first:
+            first, last = last, first
+        return self.paragraphs[first:min(last + 1, first + max_paragraphs)]
+
+    def search(self, query: str, max_results: int = 20) -> list[tuple[str, str]]:
+        """Paragraphs containing the query (case-insensitive); falls back to all-words matching."""
+        needle = query.strip().lower()
+        if not needle:
+            return []
+        hits = [(address, text) for address, text in self.paragraphs if needle in text.lower()]
+        if not hits:
+            words = needle.split()
+            hits = [(address, text) for address, text in self.paragraphs if all(word in text.lower() for word in words)]
+        return hits[:max_results]
+
+    def outline(self, max_chars: int = 8000) -> str:
+        """
+        Compact map of the document: headings with the docPosition range of their section,
+        and one line per table with its size and header row.
+        """
+        entries: list[tuple[int, str]] = []
+        heading_starts = [i for i, (address, text) in enumerate(self.paragraphs)
+                          if ".t" not in address and _is_heading(text)]
+        heading_set = set(heading_starts)
+        bounds = heading_starts + [len(self.paragraphs)]
+        if not heading_starts or heading_starts[0] > 0:
+            bounds = [0] + bounds
+        for start, end in zip(bounds, bounds[1:]):
+            if end <= start:
+                continue
+            address, text = self.paragraphs[start]
+            label = _clip(text, OUTLINE_LINE_CHARS) if start in heading_set else "(untitled)"
+            entries.append((start, f"{address}..{self.paragraphs[end - 1][0]} ({end - start} paras) {label}"))
+
+        for table, rows in sorted(self.tables.items()):
+            positions = [i for cols in rows.values() for cell in cols.values() for i in cell]
+            first, last = min(positions), max(positions)
+            header_row = rows[min(rows)]
+            header = " | ".join(_clip(" ".join(self.paragraphs[i][1] for i in header_row[col]), 30)
+                                for col in sorted(header_row))
+            cols = max(len(cols) for cols in rows.values())
+            entries.append((first, f"{self.paragraphs[first][0]}..{self.paragraphs[last][0]} "
+                                   f"table t{table}: {len(rows)} rows x {cols} cols: {header}"))
+
+        lines = [line for _, line in sorted(entries)]
+        outline = "\n".join(lines)
+        if len(outline) > max_chars:
+            # Keep an even spread of entries rather than just the start of the document
+            step = len(outline) / max_chars
+            lines = [lines[int(i * step)] for i in range(int(len(lines) / step))]
+            outline = "\n".join(lines) + "\n[outline shortened - use search_document to find other sections]"
+        return f"{len(self.paragraphs)} paragraphs, {self.size} characters\n{outline}"
@@ -1,72 +1,177 @@
+import asyncio
 import logging
+import threading
 from strands import Agent
-from strands_tools import editor, file_read, shell
-from strands.types.content import SystemContentBlock
-from strands.session.file_session_manager import FileSessionManager
-from agent.prompts import REDLINER_PROMPT
-from agent.utils import load_tool_paths, list_skills
-from agent.mcp_loader import load_mcp_clients
-from models.litellm_client import create_litellm_model
-from config import SESSIONS_DIR
+from strands.tools.loader import load_tool_from_string
+from agent.utils import load_tool_paths
+from agent.skill_registry import skill_registry
+from agent.mcp_pool import mcp_pool
+from agent.cache import AgentCache
+from agent.consent import ToolConsentHook
+from agent.pending_turn import PendingTurnHook
+from agent.session_store import session_store
+from agent.shared_state import shared_state, worker_id
+from config import AGENT_CACHE_MAX_ENTRIES, AGENT_CACHE_MAX_BYTES, AGENT_CACHE_IDLE_TTL_SECONDS, AGENT_CACHE_SWEEP_SECONDS
 
 logger = logging.getLogger(__name__)
 
-CUSTOM_TOOL_PATHS = load_tool_paths()
-BUILT_IN_TOOLS = [editor, file_read, shell]
-MCP_CLIENTS = load_mcp_clients()
-ALL_TOOLS = BUILT_IN_TOOLS + CUSTOM_TOOL_PATHS + MCP_CLIENTS
+# Built-in and custom tools, loaded once on first use (or by the startup warm-up) and shared
+# by every agent. MCP tools come from the shared pool — servers start on first use
+_tools: list | None = None
+_tools_lock = threading.Lock()
+
+
+def get_tools() -> list:
+    """Built-in and ./tools tools. The first call imports them (strands_tools, ddgs, ...)."""
+    global _tools
+    if _tools is None:
+        with _tools_lock:
+            if _tools is None:
+                from strands_tools import editor, file_read, shell
+                built_in = [editor, file_read, shell]
+                custom = [tool for path in load_tool_paths() for tool in load_tool_from_string(path)]
+                logger.info("Agent tools loaded: %d built-in, %d custom (+ MCP tools on first use)",
+                            len(built_in), len(custom))
+                _tools = built_in + custom
+    return _tools
+
+
+def create_litellm_model(model_id: str):
+    """The LiteLLM client — imported on first use, as litellm is slow to import."""
+    from models.litellm_client import create_litellm_model
+    return create_litellm_model(model_id)
 
-logger.info("Agent tools loaded: %d built-in, %d custom, %d MCP = %d total",
-            len(BUILT_IN_TOOLS), len(CUSTOM_TOOL_PATHS), len(MCP_CLIENTS), len(ALL_TOOLS))
 
 # In-memory agent cache: session_id -> (Agent, model_id)
-_agent_cache: dict[str, tuple[Agent, str]] = {}
+# Evicted sessions are rebuilt from the session store on their next request
+_agent_cache = AgentCache(
+    max_entries=AGENT_CACHE_MAX_ENTRIES,
+    max_bytes=AGENT_CACHE_MAX_BYTES,
+    idle_ttl=AGENT_CACHE_IDLE_TTL_SECONDS,
+)
+
+
+# Builds the model for a model id — benchmarks swap in a fake model with set_model_factory
+_model_factory = create_litellm_model
+
 
+def set_model_factory(factory) -> None:
+    """Use `factory(model_id)` instead of the LiteLLM client for agents created or switched from now on."""
+    global _model_factory
+    _model_factory = factory
 
-def reload_mcp_tools() -> None:
+
+def reload_mcp_tools() -> dict:
     """
-    Reload MCP clients from config/mcp.json and update ALL_TOOLS.
-    Clears the agent cache so new agents get the updated tools.
+    Reload MCP servers from config/mcp.json, restarting only the ones that changed.
+    Cached agents are kept — they resync their MCP tools on their next request.
     """
-    global MCP_CLIENTS, ALL_TOOLS
-    MCP_CLIENTS = load_mcp_clients()
-    ALL_TOOLS = BUILT_IN_TOOLS + CUSTOM_TOOL_PATHS + MCP_CLIENTS
-    _agent_cache.clear()
+    return mcp_pool.reload()
+
+
+def _is_stale(agent: Agent, state: dict | None) -> bool:
+    revision = getattr(agent, "_state_revision", 0)
+    # None: the agent lost a publish race to another worker
+    return revision is None or (state is not None and state["revision"] != revision)
 
 
-def get_or_create_agent(session_id: str, model_id: str) -> Agent:
+async def get_or_create_agent(session_id: str, model_id: str) -> Agent:
     """
     Get or create an agent for the given session ID.
     If the agent exists but the model changed, swap the model in place.
+    If the agent was evicted, it is rehydrated from the session store.
+    With a shared SESSION_STATE_BACKEND, a cached agent that another worker has moved on
+    from is rebuilt, and a rebuilt agent is warmed with the document state that was shared.
+    Shared-state reads run on a worker thread.
     """
-    if session_id in _agent_cache:
-        cached_agent, cached_model_id = _agent_cache[session_id]
+    state = await asyncio.to_thread(shared_state.get, session_id)
+    if state is not None and state["worker"] != worker_id:
+        logger.info("Session %s was last served by worker %s (revision %d)", session_id, state["worker"], state["revision"])
+
+    cached = _agent_cache.get(session_id)
+    if cached is not None and _is_stale(cached[0], state):
+        # Another worker ran turns since — the history held here is stale
+        logger.info("Session %s: cached agent is stale, rebuilding from the session store", session_id)
+        _agent_cache.pop(session_id)
+        cached = None
+    paragraphs = None
+    if cached is None and state is not None:
+        paragraphs = await asyncio.to_thread(shared_state.get_document, session_id, state)
+        # Another request may have built the agent meanwhile
+        cached = _agent_cache.get(session_id)
+    if cached is not None:
+        cached_agent, cached_model_id = cached
         if cached_model_id != model_id:
-            # Swap the model in place — keeps session history intact
-            cached_agent.model = create_litellm_model(model_id)
-            _agent_cache[session_id] = (cached_agent, model_id)
+            set_agent_model(session_id, cached_agent, model_id)
+        if getattr(cached_agent, "_mcp_generation", None) != mcp_pool.generation:
+            mcp_pool.sync_agent_tools(cached_agent)
+        system_prompt = skill_registry.system_prompt()
+        if getattr(cached_agent, "_skills_generation", None) != skill_registry.generation:
+            cached_agent.system_prompt = system_prompt
+            cached_agent._skills_generation = skill_registry.generation
         return cached_agent
 
-    model = create_litellm_model(model_id)
-    session_manager = FileSessionManager(
-        session_id=session_id,
-        storage_dir=SESSIONS_DIR,
-    )
+    model = _model_factory(model_id)
+    session_manager = session_store.create_session_manager(session_id)
     agent = Agent(
         model=model,
-        system_prompt=[
-            SystemContentBlock(text=REDLINER_PROMPT),
-            SystemContentBlock(text=list_skills()),
-            SystemContentBlock(cachePoint={"type": "default"}),
-        ],
-        tools=ALL_TOOLS,
+        # Prebuilt by the skill registry: prompt, skills (some inlined) and a cache point
+        system_prompt=skill_registry.system_prompt(),
+        tools=get_tools() + mcp_pool.get_tools(),
+        hooks=[ToolConsentHook(), PendingTurnHook()],
         session_manager=session_manager,
     )
-    _agent_cache[session_id] = (agent, model_id)
+    agent._mcp_generation = mcp_pool.generation
+    agent._skills_generation = skill_registry.generation
+    if state is not None:
+        shared_state.warm(agent, state, paragraphs)
+    _agent_cache.put(session_id, agent, model_id)
     return agent
 
 
+def publish_agent_state(session_id: str, agent: Agent, model_id: str) -> None:
+    """Share the agent's revision and document state after a turn, for other workers. Blocking."""
+    try:
+        shared_state.publish(session_id, agent, model_id)
+    except Exception as e:
+        # The turn is already stored — other workers fall back to resending the full document
+        logger.warning("Session %s: could not publish shared state: %s", session_id, e)
+
+
+def set_agent_model(session_id: str, agent: Agent, model_id: str) -> None:
+    """Swap the agent's model in place — keeps session history intact."""
+    agent.model = _model_factory(model_id)
+    _agent_cache.put(session_id, agent, model_id)
+
+
 def evict_agent(session_id: str) -> None:
     """Remove an agent from the in-memory cache."""
-    if session_id in _agent_cache:
-        del _agent_cache[session_id]
+    _agent_cache.pop(session_id)
+
+
+def get_cache_stats() -> dict:
+    """Entry/byte usage, hit/miss and eviction counters for the agent cache."""
+    return _agent_cache.stats()
+
+
+_sweep_task: asyncio.Task | None = None
+
+
+async def _sweep_loop(interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        _agent_cache.evict_expired()
+
+
+def start_cache_sweeps(interval: float = AGENT_CACHE_SWEEP_SECONDS) -> None:
+    """Drop idle agents periodically — otherwise the idle TTL only applies when a request arrives."""
+    global _sweep_task
+    if _sweep_task is None and interval > 0 and _agent_cache.idle_ttl:
+        _sweep_task = asyncio.create_task(_sweep_loop(interval))
+
+
+def stop_cache_sweeps() -> None:
+    global _sweep_task
+    if _sweep_task is not None:
+        _sweep_task.cancel()
+        _sweep_task = None
@@ -1,77 +1,61 @@
 import json
 import logging
 from pathlib import Path
-from typing import List
+from typing import Dict
 
 logger = logging.getLogger(__name__)
 
+MCP_CONFIG_PATH = Path(__file__).parent.parent.parent / "config" / "mcp.json"
 
-def load_mcp_clients() -> List:
+
+def load_mcp_server_configs() -> Dict[str, dict]:
     """
-    Load MCP clients from config/mcp.json.
-    Returns a list of MCPClient instances (or empty list if no config or errors).
+    Load enabled MCP server configs from config/mcp.json.
+    Returns {server_name: server_config} (or empty dict if no config or errors).
     """
-    config_path = Path(__file__).parent.parent.parent / "config" / "mcp.json"
-    logger.info("Loading MCP clients from: %s", config_path)
+    logger.info("Loading MCP servers from: %s", MCP_CONFIG_PATH)
 
-    if not config_path.exists():
-        logger.warning("No mcp.json found at %s — skipping MCP servers", config_path)
-        return []
+    if not MCP_CONFIG_PATH.exists():
+        logger.warning("No mcp.json found at %s — skipping MCP servers", MCP_CONFIG_PATH)
+        return {}
 
     try:
-        with open(config_path, "r") as f:
+        with open(MCP_CONFIG_PATH, "r") as f:
             config = json.load(f)
+    except Exception as e:
+        logger.error("Failed to load mcp.json: %s", str(e), exc_info=True)
+        return {}
 
-        mcp_servers = config.get("mcpServers", {})
-        logger.info("Found %d MCP server(s) in config", len(mcp_servers))
-
-        if not mcp_servers:
-            logger.info("No MCP servers configured in mcp.json")
-            return []
-
-        # Import MCP dependencies only if we have servers configured
-        try:
-            from mcp import stdio_client, StdioServerParameters
-            from strands.tools.mcp import MCPClient
-            logger.info("MCP dependencies imported successfully")
-        except ImportError as e:
-            logger.error("Failed to import MCP dependencies: %s. Run 'uv add mcp' to install.", str(e))
-            return []
-
-        clients = []
-        for server_name, server_config in mcp_servers.items():
-            try:
-                # Skip disabled servers (default to enabled if not specified)
-                enabled = server_config.get("enabled", True)
-                if not enabled:
-                    logger.info("Skipping disabled MCP server: %s", server_name)
-                    continue
+    mcp_servers = config.get("mcpServers", {})
+    logger.info("Found %d MCP server(s) in config", len(mcp_servers))
 
-                command = server_config["command"]
-                args = server_config.get("args", [])
-                env = server_config.get("env", None)
+    servers = {}
+    for server_name, server_config in mcp_servers.items():
+        # Skip disabled servers (default to enabled if not specified)
+        if not server_config.get("enabled", True):
+            logger.info("Skipping disabled MCP server: %s", server_name)
+            continue
+        if "command" not in server_config:
+            logger.error("Failed to load MCP server '%s': missing 'command'", server_name)
+            continue
+        servers[server_name] = server_config
 
-                # Create MCPClient with stdio connection
-                mcp_client = MCPClient(
-                    lambda cmd=command, a=args, e=env: stdio_client(
-                        StdioServerParameters(
-                            command=cmd,
-                            args=a,
-                            env=e
-                        )
-                    )
-                )
+    return servers
 
-                clients.append(mcp_client)
-                logger.info("Loaded MCP server: %s (command: %s)", server_name, command)
 
-            except Exception as e:
-                logger.error("Failed to load MCP server '%s': %s", server_name, str(e))
-                continue
+def create_mcp_client(server_config: dict, startup_timeout: int = 30):
+    """
+    Create an (unstarted) MCPClient with a stdio connection for one server config.
+    MCP dependencies are imported only when a server is actually created.
+    """
+    from mcp import stdio_client, StdioServerParameters
+    from strands.tools.mcp import MCPClient
 
-        logger.info("Successfully loaded %d MCP client(s)", len(clients))
-        return clients
+    command = server_config["command"]
+    args = server_config.get("args", [])
+    env = server_config.get("env", None)
 
-    except Exception as e:
-        logger.error("Failed to load mcp.json: %s", str(e), exc_info=True)
-        return []
+    return MCPClient(
+        lambda: stdio_client(StdioServerParameters(command=command, args=args, env=env)),
+        startup_timeout=startup_timeout,
+    )
@@ -0,0 +1,410 @@
+"""
+Shared pool of MCP server connections.
+
+Servers from config/mcp.json are started by the startup warm-up, or in the background the
+first time an agent asks for MCP tools — never on the event loop — and then shared by every
+session. Agents created before a server is up get its tools on their next request (the pool
+generation is bumped when a server starts). A server that fails to start is retried with
+exponential backoff rather than on every new session.
+
+Agents get lightweight proxy tools that look up the live client on each call, so a crashed
+server is restarted on the next call (or by the periodic health check) without rebuilding
+any agent. Liveness is tracked here, through public MCPClient calls only: a server is marked
+dead when a call finds its session closed or the health check's list_tools ping fails.
+
+Hot reload only stops the servers whose config changed or was removed. Cached agents pick
+up the new tool set on their next request via `sync_agent_tools`.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Any, Callable
+from strands.tools.mcp.mcp_client import MCPClientInitializationError
+from strands.tools.registry import ToolRegistry
+from strands.types._events import ToolResultEvent
+from strands.types.tools import AgentTool, ToolGenerator, ToolSpec, ToolUse
+from agent.mcp_loader import load_mcp_server_configs, create_mcp_client
+from config import (
+    MCP_STARTUP_TIMEOUT_SECONDS,
+    MCP_HEALTH_CHECK_SECONDS,
+    MCP_RETRY_BACKOFF_SECONDS,
+    MCP_RETRY_BACKOFF_MAX_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _fingerprint(server_config: dict) -> str:
+    return hashlib.sha256(json.dumps(server_config, sort_keys=True).encode()).hexdigest()
+
+
+class McpServer:
+    """One configured server: its client (once started) and the tools it advertised."""
+
+    def __init__(self, name: str, config: dict, startup_timeout: int, backoff: float = 0, backoff_max: float = 0):
+        self.name = name
+        self.config = config
+        self.fingerprint = _fingerprint(config)
+        self.startup_timeout = startup_timeout
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.client = None
+        self.tools: list["PooledMcpTool"] = []
+        self.restarts = 0
+        self.last_error: str | None = None
+        # Consecutive failed starts, and when the next attempt is allowed
+        self.failures = 0
+        self.retry_at = 0.0
+        # Cleared when a call or ping finds the session gone; the next use restarts the server
+        self._alive = False
+        self._lock = threading.Lock()
+
+    @property
+    def started(self) -> bool:
+        return self.client is not None
+
+    def is_alive(self) -> bool:
+        return self.client is not None and self._alive
+
+    def mark_dead(self, reason: str) -> None:
+        if self._alive:
+            logger.warning("MCP server '%s' connection lost: %s", self.name, reason)
+        self._alive = False
+
+    def ping(self) -> bool:
+        """Check the connection with a list_tools request. Blocking. Marks the server dead on failure."""
+        client = self.client
+        if client is None or not self._alive:
+            return False
+        try:
+            client.list_tools_sync()
+        except Exception as e:
+            self.mark_dead(str(e))
+            return False
+        return True
+
+    def retry_in(self) -> float:
+        """Seconds until a failed server may be started again (0 if it may be now)."""
+        return max(0.0, self.retry_at - time.monotonic())
+
+    def ensure_started(self, pool: "McpClientPool"):
+        """Start the server (or restart it after a crash) and return the live client. Blocking."""
+        with self._lock:
+            if self.is_alive():
+                return self.client
+            if self.client is not None:
+                logger.warning("MCP server '%s' is not running — restarting", self.name)
+                self.restarts += 1
+                self._stop_client()
+            if self.retry_in():
+                raise RuntimeError(f"failed to start ({self.last_error}), retrying in {self.retry_in():.0f}s")
+
+            client = create_mcp_client(self.config, self.startup_timeout)
+            try:
+                client.start()
+                tools, token = [], None
+                while True:
+                    page = client.list_tools_sync(token)
+                    tools.extend(PooledMcpTool(pool, self.name, mcp_agent_tool.mcp_tool) for mcp_agent_tool in page)
+                    token = page.pagination_token
+                    if token is None:
+                        break
+            except Exception as e:
+                self.last_error = str(e)
+                self.failures += 1
+                if self.backoff > 0:
+                    self.retry_at = time.monotonic() + min(self.backoff * 2 ** (self.failures - 1), self.backoff_max)
+                try:
+                    client.stop(None, None, None)
+                except Exception:
+                    pass
+                raise
+
+            self.client, self.tools, self.last_error = client, tools, None
+            self._alive = True
+            self.failures, self.retry_at = 0, 0.0
+            logger.info("Started MCP server '%s' with %d tool(s)", self.name, len(tools))
+            return client
+
+    def stop(self) -> None:
+        with self._lock:
+            self._stop_client()
+
+    def _stop_client(self) -> None:
+        self._alive = False
+        if self.client is None:
+            return
+        try:
+            self.client.stop(None, None, None)
+        except Exception as e:
+            # stop() re-raises the error that closed the connection — the client is stopped regardless
+            logger.debug("MCP server '%s' stopped with error: %s", self.name, str(e))
+        self.client = None
+
+
+class PooledMcpTool(AgentTool):
+    """Agent-facing MCP tool that resolves its server's client from the pool on every call."""
+
+    def __init__(self, pool: "McpClientPool", server_name: str, mcp_tool: Any):
+        super().__init__()
+        self.pool = pool
+        self.server_name = server_name
+        self.mcp_tool = mcp_tool
+
+    @property
+    def tool_name(self) -> str:
+        return self.mcp_tool.name
+
+    @property
+    def tool_spec(self) -> ToolSpec:
+        spec: ToolSpec = {
+            "inputSchema": {"json": self.mcp_tool.inputSchema},
+            "name": self.tool_name,
+            "description": self.mcp_tool.description or f"Tool which performs {self.mcp_tool.name}",
+        }
+        if self.mcp_tool.outputSchema:
+            spec["outputSchema"] = {"json": self.mcp_tool.outputSchema}
+        return spec
+
+    @property
+    def tool_type(self) -> str:
+        return "python"
+
+    async def stream(self, tool_use: ToolUse, invocation_state: dict[str, Any], **kwargs: Any) -> ToolGenerator:
+        try:
+            client = await asyncio.to_thread(self.pool.client_for, self.server_name)
+        except Exception as e:
+            logger.error("MCP server '%s' unavailable for tool %s: %s", self.server_name, self.tool_name, str(e))
+            yield ToolResultEvent({
+                "toolUseId": tool_use["toolUseId"],
+                "status": "error",
+                "content": [{"text": f"MCP server '{self.server_name}' is unavailable: {e}"}],
+            })
+            return
+
+        try:
+            result = await client.call_tool_async(
+                tool_use_id=tool_use["toolUseId"],
+                name=self.mcp_tool.name,
+                arguments=tool_use["input"],
+            )
+        except MCPClientInitializationError as e:
+            # The session closed since the last check — restart the server on the next call
+            self.pool.mark_dead(self.server_name, str(e))
+            result = {
+                "toolUseId": tool_use["toolUseId"],
+                "status": "error",
+                "content": [{"text": f"MCP server '{self.server_name}' disconnected: {e}. Try the call again."}],
+            }
+        yield ToolResultEvent(result)
+
+
+# ToolRegistry has no public way to list tool objects or remove a single tool. These two helpers
+# are the only code that touches its internals (the `registry` and `dynamic_tools` dicts, as of
+# strands-agents 1.24); tests/test_mcp_pool.py runs them against the installed version.
+def _registry_dicts(registry: ToolRegistry) -> tuple[dict, dict]:
+    tools, dynamic = getattr(registry, "registry", None), getattr(registry, "dynamic_tools", None)
+    if not isinstance(tools, dict) or not isinstance(dynamic, dict):
+        raise RuntimeError("Unsupported strands ToolRegistry layout — MCP tools cannot be synced")
+    return tools, dynamic
+
+
+def _registered_mcp_tools(registry: ToolRegistry) -> dict[str, PooledMcpTool]:
+    tools, _ = _registry_dicts(registry)
+    return {name: tool for name, tool in tools.items() if isinstance(tool, PooledMcpTool)}
+
+
+def _unregister_tool(registry: ToolRegistry, name: str) -> None:
+    tools, dynamic = _registry_dicts(registry)
+    tools.pop(name, None)
+    dynamic.pop(name, None)
+
+
+class McpClientPool:
+    def __init__(
+        self,
+        config_loader: Callable[[], dict[str, dict]] = load_mcp_server_configs,
+        startup_timeout: int = 30,
+        health_check_interval: float = 30.0,
+        retry_backoff: float = 5.0,
+        retry_backoff_max: float = 300.0,
+    ):
+        self.config_loader = config_loader
+        self.startup_timeout = startup_timeout
+        self.health_check_interval = health_check_interval
+        self.retry_backoff = retry_backoff
+        self.retry_backoff_max = retry_backoff_max
+        # Bumped when the server set changes or a server starts, so cached agents know to resync
+        self.generation = 0
+        self._servers: dict[str, McpServer] | None = None
+        self._lock = threading.Lock()
+        self._health_task: asyncio.Task | None = None
+        # Servers being started in the background, by name
+        self._starting: dict[str, Future] = {}
+        self._executor = ThreadPoolExecutor(thread_name_prefix="mcp-start")
+
+    def _new_server(self, name: str, config: dict) -> McpServer:
+        return McpServer(name, config, self.startup_timeout, self.retry_backoff, self.retry_backoff_max)
+
+    def _get_servers(self) -> dict[str, McpServer]:
+        with self._lock:
+            if self._servers is None:
+                self._servers = {name: self._new_server(name, config) for name, config in self.config_loader().items()}
+            return self._servers
+
+    def _start_pending(self) -> list[Future]:
+        """Start, in the background, every server that is not running, not starting and not backing off."""
+        futures = []
+        for server in self._get_servers().values():
+            with self._lock:
+                future = self._starting.get(server.name)
+                if future is None and not server.started and not server.retry_in():
+                    future = self._starting[server.name] = self._executor.submit(self._start, server)
+            if future is not None:
+                futures.append(future)
+        return futures
+
+    def _start(self, server: McpServer) -> None:
+        try:
+            server.ensure_started(self)
+        except Exception as e:
+            logger.error("Failed to start MCP server '%s' (retry in %.0fs): %s", server.name, server.retry_in(), str(e))
+        else:
+            with self._lock:
+                # Agents created while it was starting pick up its tools on their next request
+                self.generation += 1
+        finally:
+            with self._lock:
+                self._starting.pop(server.name, None)
+
+    def start_servers(self) -> None:
+        """Start every server in parallel and wait for them. Blocking — used by the startup warm-up."""
+        wait(self._start_pending())
+
+    def get_tools(self) -> list[PooledMcpTool]:
+        """Proxy tools of the running servers. Servers not running yet are started in the background."""
+        self._start_pending()
+        tools = []
+        for server in self._get_servers().values():
+            tools.extend(server.tools)
+        return tools
+
+    def client_for(self, server_name: str):
+        """The live client for a server, restarting it if it crashed. Blocking."""
+        server = self._get_servers().get(server_name)
+        if server is None:
+            raise KeyError(f"MCP server '{server_name}' is no longer configured")
+        return server.ensure_started(self)
+
+    def mark_dead(self, server_name: str, reason: str) -> None:
+        server = self._get_servers().get(server_name)
+        if server is not None:
+            server.mark_dead(reason)
+
+    def sync_agent_tools(self, agent: Any) -> None:
+        """Bring a cached agent's MCP tools in line with the current pool (after a reload)."""
+        registry = agent.tool_registry
+        tools = {tool.tool_name: tool for tool in self.get_tools()}
+        registered = _registered_mcp_tools(registry)
+        for name in registered.keys() - tools.keys():
+            _unregister_tool(registry, name)
+        for name, tool in tools.items():
+            if name in registered:
+                registry.replace(tool)
+            else:
+                try:
+                    registry.register_tool(tool)
+                except ValueError as e:
+                    logger.error("Skipping MCP tool %s from '%s': %s", name, tool.server_name, str(e))
+        agent._mcp_generation = self.generation
+
+    def reload(self) -> dict[str, list[str]]:
+        """
+        Re-read config/mcp.json and stop only the servers that were removed or changed.
+        Changed and added servers start lazily on next use; unchanged ones keep running.
+        """
+        configs = self.config_loader()
+        current = self._get_servers()
+        result = {"added": [], "removed": [], "changed": [], "unchanged": []}
+
+        servers = {}
+        for name, config in configs.items():
+            existing = current.get(name)
+            if existing is not None and existing.fingerprint == _fingerprint(config):
+                servers[name] = existing
+                result["unchanged"].append(name)
+            else:
+                servers[name] = self._new_server(name, config)
+                result["changed" if existing is not None else "added"].append(name)
+        result["removed"] = [name for name in current if name not in configs]
+
+        with self._lock:
+            self._servers = servers
+            if result["added"] or result["removed"] or result["changed"]:
+                self.generation += 1
+
+        for name in result["removed"] + result["changed"]:
+            current[name].stop()
+
+        logger.info("MCP servers reloaded: %s", result)
+        return result
+
+    def status(self) -> list[dict]:
+        return [
+            {
+                "name": server.name,
+                "started": server.started,
+                "alive": server.is_alive(),
+                "tools": len(server.tools),
+                "restarts": server.restarts,
+                "last_error": server.last_error,
+                "retry_in_seconds": round(server.retry_in(), 1),
+            }
+            for server in self._get_servers().values()
+        ]
+
+    async def check_health(self) -> None:
+        """Ping started servers and restart the ones whose connection died, so the next tool call does not pay for it."""
+        for server in list(self._get_servers().values()):
+            if server.started and server.is_alive():
+                try:
+                    await asyncio.wait_for(asyncio.to_thread(server.ping), server.startup_timeout)
+                except TimeoutError:
+                    server.mark_dead(f"no answer to list_tools within {server.startup_timeout}s")
+            if server.started and not server.is_alive():
+                try:
+                    await asyncio.to_thread(server.ensure_started, self)
+                except Exception as e:
+                    logger.error("Failed to restart MCP server '%s': %s", server.name, str(e))
+
+    async def _health_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.health_check_interval)
+            try:
+                await self.check_health()
+            except Exception as e:
+                logger.error("MCP health check failed: %s", str(e))
+
+    def start_health_checks(self) -> None:
+        if self._health_task is None and self.health_check_interval > 0:
+            self._health_task = asyncio.create_task(self._health_loop())
+
+    async def close(self) -> None:
+        if self._health_task is not None:
+            self._health_task.cancel()
+            self._health_task = None
+        servers = list(self._servers.values()) if self._servers else []
+        await asyncio.gather(*(asyncio.to_thread(server.stop) for server in servers))
+
+
+mcp_pool = McpClientPool(
+    startup_timeout=MCP_STARTUP_TIMEOUT_SECONDS,
+    health_check_interval=MCP_HEALTH_CHECK_SECONDS,
+    retry_backoff=MCP_RETRY_BACKOFF_SECONDS,
+    retry_backoff_max=MCP_RETRY_BACKOFF_MAX_SECONDS,
+)
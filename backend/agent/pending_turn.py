@@ -0,0 +1,52 @@
+"""
+Per-turn agent state that only takes effect once the user message is in the history.
+
+/invoke builds the user message (full document, delta, outline or "unchanged" note) and
+the document state that goes with it before it waits for a model slot. If the request is
+cancelled while queued, or fails before the message is appended, none of that may stick —
+the next turn would send "unchanged" or a delta against a document the model never saw,
+after compacting away the copy it did see. So the state is staged on the agent and
+PendingTurnHook applies it, and compacts the history, when the message is added.
+"""
+
+import asyncio
+from dataclasses import dataclass, field
+from strands.hooks import HookProvider, HookRegistry, MessageAddedEvent
+from agent.compaction import compact_history
+
+
+@dataclass
+class PendingTurn:
+    # Content blocks of the user message — matched by identity when Strands appends it
+    content: list[dict]
+    # Agent attributes to set once the message is added (_last_doc_hash, _document_index, ...)
+    doc_state: dict = field(default_factory=dict)
+    # The message carries a full snapshot, so every copy already in the history is stale
+    new_snapshot: bool = False
+
+
+def stage_turn(agent, turn: PendingTurn) -> None:
+    agent._pending_turn = turn
+
+
+def discard_turn(agent) -> bool:
+    """Drop a turn whose message was never added. Returns True if there was one."""
+    return agent.__dict__.pop("_pending_turn", None) is not None
+
+
+class PendingTurnHook(HookProvider):
+    """Applies the staged turn when its user message is added to the agent's history."""
+
+    def register_hooks(self, registry: HookRegistry, **kwargs) -> None:
+        registry.add_callback(MessageAddedEvent, self._on_message_added)
+
+    async def _on_message_added(self, event: MessageAddedEvent) -> None:
+        agent = event.agent
+        turn = getattr(agent, "_pending_turn", None)
+        if turn is None or event.message.get("content") is not turn.content:
+            return
+        discard_turn(agent)
+        for name, value in turn.doc_state.items():
+            setattr(agent, name, value)
+        # Registered after the session manager, so the message is already stored too
+        await asyncio.to_thread(compact_history, agent, turn.new_snapshot)
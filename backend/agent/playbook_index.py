@@ -0,0 +1,142 @@
+"""
+In-process BM25 index over the markdown playbooks in backend/playbooks/.
+
+Each playbook is split into heading-level chunks so a search returns only the relevant
+clauses. The index is built at startup and rebuilt on the next search after any
+playbook file is added, removed or modified (checked by mtime). A rebuild publishes a new
+immutable snapshot in one assignment, so a concurrent search sees either the old index or
+the new one, never a mix.
+"""
+
+import logging
+import math
+import os
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
+
+logger = logging.getLogger(__name__)
+
+PLAYBOOKS_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "playbooks"))
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+HEADING_RE = re.compile(r"^(#{1,6})\s+(.*)$")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have if in into is it its of on or shall that the their "
+    "this to was were will with without".split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+    return [token for token in TOKEN_RE.findall(text.lower()) if token not in STOPWORDS]
+
+
+def split_sections(filename: str, content: str) -> list[dict]:
+    """Split a markdown playbook into one chunk per heading, keeping the document title as context."""
+    title = os.path.splitext(filename)[0]
+    sections = []
+    heading, lines = None, []
+
+    def flush():
+        body = "\n".join(lines).strip()
+        if body:
+            sections.append({"file": filename, "title": title, "heading": heading or title, "text": body})
+
+    for line in content.splitlines():
+        match = HEADING_RE.match(line)
+        if match:
+            if len(match.group(1)) == 1:
+                # Top-level heading is the playbook title, not a clause
+                title = match.group(2).strip()
+                continue
+            flush()
+            heading, lines = match.group(2).strip(), []
+        else:
+            lines.append(line)
+    flush()
+    return sections
+
+
+@dataclass(frozen=True)
+class _Snapshot:
+    signature: tuple = ()
+    sections: list[dict] = field(default_factory=list)
+    term_freqs: list[Counter] = field(default_factory=list)
+    lengths: list[int] = field(default_factory=list)
+    idf: dict[str, float] = field(default_factory=dict)
+    avg_length: float = 0.0
+
+
+class PlaybookIndex:
+    def __init__(self, playbooks_dir: str, k1: float = 1.5, b: float = 0.75):
+        self.playbooks_dir = playbooks_dir
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.Lock()
+        self._snapshot = _Snapshot()
+
+    def _current_signature(self) -> tuple:
+        if not os.path.isdir(self.playbooks_dir):
+            return ()
+        return tuple(
+            sorted(
+                (entry.name, entry.stat().st_mtime_ns)
+                for entry in os.scandir(self.playbooks_dir)
+                if entry.name.endswith(".md")
+            )
+        )
+
+    def _is_current(self, signature: tuple) -> bool:
+        # An empty or missing directory matches the initial empty snapshot, so it is never rebuilt
+        return signature == self._snapshot.signature
+
+    def refresh(self) -> None:
+        """Rebuild the index if any playbook changed since the last build."""
+        signature = self._current_signature()
+        if self._is_current(signature):
+            return
+        with self._lock:
+            if self._is_current(signature):
+                return
+            sections = []
+            for filename, _ in signature:
+                with open(os.path.join(self.playbooks_dir, filename), "r", encoding="utf-8") as f:
+                    sections.extend(split_sections(filename, f.read()))
+
+            term_freqs = [Counter(tokenize(f"{s['title']} {s['heading']} {s['text']}")) for s in sections]
+            lengths = [sum(tf.values()) for tf in term_freqs]
+            doc_freqs = Counter(term for tf in term_freqs for term in tf)
+            n = len(sections)
+
+            self._snapshot = _Snapshot(
+                signature=signature,
+                sections=sections,
+                term_freqs=term_freqs,
+                lengths=lengths,
+                idf={term: math.log(1 + (n - df + 0.5) / (df + 0.5)) for term, df in doc_freqs.items()},
+                avg_length=(sum(lengths) / n) if n else 0.0,
+            )
+            logger.info("Playbook index built: %d file(s), %d section(s)", len(signature), n)
+
+    def search(self, query: str, top_k: int = 3) -> list[tuple[float, dict]]:
+        """Top-k (score, section) pairs for the query, best first."""
+        self.refresh()
+        # Read once — a concurrent refresh replaces the snapshot, never mutates it
+        snapshot = self._snapshot
+        terms = tokenize(query)
+        scores = []
+        for i, tf in enumerate(snapshot.term_freqs):
+            score = 0.0
+            norm = self.k1 * (1 - self.b + self.b * snapshot.lengths[i] / (snapshot.avg_length or 1))
+            for term in terms:
+                freq = tf.get(term)
+                if freq:
+                    score += snapshot.idf[term] * freq * (self.k1 + 1) / (freq + norm)
+            if score > 0:
+                scores.append((score, i))
+        scores.sort(reverse=True)
+        return [(score, snapshot.sections[i]) for score, i in scores[:top_k]]
+
+
+playbook_index = PlaybookIndex(PLAYBOOKS_DIR)
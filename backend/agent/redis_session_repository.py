@@ -0,0 +1,141 @@
+"""
+Redis implementation of the Strands SessionRepository, for sessions shared between hosts.
+
+Keys (under a prefix):
+  session:{id}                    session JSON
+  agent:{id}:{agent_id}           agent JSON
+  messages:{id}:{agent_id}        hash of message_id -> message JSON
+  multi_agent:{id}:{multi_id}     multi-agent state JSON
+  sessions                        sorted set of "{created_at}\t{session_id}" (all scores 0),
+                                  read newest first with ZREVRANGEBYLEX for /sessions paging
+
+Works with a redis-py client created with decode_responses=True, or FakeRedis.
+"""
+
+import json
+from typing import Any
+from strands.session.session_repository import SessionRepository
+from strands.types.exceptions import SessionException
+from strands.types.session import Session, SessionAgent, SessionMessage
+from agent.session_index import decode_cursor, encode_cursor
+
+
+class RedisSessionRepository(SessionRepository):
+    def __init__(self, client, prefix: str = ""):
+        self.client = client
+        self.prefix = prefix
+
+    def _key(self, *parts: str) -> str:
+        return self.prefix + ":".join(parts)
+
+    # --- SessionRepository ---
+
+    def create_session(self, session: Session, **kwargs: Any) -> Session:
+        # SET NX so two workers creating the same session cannot both succeed
+        if not self.client.set(self._key("session", session.session_id), json.dumps(session.to_dict()), nx=True):
+            raise SessionException(f"Session {session.session_id} already exists")
+        self.client.zadd(self._key("sessions"), {f"{session.created_at}\t{session.session_id}": 0})
+        return session
+
+    def read_session(self, session_id: str, **kwargs: Any) -> Session | None:
+        data = self.client.get(self._key("session", session_id))
+        return Session.from_dict(json.loads(data)) if data else None
+
+    def delete_session(self, session_id: str, **kwargs: Any) -> bool:
+        data = self.client.get(self._key("session", session_id))
+        if data is None:
+            return False
+        self.client.zrem(self._key("sessions"), f"{json.loads(data)['created_at']}\t{session_id}")
+        keys = [self._key("session", session_id)]
+        for pattern in ("agent", "messages", "multi_agent"):
+            keys += self.client.scan_iter(match=self._key(pattern, session_id, "*"))
+        self.client.delete(*keys)
+        return True
+
+    def create_agent(self, session_id: str, session_agent: SessionAgent, **kwargs: Any) -> None:
+        self.client.set(self._key("agent", session_id, session_agent.agent_id), json.dumps(session_agent.to_dict()))
+
+    def read_agent(self, session_id: str, agent_id: str, **kwargs: Any) -> SessionAgent | None:
+        data = self.client.get(self._key("agent", session_id, agent_id))
+        return SessionAgent.from_dict(json.loads(data)) if data else None
+
+    def update_agent(self, session_id: str, session_agent: SessionAgent, **kwargs: Any) -> None:
+        previous_agent = self.read_agent(session_id, session_agent.agent_id)
+        if previous_agent is None:
+            raise SessionException(f"Agent {session_agent.agent_id} in session {session_id} does not exist")
+        session_agent.created_at = previous_agent.created_at
+        self.create_agent(session_id, session_agent)
+
+    def create_message(self, session_id: str, agent_id: str, session_message: SessionMessage, **kwargs: Any) -> None:
+        self.client.hset(
+            self._key("messages", session_id, agent_id),
+            str(session_message.message_id),
+            json.dumps(session_message.to_dict()),
+        )
+
+    def read_message(self, session_id: str, agent_id: str, message_id: int, **kwargs: Any) -> SessionMessage | None:
+        data = self.read_message_dict(session_id, agent_id, message_id)
+        return SessionMessage.from_dict(data) if data else None
+
+    def update_message(self, session_id: str, agent_id: str, session_message: SessionMessage, **kwargs: Any) -> None:
+        previous_message = self.read_message(session_id, agent_id, session_message.message_id)
+        if previous_message is None:
+            raise SessionException(f"Message {session_message.message_id} does not exist")
+        session_message.created_at = previous_message.created_at
+        self.create_message(session_id, agent_id, session_message)
+
+    def list_messages(
+        self, session_id: str, agent_id: str, limit: int | None = None, offset: int = 0, **kwargs: Any
+    ) -> list[SessionMessage]:
+        messages = self.client.hgetall(self._key("messages", session_id, agent_id))
+        message_ids = sorted(int(message_id) for message_id in messages)[offset:]
+        if limit is not None:
+            message_ids = message_ids[:limit]
+        return [SessionMessage.from_dict(json.loads(messages[str(message_id)])) for message_id in message_ids]
+
+    def create_multi_agent(self, session_id: str, multi_agent: Any, **kwargs: Any) -> None:
+        self.client.set(self._key("multi_agent", session_id, multi_agent.id), json.dumps(multi_agent.serialize_state()))
+
+    def read_multi_agent(self, session_id: str, multi_agent_id: str, **kwargs: Any) -> dict[str, Any] | None:
+        data = self.client.get(self._key("multi_agent", session_id, multi_agent_id))
+        return json.loads(data) if data else None
+
+    def update_multi_agent(self, session_id: str, multi_agent: Any, **kwargs: Any) -> None:
+        if self.read_multi_agent(session_id, multi_agent.id) is None:
+            raise SessionException(f"MultiAgent state {multi_agent.id} in session {session_id} does not exist")
+        self.create_multi_agent(session_id, multi_agent)
+
+    # --- Queries used by the /sessions routes ---
+
+    def page_sessions(self, limit: int | None = None, cursor: str | None = None) -> tuple[list[dict], str | None]:
+        """Sessions newest first, with the same cursors as the SQLite session index."""
+        upper = "+"
+        if cursor:
+            created_at, session_id = decode_cursor(cursor)
+            upper = f"({created_at}\t{session_id}"
+        if limit is None:
+            members = self.client.zrevrangebylex(self._key("sessions"), upper, "-")
+        else:
+            members = self.client.zrevrangebylex(self._key("sessions"), upper, "-", start=0, num=limit + 1)
+
+        rows = [member.split("\t", 1) for member in members]
+        next_cursor = None
+        if limit is not None and len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(*rows[-1])
+        return [{"session_id": sid, "created_at": created_at} for created_at, sid in rows], next_cursor
+
+    def list_message_ids(
+        self, session_id: str, agent_id: str, limit: int | None = None, before_id: int | None = None
+    ) -> list[int]:
+        """The latest `limit` message ids below `before_id`, in ascending order."""
+        message_ids = sorted(int(message_id) for message_id in self.client.hkeys(self._key("messages", session_id, agent_id)))
+        if before_id is not None:
+            message_ids = [message_id for message_id in message_ids if message_id < before_id]
+        if limit is not None:
+            message_ids = message_ids[-limit:]
+        return message_ids
+
+    def read_message_dict(self, session_id: str, agent_id: str, message_id: int) -> dict | None:
+        data = self.client.hget(self._key("messages", session_id, agent_id), str(message_id))
+        return json.loads(data) if data else None
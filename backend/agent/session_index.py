@@ -0,0 +1,118 @@
+"""
+SQLite index of file-backed sessions, so listing history never opens every session.json.
+
+FileSessionStore keeps the index up to date when session managers are created and when
+sessions are deleted. On first use it is back-filled once from the sessions directory.
+Methods are blocking — call them from a worker thread in async handlers.
+"""
+
+import base64
+import json
+import logging
+import os
+import sqlite3
+import threading
+
+logger = logging.getLogger(__name__)
+
+SESSION_PREFIX = "session_"
+
+
+def encode_cursor(created_at: str, session_id: str) -> str:
+    return base64.urlsafe_b64encode(json.dumps([created_at, session_id]).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[str, str]:
+    try:
+        created_at, session_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return str(created_at), str(session_id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+class SessionIndex:
+    def __init__(self, db_path: str, sessions_dir: str):
+        self.db_path = db_path
+        self.sessions_dir = sessions_dir
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                "session_id TEXT PRIMARY KEY, created_at TEXT NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS sessions_created_at ON sessions (created_at DESC, session_id DESC)")
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            conn.commit()
+            self._conn = conn
+            if conn.execute("SELECT 1 FROM meta WHERE key = 'backfilled'").fetchone() is None:
+                self._backfill(conn)
+        return self._conn
+
+    def _backfill(self, conn: sqlite3.Connection) -> None:
+        """One-time import of sessions that existed before the index."""
+        rows = []
+        if os.path.isdir(self.sessions_dir):
+            for entry in os.listdir(self.sessions_dir):
+                session_json = os.path.join(self.sessions_dir, entry, "session.json")
+                if entry.startswith(SESSION_PREFIX) and os.path.isfile(session_json):
+                    try:
+                        with open(session_json) as f:
+                            data = json.load(f)
+                        rows.append((data["session_id"], data["created_at"]))
+                    except Exception as e:
+                        logger.warning("Skipping unreadable session %s: %s", entry, str(e))
+        conn.executemany("INSERT OR IGNORE INTO sessions (session_id, created_at) VALUES (?, ?)", rows)
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('backfilled', '1')")
+        conn.commit()
+        logger.info("Session index back-filled with %d session(s)", len(rows))
+
+    def add(self, session_id: str, created_at: str) -> None:
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR IGNORE INTO sessions (session_id, created_at) VALUES (?, ?)",
+                (session_id, created_at),
+            )
+            conn.commit()
+
+    def remove(self, session_id: str) -> None:
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+            conn.commit()
+
+    def page(self, limit: int | None = None, cursor: str | None = None) -> tuple[list[dict], str | None]:
+        """
+        Sessions newest first. Returns (sessions, next_cursor); next_cursor is None on the
+        last page. Without a limit, every session is returned in one page.
+        """
+        with self._lock:
+            return page_sessions(self._connect(), limit, cursor)
+
+
+def page_sessions(conn: sqlite3.Connection, limit: int | None, cursor: str | None) -> tuple[list[dict], str | None]:
+    """Keyset-paginate a `sessions (session_id, created_at)` table, newest first."""
+    query = "SELECT session_id, created_at FROM sessions"
+    params: list = []
+    if cursor:
+        created_at, session_id = decode_cursor(cursor)
+        query += " WHERE (created_at, session_id) < (?, ?)"
+        params += [created_at, session_id]
+    query += " ORDER BY created_at DESC, session_id DESC"
+    if limit is not None:
+        query += " LIMIT ?"
+        params.append(limit + 1)
+
+    rows = conn.execute(query, params).fetchall()
+
+    next_cursor = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1][1], rows[-1][0])
+    return [{"session_id": sid, "created_at": created_at} for sid, created_at in rows], next_cursor
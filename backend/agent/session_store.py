@@ -0,0 +1,180 @@
+"""
+Session persistence shared by the agent manager and the /sessions routes.
+
+SESSION_BACKEND selects the implementation:
+  - "file":   Strands FileSessionManager (one JSON file per message) + the SQLite session index
+  - "sqlite": a single WAL-mode SQLite database (see sqlite_session_repository)
+  - "redis":  a Redis-compatible server at REDIS_URL, for several hosts (see redis_session_repository)
+
+Existing file sessions can be copied into SQLite with scripts/migrate_sessions.py.
+Store methods are blocking — call them from a worker thread in async handlers.
+"""
+
+import json
+import os
+import shutil
+from abc import ABC, abstractmethod
+from contextlib import AbstractContextManager, nullcontext
+from strands.session.file_session_manager import FileSessionManager
+from strands.session.repository_session_manager import RepositorySessionManager
+from strands.session.session_manager import SessionManager
+from agent.session_index import SessionIndex, page_sessions
+from agent.sqlite_session_repository import SQLiteSessionRepository
+from agent.redis_session_repository import RedisSessionRepository
+from agent.shared_state import shared_redis_client
+from config import (
+    SESSION_BACKEND,
+    SESSIONS_DIR,
+    SESSION_INDEX_PATH,
+    SESSION_DB_PATH,
+    SESSION_WRITE_BATCH_SIZE,
+    SESSION_WRITE_BATCH_MAX_DELAY,
+    REDIS_KEY_PREFIX,
+)
+
+# Strands' id for an Agent created without an explicit agent_id
+DEFAULT_AGENT_ID = "default"
+
+
+class SessionStore(ABC):
+    @abstractmethod
+    def create_session_manager(self, session_id: str) -> SessionManager:
+        """Session manager that persists (and restores) the agent for this session."""
+
+    @abstractmethod
+    def list_sessions(self, limit: int | None = None, cursor: str | None = None) -> tuple[list[dict], str | None]:
+        """Sessions newest first, plus the cursor of the next page (None on the last page)."""
+
+    @abstractmethod
+    def delete_session(self, session_id: str) -> bool:
+        """Delete a session and its messages. Returns False if it did not exist."""
+
+    @abstractmethod
+    def list_message_ids(self, session_id: str, limit: int | None = None, before_id: int | None = None) -> list[int]:
+        """The latest `limit` message ids below `before_id`, in ascending order."""
+
+    @abstractmethod
+    def read_message(self, session_id: str, message_id: int) -> dict | None:
+        """A persisted message as stored (message, message_id, created_at, ...)."""
+
+    def batch(self) -> AbstractContextManager:
+        """Group the writes this thread makes inside the block into fewer commits, where supported."""
+        return nullcontext()
+
+    def flush(self) -> None:
+        """Commit writes still held by a batch. Called on shutdown."""
+
+
+class FileSessionStore(SessionStore):
+    def __init__(self, sessions_dir: str, index: SessionIndex):
+        self.sessions_dir = sessions_dir
+        self.index = index
+
+    def _messages_dir(self, session_id: str) -> str:
+        return os.path.join(self.sessions_dir, f"session_{session_id}", "agents", f"agent_{DEFAULT_AGENT_ID}", "messages")
+
+    def create_session_manager(self, session_id: str) -> SessionManager:
+        session_manager = FileSessionManager(session_id=session_id, storage_dir=self.sessions_dir)
+        self.index.add(session_id, session_manager.session.created_at)
+        return session_manager
+
+    def list_sessions(self, limit: int | None = None, cursor: str | None = None) -> tuple[list[dict], str | None]:
+        return self.index.page(limit, cursor)
+
+    def delete_session(self, session_id: str) -> bool:
+        self.index.remove(session_id)
+        session_dir = os.path.join(self.sessions_dir, f"session_{session_id}")
+        if not os.path.isdir(session_dir):
+            return False
+        shutil.rmtree(session_dir)
+        return True
+
+    def list_message_ids(self, session_id: str, limit: int | None = None, before_id: int | None = None) -> list[int]:
+        messages_dir = self._messages_dir(session_id)
+        if not os.path.isdir(messages_dir):
+            return []
+        # Ids come from filenames — no message file is opened
+        message_ids = sorted(
+            int(filename[len("message_"):-len(".json")])
+            for filename in os.listdir(messages_dir)
+            if filename.startswith("message_") and filename.endswith(".json")
+        )
+        if before_id is not None:
+            message_ids = [message_id for message_id in message_ids if message_id < before_id]
+        if limit is not None:
+            message_ids = message_ids[-limit:]
+        return message_ids
+
+    def read_message(self, session_id: str, message_id: int) -> dict | None:
+        path = os.path.join(self._messages_dir(session_id), f"message_{message_id}.json")
+        if not os.path.isfile(path):
+            return None
+        with open(path) as f:
+            return json.load(f)
+
+
+class SQLiteSessionStore(SessionStore):
+    def __init__(self, repository: SQLiteSessionRepository):
+        self.repository = repository
+
+    def create_session_manager(self, session_id: str) -> SessionManager:
+        return RepositorySessionManager(session_id=session_id, session_repository=self.repository)
+
+    def list_sessions(self, limit: int | None = None, cursor: str | None = None) -> tuple[list[dict], str | None]:
+        with self.repository.lock:
+            return page_sessions(self.repository.conn, limit, cursor)
+
+    def delete_session(self, session_id: str) -> bool:
+        return self.repository.delete_session(session_id)
+
+    def list_message_ids(self, session_id: str, limit: int | None = None, before_id: int | None = None) -> list[int]:
+        return self.repository.list_message_ids(session_id, DEFAULT_AGENT_ID, limit, before_id)
+
+    def read_message(self, session_id: str, message_id: int) -> dict | None:
+        return self.repository.read_message_dict(session_id, DEFAULT_AGENT_ID, message_id)
+
+    def batch(self) -> AbstractContextManager:
+        return self.repository.batch()
+
+    def flush(self) -> None:
+        self.repository.flush()
+
+
+class RedisSessionStore(SessionStore):
+    def __init__(self, repository: RedisSessionRepository):
+        self.repository = repository
+
+    def create_session_manager(self, session_id: str) -> SessionManager:
+        return RepositorySessionManager(session_id=session_id, session_repository=self.repository)
+
+    def list_sessions(self, limit: int | None = None, cursor: str | None = None) -> tuple[list[dict], str | None]:
+        return self.repository.page_sessions(limit, cursor)
+
+    def delete_session(self, session_id: str) -> bool:
+        return self.repository.delete_session(session_id)
+
+    def list_message_ids(self, session_id: str, limit: int | None = None, before_id: int | None = None) -> list[int]:
+        return self.repository.list_message_ids(session_id, DEFAULT_AGENT_ID, limit, before_id)
+
+    def read_message(self, session_id: str, message_id: int) -> dict | None:
+        return self.repository.read_message_dict(session_id, DEFAULT_AGENT_ID, message_id)
+
+
+def create_session_store(backend: str = SESSION_BACKEND) -> SessionStore:
+    if backend == "file":
+        return FileSessionStore(SESSIONS_DIR, SessionIndex(SESSION_INDEX_PATH, SESSIONS_DIR))
+    if backend == "sqlite":
+        os.makedirs(os.path.dirname(SESSION_DB_PATH) or ".", exist_ok=True)
+        return SQLiteSessionStore(
+            SQLiteSessionRepository(
+                SESSION_DB_PATH,
+                batch_size=SESSION_WRITE_BATCH_SIZE,
+                batch_max_delay=SESSION_WRITE_BATCH_MAX_DELAY,
+            )
+        )
+    if backend == "redis":
+        return RedisSessionStore(RedisSessionRepository(shared_redis_client(), REDIS_KEY_PREFIX))
+    raise ValueError(f"Unknown SESSION_BACKEND '{backend}'. Expected 'file', 'sqlite' or 'redis'")
+
+
+session_store = create_session_store()
@@ -0,0 +1,404 @@
+"""
+Per-session state shared between workers, for running several uvicorn workers or pods.
+
+The conversation lives in the session store (SESSION_BACKEND). This keeps the rest of what a
+worker needs to pick up a session that another worker served:
+  - a revision, bumped after every turn, so a worker notices its cached agent is stale
+  - the document the model last saw (hash and paragraphs), so a rebuilt agent keeps sending
+    deltas and has its document index, instead of re-sending the whole document
+
+SESSION_STATE_BACKEND selects where it lives:
+  - "local":  nowhere — agents only know what they saw in this process (single worker)
+  - "sqlite": a table in SESSION_STATE_DB_PATH — every worker on one host
+  - "redis":  a Redis-compatible server at REDIS_URL — any number of hosts
+              (REDIS_URL=fake:// uses the in-process FakeRedis, for tests and benchmarks)
+
+Store methods are blocking — call them from a worker thread in async handlers.
+"""
+
+import fnmatch
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from agent.document_index import DocumentIndex
+from config import (
+    SESSION_STATE_BACKEND,
+    SESSION_STATE_DB_PATH,
+    SESSION_STATE_TTL_SECONDS,
+    REDIS_URL,
+    REDIS_KEY_PREFIX,
+    WORKER_ID,
+)
+
+logger = logging.getLogger(__name__)
+
+# Identifies this process in affinity hints (x-session-worker) and in the shared state
+worker_id = WORKER_ID or f"{socket.gethostname()}:{os.getpid()}"
+
+
+class FakeRedis:
+    """
+    In-process stand-in for a redis-py client created with decode_responses=True. Implements
+    only the commands used here (strings with expiry, hashes, lexicographic sorted sets, and
+    the publish script).
+    """
+
+    def __init__(self):
+        self._data: dict[str, object] = {}
+        self._expires: dict[str, float] = {}
+        self._lock = threading.RLock()
+
+    def _live(self, key: str):
+        expires_at = self._expires.get(key)
+        if expires_at is not None and expires_at <= time.monotonic():
+            self._data.pop(key, None)
+            self._expires.pop(key, None)
+        return self._data.get(key)
+
+    def get(self, name: str) -> str | None:
+        with self._lock:
+            return self._live(name)
+
+    def set(self, name: str, value: str, ex: int | None = None, nx: bool = False) -> bool | None:
+        with self._lock:
+            if nx and self._live(name) is not None:
+                return None
+            self._data[name] = str(value)
+            if ex:
+                self._expires[name] = time.monotonic() + ex
+            else:
+                self._expires.pop(name, None)
+            return True
+
+    def delete(self, *names: str) -> int:
+        with self._lock:
+            deleted = sum(self._live(name) is not None for name in names)
+            for name in names:
+                self._data.pop(name, None)
+                self._expires.pop(name, None)
+            return deleted
+
+    def scan_iter(self, match: str = "*") -> list[str]:
+        with self._lock:
+            return [key for key in list(self._data) if self._live(key) is not None and fnmatch.fnmatchcase(key, match)]
+
+    def hset(self, name: str, key: str, value: str) -> int:
+        with self._lock:
+            fields = self._live(name)
+            if fields is None:
+                fields = self._data[name] = {}
+            added = key not in fields
+            fields[key] = str(value)
+            return int(added)
+
+    def hget(self, name: str, key: str) -> str | None:
+        with self._lock:
+            return (self._live(name) or {}).get(key)
+
+    def hgetall(self, name: str) -> dict[str, str]:
+        with self._lock:
+            return dict(self._live(name) or {})
+
+    def hkeys(self, name: str) -> list[str]:
+        with self._lock:
+            return list(self._live(name) or {})
+
+    def register_script(self, script: str):
+        """Lua is not interpreted — only PUBLISH_SCRIPT is supported, emulated under the fake's lock."""
+        if script != PUBLISH_SCRIPT:
+            raise ValueError("FakeRedis only runs PUBLISH_SCRIPT")
+
+        def publish(keys: list[str], args: list) -> int:
+            expected, revision, value, ttl = args
+            with self._lock:
+                current = self._live(keys[0])
+                if current is not None and int(current) != int(expected):
+                    return 0
+                self.set(keys[0], str(revision), ex=int(ttl) or None)
+                self.set(keys[1], value, ex=int(ttl) or None)
+                return 1
+
+        return publish
+
+    def zadd(self, name: str, mapping: dict[str, float]) -> int:
+        with self._lock:
+            members = self._live(name)
+            if members is None:
+                members = self._data[name] = {}
+            added = sum(member not in members for member in mapping)
+            members.update(mapping)
+            return added
+
+    def zrem(self, name: str, *values: str) -> int:
+        with self._lock:
+            members = self._live(name) or {}
+            return sum(members.pop(value, None) is not None for value in values)
+
+    def zrevrangebylex(self, name: str, max: str, min: str, start: int | None = None, num: int | None = None) -> list[str]:
+        """Members between `max` and `min` ("-", "+", "[x" inclusive, "(x" exclusive), highest first."""
+        def above_min(member: str) -> bool:
+            return min == "-" or (member >= min[1:] if min[0] == "[" else member > min[1:])
+
+        def below_max(member: str) -> bool:
+            return max == "+" or (member <= max[1:] if max[0] == "[" else member < max[1:])
+
+        with self._lock:
+            members = sorted((m for m in (self._live(name) or {}) if above_min(m) and below_max(m)), reverse=True)
+        if start is not None and num is not None:
+            members = members[start:start + num] if num >= 0 else members[start:]
+        return members
+
+
+def create_redis_client(url: str):
+    """A redis-py client for REDIS_URL, or a FakeRedis for fake://."""
+    if url.startswith("fake://"):
+        return FakeRedis()
+    try:
+        import redis
+    except ImportError as e:
+        raise ImportError("REDIS_URL needs the redis package (uv sync --extra redis)") from e
+    return redis.Redis.from_url(url, decode_responses=True)
+
+
+# Atomically store a session's state if its revision is still the one the caller last saw
+# (or there is none). KEYS: revision key, state key. ARGV: expected, new revision, state, ttl
+PUBLISH_SCRIPT = """
+local current = redis.call('GET', KEYS[1])
+if current and tonumber(current) ~= tonumber(ARGV[1]) then return 0 end
+redis.call('SET', KEYS[1], ARGV[2])
+redis.call('SET', KEYS[2], ARGV[3])
+if tonumber(ARGV[4]) > 0 then
+  redis.call('EXPIRE', KEYS[1], ARGV[4])
+  redis.call('EXPIRE', KEYS[2], ARGV[4])
+end
+return 1
+"""
+
+
+class StateBackend(ABC):
+    @abstractmethod
+    def get(self, key: str) -> str | None:
+        """The value, or None if missing or expired."""
+
+    @abstractmethod
+    def set(self, key: str, value: str, ttl: float | None = None) -> None:
+        """Store a value, expiring after `ttl` seconds if given."""
+
+    @abstractmethod
+    def set_if_revision(self, key: str, expected: int, revision: int, value: str, ttl: float | None = None) -> bool:
+        """
+        Store `value` at `revision` only if the stored revision is still `expected` (or nothing
+        is stored). Atomic across workers. Returns False if another writer got there first.
+        """
+
+    @abstractmethod
+    def delete(self, *keys: str) -> None:
+        """Remove keys. Missing keys are ignored."""
+
+
+class RedisStateBackend(StateBackend):
+    def __init__(self, client, prefix: str = ""):
+        self.client = client
+        self.prefix = prefix
+        self._publish = client.register_script(PUBLISH_SCRIPT)
+
+    def get(self, key: str) -> str | None:
+        return self.client.get(self.prefix + key)
+
+    def set(self, key: str, value: str, ttl: float | None = None) -> None:
+        self.client.set(self.prefix + key, value, ex=int(ttl) if ttl else None)
+
+    def set_if_revision(self, key: str, expected: int, revision: int, value: str, ttl: float | None = None) -> bool:
+        keys = [f"{self.prefix}{key}:revision", self.prefix + key]
+        return bool(self._publish(keys=keys, args=[expected, revision, value, int(ttl or 0)]))
+
+    def delete(self, *keys: str) -> None:
+        if keys:
+            self.client.delete(*(self.prefix + key for key in keys), *(f"{self.prefix}{key}:revision" for key in keys))
+
+
+class SQLiteStateBackend(StateBackend):
+    """Key-value table in a WAL-mode database. Writes commit at once so other workers see them."""
+
+    def __init__(self, db_path: str):
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        # Transactions are opened explicitly, so a revision check and its write happen under one lock
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS session_state ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, revision INTEGER NOT NULL DEFAULT 0, expires_at REAL)"
+        )
+        self.lock = threading.Lock()
+
+    def get(self, key: str) -> str | None:
+        with self.lock:
+            row = self.conn.execute("SELECT value, expires_at FROM session_state WHERE key = ?", (key,)).fetchone()
+        if row is None or (row[1] is not None and row[1] <= time.time()):
+            return None
+        return row[0]
+
+    def set(self, key: str, value: str, ttl: float | None = None) -> None:
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO session_state (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, time.time() + ttl if ttl else None),
+            )
+
+    def set_if_revision(self, key: str, expected: int, revision: int, value: str, ttl: float | None = None) -> bool:
+        now = time.time()
+        with self.lock:
+            # IMMEDIATE takes the database write lock up front, so no other worker writes in between
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                # An expired row counts as nothing stored
+                self.conn.execute("DELETE FROM session_state WHERE key = ? AND expires_at <= ?", (key, now))
+                stored = self.conn.execute(
+                    "UPDATE session_state SET value = ?, revision = ?, expires_at = ? WHERE key = ? AND revision = ?",
+                    (value, revision, now + ttl if ttl else None, key, expected),
+                ).rowcount
+                if not stored:
+                    stored = self.conn.execute(
+                        "INSERT OR IGNORE INTO session_state (key, value, revision, expires_at) VALUES (?, ?, ?, ?)",
+                        (key, value, revision, now + ttl if ttl else None),
+                    ).rowcount
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+        return bool(stored)
+
+    def delete(self, *keys: str) -> None:
+        with self.lock:
+            self.conn.executemany("DELETE FROM session_state WHERE key = ?", [(key,) for key in keys])
+
+
+class SharedSessionState:
+    """
+    Revision and last-seen document of each session, published after every turn.
+
+    A turn is published only if the agent was at the latest revision, so two workers that
+    ran turns on the same session at once cannot overwrite each other: the loser's agent is
+    marked stale and rebuilt from the session store on its next request. Each document is
+    stored under the revision that introduced it, and the previous one is removed once the
+    new state is published.
+    """
+
+    def __init__(self, backend: StateBackend | None, ttl: float | None = None):
+        self.backend = backend
+        self.ttl = ttl or None
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    def get(self, session_id: str) -> dict | None:
+        """
+        {"revision", "doc_hash", "document_revision", "model_id", "worker", "updated_at"} or None.
+        document_revision is None when the model has not seen a document yet.
+        """
+        if self.backend is None:
+            return None
+        data = self.backend.get(f"state:{session_id}")
+        return json.loads(data) if data else None
+
+    def get_document(self, session_id: str, state: dict) -> list[tuple[str, str]] | None:
+        """Paragraphs of the document the state refers to, or None if there is none (or it expired)."""
+        if self.backend is None or state.get("document_revision") is None:
+            return None
+        data = self.backend.get(f"document:{session_id}:{state['document_revision']}")
+        return [tuple(paragraph) for paragraph in json.loads(data)] if data else None
+
+    def publish(self, session_id: str, agent, model_id: str) -> int | None:
+        """Record the agent's state after a turn. Returns the new revision, or None if the agent was stale."""
+        expected = getattr(agent, "_state_revision", 0)
+        if expected is None:
+            # Already lost a race — the agent is rebuilt before it publishes again
+            return None
+        revision = expected + 1
+        if self.backend is None:
+            agent._state_revision = revision
+            return revision
+
+        paragraphs = getattr(agent, "_last_doc_paragraphs", None)
+        previous_document = getattr(agent, "_document_revision", None)
+        document_revision = previous_document
+        # The document is only written when it changed — most turns store just the small record
+        if paragraphs is not None and paragraphs is not getattr(agent, "_published_paragraphs", None):
+            document_revision = revision
+        state = {
+            "revision": revision,
+            "doc_hash": getattr(agent, "_last_doc_hash", None),
+            "document_revision": document_revision,
+            "model_id": model_id,
+            "worker": worker_id,
+            "updated_at": time.time(),
+        }
+        if not self.backend.set_if_revision(f"state:{session_id}", expected, revision, json.dumps(state), self.ttl):
+            logger.info("Session %s: another worker published revision %d first — agent is stale", session_id, revision)
+            agent._state_revision = None
+            return None
+
+        agent._state_revision = revision
+        if document_revision != previous_document:
+            # Written only once the revision is ours: a stale writer would use the same key as the
+            # winner. Until it lands, get_document finds nothing and a rebuilt agent resends in full.
+            self.backend.set(
+                f"document:{session_id}:{revision}", json.dumps(paragraphs, ensure_ascii=False), self.ttl
+            )
+            agent._published_paragraphs = paragraphs
+            agent._document_revision = document_revision
+            if previous_document is not None:
+                self.backend.delete(f"document:{session_id}:{previous_document}")
+        return revision
+
+    def warm(self, agent, state: dict, paragraphs: list[tuple[str, str]] | None) -> None:
+        """Give a freshly built agent the state (and document, from get_document) another worker left behind."""
+        agent._state_revision = state["revision"]
+        agent._last_doc_hash = state.get("doc_hash")
+        if paragraphs is None:
+            return
+        agent._last_doc_paragraphs = paragraphs
+        agent._published_paragraphs = paragraphs
+        agent._document_revision = state["document_revision"]
+        agent._document_index = DocumentIndex(paragraphs)
+
+    def delete(self, session_id: str, state: dict | None = None) -> None:
+        if self.backend is None:
+            return
+        state = state if state is not None else self.get(session_id)
+        keys = [f"state:{session_id}"]
+        if state is not None and state.get("document_revision") is not None:
+            keys.append(f"document:{session_id}:{state['document_revision']}")
+        self.backend.delete(*keys)
+
+
+def create_shared_state(backend: str = SESSION_STATE_BACKEND) -> SharedSessionState:
+    if backend == "local":
+        return SharedSessionState(None)
+    if backend == "sqlite":
+        return SharedSessionState(SQLiteStateBackend(SESSION_STATE_DB_PATH), SESSION_STATE_TTL_SECONDS)
+    if backend == "redis":
+        return SharedSessionState(RedisStateBackend(shared_redis_client(), REDIS_KEY_PREFIX), SESSION_STATE_TTL_SECONDS)
+    raise ValueError(f"Unknown SESSION_STATE_BACKEND '{backend}'. Expected 'local', 'sqlite' or 'redis'")
+
+
+_redis_client = None
+_redis_lock = threading.Lock()
+
+
+def shared_redis_client():
+    """One client per process for REDIS_URL, shared by the session store and the shared state."""
+    global _redis_client
+    with _redis_lock:
+        if _redis_client is None:
+            _redis_client = create_redis_client(REDIS_URL)
+        return _redis_client
+
+
+shared_state = create_shared_state()
@@ -0,0 +1,121 @@
+"""
+Skills in backend/skills/, parsed once and kept as ready-made system prompt blocks.
+
+Each skill is a markdown file with `name` and `description` frontmatter. The registry is
+built at startup and rebuilt on the next use after any skill file is added, removed or
+modified (checked by mtime). Skills listed in SKILLS_INLINE have their instructions
+included in the system prompt, so the agent does not have to file_read them first.
+"""
+
+import logging
+import os
+import re
+import threading
+from strands.types.content import SystemContentBlock
+from agent.prompts import REDLINER_PROMPT
+from config import SKILLS_INLINE
+
+logger = logging.getLogger(__name__)
+
+SKILLS_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "skills"))
+
+FRONTMATTER_RE = re.compile(r"\A\s*---\s*\n(.*?)\n---\s*\n?(.*)\Z", re.DOTALL)
+NAME_RE = re.compile(r"^name:\s*(.*)", re.MULTILINE)
+DESCRIPTION_RE = re.compile(r"^description:\s*(.*)", re.MULTILINE)
+
+
+def parse_skill(filename: str, content: str) -> dict | None:
+    """Name, description and instructions of a skill file (None without valid frontmatter)."""
+    match = FRONTMATTER_RE.match(content)
+    if not match:
+        return None
+    header, body = match.groups()
+    name_match = NAME_RE.search(header)
+    desc_match = DESCRIPTION_RE.search(header)
+    if not (name_match and desc_match):
+        return None
+
+    name = name_match.group(1).strip()
+    # Error handling: No spaces allowed in skill names
+    if " " in name:
+        raise ValueError(f"Skill name '{name}' in {filename} contains spaces. Please use underscores instead.")
+    return {"name": name, "description": desc_match.group(1).strip(), "file": filename, "body": body.strip()}
+
+
+class SkillRegistry:
+    def __init__(self, skills_dir: str, inline: list[str]):
+        self.skills_dir = skills_dir
+        self.inline = inline
+        self._lock = threading.Lock()
+        self._signature: tuple | None = None
+        self._skills: list[dict] = []
+        self._system_prompt: list[SystemContentBlock] = []
+        # Bumped on every rebuild — cached agents compare it to pick up changed skills
+        self.generation = 0
+
+    def _current_signature(self) -> tuple:
+        if not os.path.isdir(self.skills_dir):
+            return ()
+        return tuple(
+            sorted(
+                (entry.name, entry.stat().st_mtime_ns)
+                for entry in os.scandir(self.skills_dir)
+                if entry.name.endswith(".md")
+            )
+        )
+
+    def refresh(self) -> None:
+        """Rebuild the skill list and system prompt if any skill file changed since the last build."""
+        signature = self._current_signature()
+        if signature == self._signature:
+            return
+        with self._lock:
+            if signature == self._signature:
+                return
+            skills = []
+            for filename, _ in signature:
+                with open(os.path.join(self.skills_dir, filename), "r", encoding="utf-8") as f:
+                    skill = parse_skill(filename, f.read())
+                if skill:
+                    skills.append(skill)
+
+            self._skills = skills
+            self._system_prompt = self._build_system_prompt(skills)
+            self._signature = signature
+            self.generation += 1
+            logger.info("Skills loaded: %d skill(s), %d inlined", len(skills),
+                        sum(skill["name"] in self.inline for skill in skills))
+
+    def _build_system_prompt(self, skills: list[dict]) -> list[SystemContentBlock]:
+        if not os.path.isdir(self.skills_dir):
+            listing = "# AVAILABLE SKILLS\n(No skills directory found)"
+        else:
+            lines = []
+            for skill in skills:
+                line = f"- {skill['name']}: {skill['description']}"
+                if skill["name"] in self.inline:
+                    line += " (instructions are under SKILL INSTRUCTIONS below - no need to read the file)"
+                lines.append(line)
+            listing = "# AVAILABLE SKILLS\n" + "\n".join(lines)
+
+        blocks = [SystemContentBlock(text=REDLINER_PROMPT), SystemContentBlock(text=listing)]
+        for skill in skills:
+            if skill["name"] in self.inline:
+                blocks.append(SystemContentBlock(
+                    text=f"# SKILL INSTRUCTIONS: {skill['name']}\n(from skills/{skill['file']})\n\n{skill['body']}"
+                ))
+        # Everything above is identical across sessions, so it is cached as one prefix
+        blocks.append(SystemContentBlock(cachePoint={"type": "default"}))
+        return blocks
+
+    def skills(self) -> list[dict]:
+        self.refresh()
+        return self._skills
+
+    def system_prompt(self) -> list[SystemContentBlock]:
+        """The agent's system prompt blocks. Shared between agents — do not modify."""
+        self.refresh()
+        return self._system_prompt
+
+
+skill_registry = SkillRegistry(SKILLS_DIR, SKILLS_INLINE)
@@ -0,0 +1,215 @@
+"""
+SQLite implementation of the Strands SessionRepository.
+
+One WAL-mode database replaces the per-message JSON files written by FileSessionManager.
+Commits can be batched: a thread inside `batch()` has its writes committed every
+`batch_size` writes, by a timer at most `batch_max_delay` seconds after the first
+uncommitted one, and once more when its outermost batch exits. Batches are meant for short
+write bursts — writes made outside one (on any thread) are committed straight away.
+"""
+
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Any, Iterator
+from strands.session.session_repository import SessionRepository
+from strands.types.exceptions import SessionException
+from strands.types.session import Session, SessionAgent, SessionMessage
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_created_at ON sessions (created_at DESC, session_id DESC);
+CREATE TABLE IF NOT EXISTS agents (
+    session_id TEXT NOT NULL,
+    agent_id TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (session_id, agent_id)
+);
+CREATE TABLE IF NOT EXISTS messages (
+    session_id TEXT NOT NULL,
+    agent_id TEXT NOT NULL,
+    message_id INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (session_id, agent_id, message_id)
+);
+CREATE TABLE IF NOT EXISTS multi_agents (
+    session_id TEXT NOT NULL,
+    multi_agent_id TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (session_id, multi_agent_id)
+);
+"""
+
+
+class SQLiteSessionRepository(SessionRepository):
+    def __init__(self, db_path: str, batch_size: int = 32, batch_max_delay: float = 1.0):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.batch_max_delay = batch_max_delay
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+        self.lock = threading.RLock()
+        # Batch depth of each thread — one thread's batch never defers another thread's writes
+        self._local = threading.local()
+        self._pending_writes = 0
+        # Commits pending writes batch_max_delay after the first one, even if no write follows
+        self._flush_timer: threading.Timer | None = None
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """Group this thread's writes into fewer commits. Nested batches commit when the outermost exits."""
+        self._local.depth = getattr(self._local, "depth", 0) + 1
+        try:
+            yield
+        finally:
+            self._local.depth -= 1
+            if not self._local.depth:
+                self.flush()
+
+    def flush(self) -> None:
+        """Commit every pending write."""
+        with self.lock:
+            self._commit()
+
+    def _write(self, sql: str, params: tuple) -> sqlite3.Cursor:
+        with self.lock:
+            cursor = self.conn.execute(sql, params)
+            self._pending_writes += 1
+            if not getattr(self._local, "depth", 0) or self._pending_writes >= self.batch_size:
+                self._commit()
+            elif self._flush_timer is None:
+                self._flush_timer = threading.Timer(self.batch_max_delay, self.flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+            return cursor
+
+    def _commit(self) -> None:
+        if self._pending_writes:
+            self.conn.commit()
+            self._pending_writes = 0
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+
+    def _read(self, sql: str, params: tuple) -> list[tuple]:
+        with self.lock:
+            return self.conn.execute(sql, params).fetchall()
+
+    # --- SessionRepository ---
+
+    def create_session(self, session: Session, **kwargs: Any) -> Session:
+        try:
+            self._write(
+                "INSERT INTO sessions (session_id, created_at, data) VALUES (?, ?, ?)",
+                (session.session_id, session.created_at, json.dumps(session.to_dict())),
+            )
+        except sqlite3.IntegrityError as e:
+            raise SessionException(f"Session {session.session_id} already exists") from e
+        return session
+
+    def read_session(self, session_id: str, **kwargs: Any) -> Session | None:
+        rows = self._read("SELECT data FROM sessions WHERE session_id = ?", (session_id,))
+        return Session.from_dict(json.loads(rows[0][0])) if rows else None
+
+    def delete_session(self, session_id: str, **kwargs: Any) -> bool:
+        with self.lock:
+            deleted = self._write("DELETE FROM sessions WHERE session_id = ?", (session_id,)).rowcount
+            for table in ("agents", "messages", "multi_agents"):
+                self._write(f"DELETE FROM {table} WHERE session_id = ?", (session_id,))  # nosec B608
+        return bool(deleted)
+
+    def create_agent(self, session_id: str, session_agent: SessionAgent, **kwargs: Any) -> None:
+        self._write(
+            "INSERT OR REPLACE INTO agents (session_id, agent_id, data) VALUES (?, ?, ?)",
+            (session_id, session_agent.agent_id, json.dumps(session_agent.to_dict())),
+        )
+
+    def read_agent(self, session_id: str, agent_id: str, **kwargs: Any) -> SessionAgent | None:
+        rows = self._read("SELECT data FROM agents WHERE session_id = ? AND agent_id = ?", (session_id, agent_id))
+        return SessionAgent.from_dict(json.loads(rows[0][0])) if rows else None
+
+    def update_agent(self, session_id: str, session_agent: SessionAgent, **kwargs: Any) -> None:
+        previous_agent = self.read_agent(session_id, session_agent.agent_id)
+        if previous_agent is None:
+            raise SessionException(f"Agent {session_agent.agent_id} in session {session_id} does not exist")
+        session_agent.created_at = previous_agent.created_at
+        self._write(
+            "UPDATE agents SET data = ? WHERE session_id = ? AND agent_id = ?",
+            (json.dumps(session_agent.to_dict()), session_id, session_agent.agent_id),
+        )
+
+    def create_message(self, session_id: str, agent_id: str, session_message: SessionMessage, **kwargs: Any) -> None:
+        self._write(
+            "INSERT OR REPLACE INTO messages (session_id, agent_id, message_id, data) VALUES (?, ?, ?, ?)",
+            (session_id, agent_id, session_message.message_id, json.dumps(session_message.to_dict())),
+        )
+
+    def read_message(self, session_id: str, agent_id: str, message_id: int, **kwargs: Any) -> SessionMessage | None:
+        data = self.read_message_dict(session_id, agent_id, message_id)
+        return SessionMessage.from_dict(data) if data else None
+
+    def update_message(self, session_id: str, agent_id: str, session_message: SessionMessage, **kwargs: Any) -> None:
+        previous_message = self.read_message(session_id, agent_id, session_message.message_id)
+        if previous_message is None:
+            raise SessionException(f"Message {session_message.message_id} does not exist")
+        session_message.created_at = previous_message.created_at
+        self._write(
+            "UPDATE messages SET data = ? WHERE session_id = ? AND agent_id = ? AND message_id = ?",
+            (json.dumps(session_message.to_dict()), session_id, agent_id, session_message.message_id),
+        )
+
+    def list_messages(
+        self, session_id: str, agent_id: str, limit: int | None = None, offset: int = 0, **kwargs: Any
+    ) -> list[SessionMessage]:
+        rows = self._read(
+            "SELECT data FROM messages WHERE session_id = ? AND agent_id = ? "
+            "ORDER BY message_id LIMIT ? OFFSET ?",
+            (session_id, agent_id, -1 if limit is None else limit, offset),
+        )
+        return [SessionMessage.from_dict(json.loads(data)) for (data,) in rows]
+
+    def create_multi_agent(self, session_id: str, multi_agent: Any, **kwargs: Any) -> None:
+        self._write(
+            "INSERT OR REPLACE INTO multi_agents (session_id, multi_agent_id, data) VALUES (?, ?, ?)",
+            (session_id, multi_agent.id, json.dumps(multi_agent.serialize_state())),
+        )
+
+    def read_multi_agent(self, session_id: str, multi_agent_id: str, **kwargs: Any) -> dict[str, Any] | None:
+        rows = self._read(
+            "SELECT data FROM multi_agents WHERE session_id = ? AND multi_agent_id = ?",
+            (session_id, multi_agent_id),
+        )
+        return json.loads(rows[0][0]) if rows else None
+
+    def update_multi_agent(self, session_id: str, multi_agent: Any, **kwargs: Any) -> None:
+        if self.read_multi_agent(session_id, multi_agent.id) is None:
+            raise SessionException(f"MultiAgent state {multi_agent.id} in session {session_id} does not exist")
+        self.create_multi_agent(session_id, multi_agent)
+
+    # --- Queries used by the /sessions routes ---
+
+    def list_message_ids(
+        self, session_id: str, agent_id: str, limit: int | None = None, before_id: int | None = None
+    ) -> list[int]:
+        """The latest `limit` message ids below `before_id`, in ascending order."""
+        rows = self._read(
+            "SELECT message_id FROM messages WHERE session_id = ? AND agent_id = ? AND message_id < ? "
+            "ORDER BY message_id DESC LIMIT ?",
+            (session_id, agent_id, before_id if before_id is not None else 2**62, -1 if limit is None else limit),
+        )
+        return [message_id for (message_id,) in reversed(rows)]
+
+    def read_message_dict(self, session_id: str, agent_id: str, message_id: int) -> dict | None:
+        rows = self._read(
+            "SELECT data FROM messages WHERE session_id = ? AND agent_id = ? AND message_id = ?",
+            (session_id, agent_id, message_id),
+        )
+        return json.loads(rows[0][0]) if rows else None
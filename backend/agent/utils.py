@@ -4,6 +4,7 @@ Utility functions to use in agent/main.py
 
 import os
 import re
+from config import EXTRA_PLACEHOLDER_CHARS
 
 # Character mapping for problematic characters that may get normalised by LLM
 CHAR_PLACEHOLDERS = {
@@ -18,20 +19,107 @@ CHAR_PLACEHOLDERS = {
 }
 
 
+class PlaceholderCodec:
+    """
+    Converts problematic characters to placeholders and back.
+
+    Decoding is a single regex pass, skipped when the text has no placeholder lead character.
+    Encoding returns ASCII text without such characters unchanged; otherwise it runs the
+    same str.replace chain as before, for the characters that occur, and costs about the
+    same (a one-pass Python callback or str.translate with multi-character values is slower).
+    """
+
+    def __init__(self, placeholders: dict[str, str]):
+        self.placeholders = dict(placeholders)
+        self._encode_items = tuple(self.placeholders.items())
+        self._ascii_chars = tuple(char for char in self.placeholders if char.isascii())
+        self._decode_map = {placeholder: char for char, placeholder in self.placeholders.items()}
+        self._decode_re = re.compile(
+            "|".join(re.escape(p) for p in sorted(self._decode_map, key=len, reverse=True))
+        )
+        self._lead_chars = tuple({placeholder[0] for placeholder in self._decode_map})
+        self._replace = lambda match: self._decode_map[match.group()]
+        # Every proper prefix of a placeholder — a chunk ending in one of these may be split
+        self.prefixes = frozenset(p[:i] for p in self._decode_map for i in range(1, len(p)))
+        self.max_len = max(map(len, self._decode_map), default=0)
+
+    def encode(self, text: str) -> str:
+        if not text:
+            return ''
+        if text.isascii() and not any(char in text for char in self._ascii_chars):
+            return text
+        for char, placeholder in self._encode_items:
+            if char in text:
+                text = text.replace(char, placeholder)
+        return text
+
+    def has_lead(self, text: str) -> bool:
+        """Whether the text contains a placeholder's first character — most text has none."""
+        for lead in self._lead_chars:
+            if lead in text:
+                return True
+        return False
+
+    def decode(self, text: str) -> str:
+        if not self.has_lead(text):
+            return text
+        return self._decode_re.sub(self._replace, text)
+
+    def split_partial(self, text: str) -> tuple[str, str]:
+        """Split off a trailing fragment that could be the start of a placeholder."""
+        window_start = len(text) - self.max_len + 1
+        for lead in self._lead_chars:
+            start = text.rfind(lead, max(0, window_start))
+            if start != -1 and text[start:] in self.prefixes:
+                return text[:start], text[start:]
+        return text, ""
+
+    def incremental_decoder(self) -> "IncrementalPlaceholderDecoder":
+        return IncrementalPlaceholderDecoder(self)
+
+
+class IncrementalPlaceholderDecoder:
+    """
+    Decodes a stream of text chunks, holding back a trailing partial placeholder
+    (e.g. "[u+20" + "1C]") until the next chunk completes it.
+    """
+
+    def __init__(self, codec: PlaceholderCodec):
+        self._codec = codec
+        self._pending = ""
+
+    def decode(self, chunk: str, final: bool = False) -> str:
+        if self._pending:
+            chunk = self._pending + chunk
+            self._pending = ""
+        # No lead character: nothing to decode and no partial placeholder to hold back
+        if not self._codec.has_lead(chunk):
+            return chunk
+        if not final:
+            chunk, self._pending = self._codec.split_partial(chunk)
+        return self._codec.decode(chunk)
+
+
+def _build_placeholders(extra_codepoints: list[str]) -> dict[str, str]:
+    """CHAR_PLACEHOLDERS plus any extra hex code points from config, as [u+XXXX]."""
+    placeholders = dict(CHAR_PLACEHOLDERS)
+    for codepoint in extra_codepoints:
+        char = chr(int(codepoint, 16))
+        placeholders.setdefault(char, f"[u+{ord(char):04X}]")
+    return placeholders
+
+
+PLACEHOLDER_CODEC = PlaceholderCodec(_build_placeholders(EXTRA_PLACEHOLDER_CHARS))
+
+
 def convert_to_placeholders(text: str) -> str:
     """Convert problematic characters to placeholders for LLM processing"""
-    if not text:
-        return ''
-    for char, placeholder in CHAR_PLACEHOLDERS.items():
-        text = text.replace(char, placeholder)
-    return text
+    return PLACEHOLDER_CODEC.encode(text)
 
 
 def convert_from_placeholders(text: str) -> str:
     """Convert placeholders back to original characters"""
-    for char, placeholder in CHAR_PLACEHOLDERS.items():
-        text = text.replace(placeholder, char)
-    return text
+    return PLACEHOLDER_CODEC.decode(text)
 
 
 def load_tool_paths() -> list:
@@ -43,62 +131,74 @@ def load_tool_paths() -> list:
             if f.endswith(".py") and f != "__init__.py"]
 
 
-def list_skills() -> str:
+class ThinkingTagFilter:
     """
-    Scans the skills directory, parses frontmatter, and validates names.
-    Returns a formatted string for the system prompt.
+    Streaming filter that drops <thinking>...</thinking> blocks from text chunks.
+
+    Hold one instance per response and feed it every chunk in order. Tags split across
+    chunk boundaries are held back until they can be classified, nested blocks are tracked
+    by depth, and stray closing tags are dropped. Each character is scanned once.
     """
-    # Get the directory where the agent script lives
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    # Skills folder is one level up from the agent folder
-    skills_dir = os.path.abspath(os.path.join(base_dir, "..", "skills"))
-    
-    available_skills = []
-
-    if not os.path.exists(skills_dir):
-        return "# AVAILABLE SKILLS\n(No skills directory found)"
-
-    for filename in os.listdir(skills_dir):
-        if filename.endswith(".md"):
-            path = os.path.join(skills_dir, filename)
-            
-            with open(path, "r", encoding="utf-8") as f:
-                content = f.read()
-                
-                # Split by frontmatter delimiters
-                sections = content.split("---")
-                if len(sections) < 3:
-                    continue
-                
-                # We only look at the content between the first two '---'
-                header = sections[1]
-                
-                name_match = re.search(r"^name:\s*(.*)", header, re.MULTILINE)
-                desc_match = re.search(r"^description:\s*(.*)", header, re.MULTILINE)
-                
-                if name_match and desc_match:
-                    name = name_match.group(1).strip()
-                    desc = desc_match.group(1).strip()
-                    
-                    # Error handling: No spaces allowed in skill names
-                    if " " in name:
-                        raise ValueError(
-                            f"Skill name '{name}' in {filename} contains spaces. "
-                            "Please use underscores instead."
-                        )
-                    
-                    available_skills.append(f"- {name}: {desc}")
-
-    return "# AVAILABLE SKILLS\n" + "\n".join(available_skills)
+
+    OPEN = "<thinking>"
+    CLOSE = "</thinking>"
+
+    def __init__(self):
+        self.depth = 0
+        self._pending = ""
+
+    def feed(self, chunk: str, final: bool = False) -> str:
+        """
+        Filter the next chunk. With final=True the held-back partial tag is released and
+        an unterminated block is closed, dropping its content.
+        """
+        if not self._pending and "<" not in chunk:
+            # Fast path: no tag can start or end in this chunk
+            visible = "" if self.depth else chunk
+            if final:
+                self.depth = 0
+            return visible
+
+        text = self._pending + chunk if self._pending else chunk
+        self._pending = ""
+        out = []
+        pos, end = 0, len(text)
+
+        while pos < end:
+            lt = text.find("<", pos)
+            if lt == -1:
+                if not self.depth:
+                    out.append(text[pos:])
+                break
+            if not self.depth and lt > pos:
+                out.append(text[pos:lt])
+
+            if text.startswith(self.OPEN, lt):
+                self.depth += 1
+                pos = lt + len(self.OPEN)
+            elif text.startswith(self.CLOSE, lt):
+                self.depth = max(0, self.depth - 1)
+                pos = lt + len(self.CLOSE)
+            else:
+                rest = text[lt:]
+                if not final and len(rest) < len(self.CLOSE) and (
+                    self.OPEN.startswith(rest) or self.CLOSE.startswith(rest)
+                ):
+                    # Possibly the start of a tag — wait for the next chunk
+                    self._pending = rest
+                    break
+                if not self.depth:
+                    out.append("<")
+                pos = lt + 1
+
+        if final:
+            self.depth = 0
+        return "".join(out)
 
 
 def remove_thinking_tags(response_str):
-    """Remove <thinking> tags and content from agent responses"""
-    if "<thinking>" in response_str and "</thinking>" in response_str:
-        thinking_start = response_str.find("<thinking>")
-        thinking_end = response_str.find("</thinking>") + len("</thinking>")
-        return response_str[:thinking_start] + response_str[thinking_end:]
-    return response_str
+    """Remove <thinking> tags and content from a complete agent response"""
+    return ThinkingTagFilter().feed(response_str, final=True)
 
 
 async def mock_stream(word_document: str, model_id: str = "unknown"):
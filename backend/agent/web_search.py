@@ -0,0 +1,197 @@
+"""
+Shared web search behind the `fetch` tool.
+
+Results are cached per normalized query (TTL + LRU), identical searches that are already
+running are joined rather than repeated (single-flight), and at most FETCH_MAX_CONCURRENCY
+searches run at once, each on a worker thread. Callers wait at most FETCH_TIMEOUT_SECONDS.
+
+The provider is pluggable: "ddgs" (DuckDuckGo via the ddgs package, one client per worker thread) or
+"fake" (local canned results, for tests and benchmarks). Set FETCH_BACKEND or call
+web_search.set_backend().
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from config import (
+    FETCH_BACKEND,
+    FETCH_CACHE_TTL_SECONDS,
+    FETCH_CACHE_MAX_ENTRIES,
+    FETCH_MAX_CONCURRENCY,
+    FETCH_TIMEOUT_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+class SearchBackend(ABC):
+    @abstractmethod
+    def search(self, query: str, max_results: int) -> list[dict]:
+        """Results as {"title", "href", "body"} dicts. Blocking — runs on a worker thread."""
+
+
+class DdgsBackend(SearchBackend):
+    def __init__(self, timeout: float):
+        self.timeout = timeout
+        # DDGS keeps per-client HTTP state and is not documented as thread-safe, so each search
+        # thread gets its own client (at most FETCH_MAX_CONCURRENCY of them)
+        self._local = threading.local()
+
+    def _get_client(self):
+        client = getattr(self._local, "client", None)
+        if client is None:
+            # Imported on first search — ddgs is slow to import
+            from ddgs import DDGS
+            client = self._local.client = DDGS(timeout=max(1, int(self.timeout)))
+        return client
+
+    def search(self, query: str, max_results: int) -> list[dict]:
+        return self._get_client().text(query, max_results=max_results)
+
+
+class FakeSearchBackend(SearchBackend):
+    """Local provider: canned results per normalized query, or generated ones, after `delay` seconds."""
+
+    def __init__(self, results: dict[str, list[dict]] | None = None, delay: float = 0.0):
+        self.results = {normalize_query(query): hits for query, hits in (results or {}).items()}
+        self.delay = delay
+        self.calls = 0
+
+    def search(self, query: str, max_results: int) -> list[dict]:
+        self.calls += 1
+        if self.delay:
+            time.sleep(self.delay)
+        if query in self.results:
+            return self.results[query][:max_results]
+        return [
+            {"title": f"Result {i + 1} for {query}", "href": f"https://example.com/{i + 1}", "body": f"Snippet about {query}."}
+            for i in range(max_results)
+        ]
+
+
+def create_backend(name: str, timeout: float) -> SearchBackend:
+    if name == "ddgs":
+        return DdgsBackend(timeout)
+    if name == "fake":
+        return FakeSearchBackend()
+    raise ValueError(f"Unknown FETCH_BACKEND '{name}'. Expected 'ddgs' or 'fake'")
+
+
+class WebSearch:
+    def __init__(self, backend: SearchBackend, ttl: float, max_entries: int, max_concurrency: int, timeout: float):
+        self.backend = backend
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.timeout = timeout
+        # The worker pool is the global concurrency limit — extra searches queue for a thread
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_concurrency), thread_name_prefix="web-search")
+        self._lock = threading.Lock()
+        # (normalized query, max_results) -> (expires_at, results), least recently used first
+        self._cache: OrderedDict[tuple[str, int], tuple[float, list[dict]]] = OrderedDict()
+        self._inflight: dict[tuple[str, int], Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.joined = 0
+        self.timeouts = 0
+        self.errors = 0
+
+    def set_backend(self, backend: SearchBackend) -> None:
+        """Swap the provider (e.g. for a FakeSearchBackend in tests). Clears the cache."""
+        with self._lock:
+            self.backend = backend
+            self._cache.clear()
+
+    async def search(self, query: str, max_results: int = 5) -> list[dict]:
+        """
+        Search results for the query, from the cache when fresh. Raises TimeoutError after
+        `timeout` seconds (the search itself keeps running and still fills the cache) and
+        re-raises provider errors, which are not cached.
+        """
+        key = (normalize_query(query), max_results)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                if cached[0] > time.monotonic():
+                    self._cache.move_to_end(key)
+                    self.hits += 1
+                    return cached[1]
+                del self._cache[key]
+            future = self._inflight.get(key)
+            if future is None:
+                self.misses += 1
+                future = self._executor.submit(self._run, key, self.backend)
+                self._inflight[key] = future
+            else:
+                self.joined += 1
+
+        # Each caller waits on its own future, so one timing out does not cancel the shared search
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+
+        def resolve(done: Future) -> None:
+            if waiter.done():
+                return
+            if done.exception() is not None:
+                waiter.set_exception(done.exception())
+            else:
+                waiter.set_result(done.result())
+
+        def on_done(done: Future) -> None:
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(resolve, done)
+
+        future.add_done_callback(on_done)
+        try:
+            return await asyncio.wait_for(waiter, self.timeout)
+        except TimeoutError:
+            logger.warning("Web search for '%s' timed out after %.1fs", key[0], self.timeout)
+            self.timeouts += 1
+            raise
+
+    def _run(self, key: tuple[str, int], backend: SearchBackend) -> list[dict]:
+        try:
+            results = backend.search(*key)
+        except Exception as e:
+            logger.warning("Web search for '%s' failed: %s", key[0], e)
+            with self._lock:
+                self._inflight.pop(key, None)
+                self.errors += 1
+            raise
+        with self._lock:
+            self._inflight.pop(key, None)
+            if self.ttl > 0 and backend is self.backend:
+                self._cache[key] = (time.monotonic() + self.ttl, results)
+                self._cache.move_to_end(key)
+                while len(self._cache) > self.max_entries:
+                    self._cache.popitem(last=False)
+        return results
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "backend": type(self.backend).__name__,
+                "entries": len(self._cache),
+                "inflight": len(self._inflight),
+                "hits": self.hits,
+                "misses": self.misses,
+                "joined": self.joined,
+                "timeouts": self.timeouts,
+                "errors": self.errors,
+            }
+
+
+web_search = WebSearch(
+    create_backend(FETCH_BACKEND, FETCH_TIMEOUT_SECONDS),
+    ttl=FETCH_CACHE_TTL_SECONDS,
+    max_entries=FETCH_CACHE_MAX_ENTRIES,
+    max_concurrency=FETCH_MAX_CONCURRENCY,
+    timeout=FETCH_TIMEOUT_SECONDS,
+)
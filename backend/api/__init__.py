@@ -2,5 +2,6 @@ from .invoke import router as invoke_router
 from .models import router as models_router
 from .sessions import router as sessions_router
 from .config import router as config_router
+from .health import router as health_router
 
-__all__ = ["invoke_router", "models_router", "sessions_router", "config_router"]
+__all__ = ["invoke_router", "models_router", "sessions_router", "config_router", "health_router"]
@@ -68,17 +68,24 @@ async def get_mcp_servers():
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/config/web-search")
+async def web_search_stats():
+    """Web search provider and its cache: entries, searches in flight, hits, misses, joined searches, timeouts and errors."""
+    from agent.web_search import web_search
+    return web_search.stats()
+
+
 @router.post("/config/mcp-servers/reload")
 async def reload_mcp_servers():
     """
     Reload MCP servers from mcp.json without restarting the backend.
-    Clears agent cache so new sessions get updated tools.
+    Only added, changed and removed servers are affected; existing sessions keep their agents.
     """
     try:
         from agent.manager import reload_mcp_tools
-        reload_mcp_tools()
+        changes = reload_mcp_tools()
         logger.info("MCP servers reloaded successfully")
-        return {"status": "success", "message": "MCP servers reloaded"}
+        return {"status": "success", "message": "MCP servers reloaded", "changes": changes}
     except Exception as e:
         logger.error("Failed to reload MCP servers: %s", str(e))
         raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,54 @@
+import time
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+router = APIRouter()
+
+
+class Readiness:
+    """Startup steps still running in the background, and any that failed."""
+
+    def __init__(self):
+        self.started_at = time.monotonic()
+        self.ready_after: float | None = None
+        self._pending: list[str] = []
+        self._failed: dict[str, str] = {}
+
+    def add(self, step: str) -> None:
+        self._pending.append(step)
+
+    def done(self, step: str) -> None:
+        self._pending.remove(step)
+        if not self._pending and self.ready_after is None:
+            self.ready_after = time.monotonic() - self.started_at
+
+    def fail(self, step: str, error: str) -> None:
+        self._pending.remove(step)
+        self._failed[step] = error
+
+    @property
+    def ready(self) -> bool:
+        return not self._pending and not self._failed
+
+    def status(self) -> dict:
+        return {
+            "status": "ready" if self.ready else "failed" if self._failed and not self._pending else "starting",
+            "pending": list(self._pending),
+            "failed": dict(self._failed),
+            "ready_after_seconds": round(self.ready_after, 3) if self.ready_after is not None else None,
+        }
+
+
+readiness = Readiness()
+
+
+@router.get("/healthz")
+async def healthz():
+    """Liveness — the process is up and serving requests."""
+    return {"status": "ok", "uptime_seconds": round(time.monotonic() - readiness.started_at, 3)}
+
+
+@router.get("/readyz")
+async def readyz():
+    """Readiness — 503 until the background startup steps (tools, model client, indexes) are done."""
+    return JSONResponse(readiness.status(), status_code=200 if readiness.ready else 503)
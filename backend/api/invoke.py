@@ -1,105 +1,344 @@
+import asyncio
 import json
 import logging
-import os
-from fastapi import APIRouter, Request
+import time
+from contextlib import aclosing
+from fastapi import APIRouter, HTTPException, Request
 from fastapi.responses import StreamingResponse
-from agent.manager import get_or_create_agent
-from agent.utils import remove_thinking_tags, convert_from_placeholders, convert_to_placeholders, mock_stream
+from starlette.background import BackgroundTask
+from agent.manager import get_or_create_agent, set_agent_model, publish_agent_state
+from agent.cache import estimate_agent_bytes
+from agent.compaction import is_snapshot
+from agent.concurrency import session_locks, SessionBusyError, close_interrupted_turn
+from agent.consent import set_tool_consent
+from agent.pending_turn import PendingTurn, stage_turn, discard_turn
+from agent.shared_state import worker_id
+from agent.utils import ThinkingTagFilter, convert_from_placeholders, convert_to_placeholders, mock_stream, PLACEHOLDER_CODEC
+from agent.document import parse_word_document, build_document_delta
+from agent.document_index import DocumentIndex
+from agent.action_stream import IncrementalActionParser
+from agent.action_validation import validate_action, validate_actions
+from api.sse import (
+    TextBatcher,
+    TIMEOUT,
+    SSE_HEADERS,
+    iterate_with_timeout,
+    format_event,
+    accepts_gzip_events,
+    with_heartbeats,
+)
 from models.model_catalog import get_allowed_models
-from config import DEFAULT_MODEL_ID, MOCK_MODE
+from models.admission import admission_controller, estimate_tokens
+from models.usage import usage_stats
+from logging_setup import bind_log_context
+from config import (
+    DEFAULT_MODEL_ID,
+    MOCK_MODE,
+    SSE_FLUSH_MAX_DELAY_SECONDS,
+    SSE_FLUSH_MAX_BYTES,
+    SSE_FLUSH_MAX_CHUNKS,
+    SSE_HEARTBEAT_SECONDS,
+    SSE_GZIP_MIN_BYTES,
+    SSE_DISCONNECT_POLL_SECONDS,
+    MODEL_QUEUE_UPDATE_SECONDS,
+    LARGE_DOCUMENT_MIN_CHARS,
+    LARGE_DOCUMENT_OUTLINE_MAX_CHARS,
+    LOG_RAW_STREAM_EVENTS,
+)
 
 logger = logging.getLogger(__name__)
+# Separate logger so raw Strands events can be filtered or routed on their own
+raw_event_logger = logging.getLogger(f"{__name__}.raw")
 router = APIRouter()
 
 
-async def stream_agent_response(agent, user_message: str):
-    """Async generator that filters Strands stream events into the four SSE types
-    the frontend expects: content, tool_use, microsoft_actions, end_turn."""
+async def stream_agent_response(agent, user_message: list[dict], lease=None):
+    """Async generator that filters Strands stream events into the SSE types
+    the frontend expects: content, tool_use, microsoft_action, microsoft_actions, end_turn.
+    Each microsoft_action is sent as soon as the model finishes writing it; microsoft_actions
+    follows with the complete list once the tool call is done. Actions are checked against the
+    session's document index first: once one fails, streaming stops for that call and
+    microsoft_actions is sent empty (the tool returns the errors so the model can retry).
+    Stops as soon as the session lease is cancelled; the partial turn is then closed off in
+    the agent's history so the next request starts from a valid conversation."""
     stream = agent.stream_async(user_message)
 
-    # Track state for filtering and batching
-    text_buffer = []
-    TEXT_BATCH_SIZE = 3
-
-    async for event in stream:
-        logger.info("Raw stream event: %s", event)
-
-        # --- Text chunk (Strands streaming text) ---
-        if "data" in event:
-            text = remove_thinking_tags(event["data"])
-            text = convert_from_placeholders(text)
-
-            # Skip empty or blank text chunks
-            if text and text.strip() != "[blank text]":
-                text_buffer.append(text)
-
-                # Flush when buffer reaches batch size
-                if len(text_buffer) >= TEXT_BATCH_SIZE:
-                    yield {"type": "content", "data": "".join(text_buffer)}
-                    text_buffer.clear()
-
-        # --- Bedrock-style event envelope (tool_use start, messageStop) ---
-        elif "event" in event:
-            event_type = event["event"]
-            if "messageStop" in event_type:
-                if event_type["messageStop"].get("stopReason") == "end_turn":
-                    # Flush remaining text
-                    if text_buffer:
-                        yield {"type": "content", "data": "".join(text_buffer)}
-                        text_buffer.clear()
-
-                    yield {"type": "end_turn"}
-
-
-        # --- Complete message (contains tool invocations) ---
-        elif "message" in event:
-            # Flush remaining text first
-            if text_buffer:
-                yield {"type": "content", "data": "".join(text_buffer)}
-                text_buffer.clear()
-
-            message = event["message"]
-            if message.get("role") == "assistant":
-                for item in message.get("content", []):
-                    if "toolUse" in item:
-                        tool_use = item["toolUse"]
-                        tool_name = tool_use.get("name")
-
-                        if tool_name == "microsoft_actions_tool":
-                            try:
-                                actions = json.loads(tool_use["input"]["actions"])
-
-                                # Convert placeholders in new_text fields
-                                for action in actions:
-                                    if "new_text" in action:
-                                        action["new_text"] = convert_from_placeholders(action["new_text"])
-
+    # Text is batched and flushed after a delay, size or chunk count — whichever comes first
+    batcher = TextBatcher(SSE_FLUSH_MAX_DELAY_SECONDS, SSE_FLUSH_MAX_BYTES, SSE_FLUSH_MAX_CHUNKS)
+    # <thinking> tags and placeholders such as [u+201C] may be split across chunks
+    thinking_filter = ThinkingTagFilter()
+    placeholder_decoder = PLACEHOLDER_CODEC.incremental_decoder()
+    # Parses microsoft_actions_tool input deltas while the tool call is being generated
+    action_parser = None
+
+    def flush_text() -> str:
+        # End of a message — release held-back text and close any unterminated <thinking> block
+        tail = placeholder_decoder.decode(thinking_filter.feed("", final=True), final=True)
+        return (batcher.flush() or "") + tail
+
+    # Yields TIMEOUT when the batch's delay runs out before the next event arrives,
+    # and stops at once when the lease is cancelled (new request, explicit cancel, disconnect)
+    events = iterate_with_timeout(stream, batcher.time_left, stop=lease.cancel_event if lease else None)
+    turn_start = len(agent.messages)
+    completed = False
+    raw_events = 0
+    try:
+        async for event in events:
+            if event is TIMEOUT:
+                text = batcher.flush()
+                if text:
+                    yield {"type": "content", "data": text}
+                continue
+
+            if LOG_RAW_STREAM_EVENTS:
+                # Formatting whole events is costly — only every Nth one is logged, and only when enabled
+                raw_events += 1
+                if raw_events % LOG_RAW_STREAM_EVENTS == 0:
+                    raw_event_logger.info("Raw stream event: %s", event)
+
+            # --- Text chunk (Strands streaming text) ---
+            if "data" in event:
+                text = thinking_filter.feed(event["data"])
+                text = placeholder_decoder.decode(text)
+
+                # Skip empty or blank text chunks
+                if text and text.strip() != "[blank text]":
+                    text = batcher.add(text)
+                    if text:
+                        yield {"type": "content", "data": text}
+
+            # --- Bedrock-style event envelope (tool_use start, messageStop) ---
+            elif "event" in event:
+                event_type = event["event"]
+                if "contentBlockStart" in event_type:
+                    tool_start = event_type["contentBlockStart"].get("start", {}).get("toolUse")
+                    action_parser = None
+                    if tool_start and tool_start.get("name") == "microsoft_actions_tool":
+                        action_parser = IncrementalActionParser()
+
+                elif "contentBlockDelta" in event_type and action_parser is not None:
+                    tool_delta = event_type["contentBlockDelta"].get("delta", {}).get("toolUse")
+                    if tool_delta:
+                        index = action_parser.count
+                        try:
+                            actions = action_parser.feed(tool_delta.get("input", ""))
+                        except ValueError as e:
+                            # Fall back to the complete message for this tool call
+                            logger.error("Failed to parse streamed microsoft_actions: %s", str(e))
+                            action_parser = None
+                            actions = []
+
+                        if actions:
+                            text = flush_text()
+                            if text:
+                                yield {"type": "content", "data": text}
+                        for action in actions:
+                            # Document the model was given — set once the user message was added
+                            document_index = getattr(agent, "_document_index", None)
+                            if document_index is not None and validate_action(action, document_index):
+                                # The tool will reject this call; the corrected one streams from index 0
+                                action_parser = None
+                                break
+                            yield {"type": "microsoft_action", "index": index, "action": decode_action(action)}
+                            index += 1
+
+                elif "messageStop" in event_type:
+                    if event_type["messageStop"].get("stopReason") == "end_turn":
+                        # Flush remaining text
+                        text = flush_text()
+                        if text:
+                            yield {"type": "content", "data": text}
+
+                        yield {"type": "end_turn"}
+
+
+            # --- Complete message (contains tool invocations) ---
+            elif "message" in event:
+                # Flush remaining text first
+                text = flush_text()
+                if text:
+                    yield {"type": "content", "data": text}
+
+                message = event["message"]
+                if message.get("role") == "assistant":
+                    for item in message.get("content", []):
+                        if "toolUse" in item:
+                            tool_use = item["toolUse"]
+                            tool_name = tool_use.get("name")
+
+                            if tool_name == "microsoft_actions_tool":
+                                try:
+                                    # Authoritative full list — clients that applied the streamed
+                                    # microsoft_action events replace them with this one
+                                    actions = tool_use["input"]["actions"]
+                                    if isinstance(actions, str):
+                                        actions = json.loads(actions)
+
+                                    document_index = getattr(agent, "_document_index", None)
+                                    errors = validate_actions(actions, document_index) if document_index is not None else []
+                                    if errors:
+                                        # Clears any actions already streamed for this call
+                                        logger.info("microsoft_actions failed validation: %s", "; ".join(errors))
+                                        actions = []
+
+                                    yield {
+                                        "type": "microsoft_actions",
+                                        "actions": [decode_action(action) for action in actions]
+                                    }
+                                except Exception as e:
+                                    logger.error("Failed to parse microsoft_actions: %s", str(e))
+                            else:
+                                # Other tools - emit with input for frontend badge
                                 yield {
-                                    "type": "microsoft_actions",
-                                    "actions": actions
+                                    "type": "tool_use",
+                                    "tool_name": tool_name,
+                                    "input": tool_use.get("input", {})
                                 }
-                            except Exception as e:
-                                logger.error("Failed to parse microsoft_actions: %s", str(e))
-                        else:
-                            # Other tools - emit with input for frontend badge
-                            yield {
-                                "type": "tool_use",
-                                "tool_name": tool_name,
-                                "input": tool_use.get("input", {})
-                            }
+
+        completed = lease is None or not lease.cancelled
+    finally:
+        # Cancels the pump task, which cancels the Strands stream and any tool it is running
+        await events.aclose()
+        if not completed:
+            reason = lease.cancel_reason if lease is not None else "interrupted"
+            logger.info("Session %s: request %s — stopping stream",
+                        lease.session_id if lease else "-", reason)
+            await close_interrupted_turn(agent, turn_start)
+
+
+def decode_action(action: dict) -> dict:
+    """Convert placeholders back to the document's characters in the fields the task pane uses as text."""
+    if "new_text" in action:
+        action["new_text"] = convert_from_placeholders(action["new_text"])
+    within_para = action.get("withinPara")
+    if isinstance(within_para, dict) and isinstance(within_para.get("find"), str):
+        within_para["find"] = convert_from_placeholders(within_para["find"])
+    return action
+
+
+def build_user_message(agent, user_input: str, word_document: str, highlighted: str, current_hash: str | None) -> list[dict]:
+    """
+    Content blocks for the user turn: the document (full, as a delta, as an outline when it is
+    very large, or omitted if unchanged) in its own block, then the highlighted text and user
+    input. A full document or outline is followed by a cachePoint so it is cached ahead of the
+    per-turn parts.
+
+    The document state that goes with the message (hash, paragraphs, index) and the history
+    compaction it allows are staged on the agent and only applied once Strands adds the
+    message to the history (see agent.pending_turn).
+    """
+    doc_state = {}
+    content = _build_user_content(agent, user_input, word_document, highlighted, current_hash, doc_state)
+    stage_turn(agent, PendingTurn(content, doc_state, is_snapshot(content[0]["text"])))
+    return content
+
+
+def _build_user_content(agent, user_input: str, word_document: str, highlighted: str, current_hash: str | None,
+                        doc_state: dict) -> list[dict]:
+    # Check if document unchanged since last message in this session
+    last_doc_hash = getattr(agent, '_last_doc_hash', None)
+    doc_unchanged = (current_hash and last_doc_hash and current_hash == last_doc_hash)
+
+    # Current hash, for the next request
+    doc_state["_last_doc_hash"] = current_hash
+
+    # Too large to inline — the model gets an outline and reads sections through the document tools
+    large_document = bool(LARGE_DOCUMENT_MIN_CHARS) and len(word_document) >= LARGE_DOCUMENT_MIN_CHARS
+
+    # Paragraphs the model last saw — used to send only what changed
+    last_paragraphs = getattr(agent, '_last_doc_paragraphs', None)
+    doc_delta = None
+    if not doc_unchanged:
+        paragraphs = parse_word_document(word_document)
+        # Backs the read_document / search_document tools
+        document_index = doc_state["_document_index"] = DocumentIndex(paragraphs)
+        if last_paragraphs is not None:
+            # A large document is never resent in full, so a delta is only worth it up to the size
+            # at which the model would get an outline instead
+            doc_delta = build_document_delta(
+                last_paragraphs, paragraphs, LARGE_DOCUMENT_MIN_CHARS if large_document else len(word_document)
+            )
+            doc_unchanged = doc_delta == ""
+        doc_state["_last_doc_paragraphs"] = paragraphs
+
+    # Still convert highlighted text (user may have selected different text)
+    highlighted = convert_to_placeholders(highlighted)
+    # nosemgrep: python.django.security.injection.raw-html-format.raw-html-format
+    highlighted_section = f"<highlighted>{highlighted}</highlighted>" if highlighted else ""
+
+    if doc_unchanged:
+        # Document hasn't changed — skip sending full content, just send user input
+        logger.info("Document unchanged — skipping document content")
+
+        if large_document:
+            note = "The Word document content is unchanged since your last response. It is too large to include in full — use read_document and search_document to read the paragraphs you need."
+        else:
+            note = "The Word document content is unchanged since your last response. Refer to the previous <word_document> in this conversation."
+        # nosemgrep: python.django.security.injection.raw-html-format.raw-html-format
+        return [{"text": f"{highlighted_section}\n<user_input>{user_input}</user_input>\n\n<note>{note}</note>"}]
+    elif doc_delta:
+        # Document changed — send only added/removed/changed paragraphs and address remapping
+        logger.info("Document changed — sending paragraph delta (%d chars vs %d full)", len(doc_delta), len(word_document))
+
+        doc_delta = convert_to_placeholders(doc_delta)
+        if large_document:
+            note = "Only the paragraphs that changed since the document you last saw are shown. Apply the remapping to earlier addresses; use read_document and search_document for the other paragraphs."
+        else:
+            note = "Only the paragraphs that changed since the previous <word_document> are shown. Apply the remapping to earlier addresses; all other paragraphs are unchanged."
+
+        # nosemgrep: python.django.security.injection.raw-html-format.raw-html-format
+        return [
+            {"text": doc_delta},
+            # nosemgrep: python.django.security.injection.raw-html-format.raw-html-format
+            {"text": f"{highlighted_section}\n<user_input>{user_input}</user_input>\n\n<note>{note}</note>"},
+        ]
+    elif large_document:
+        # Send an outline; the model reads sections through the document tools
+        logger.info("Large document (%d chars) — sending outline only", len(word_document))
+
+        outline = convert_to_placeholders(document_index.outline(LARGE_DOCUMENT_OUTLINE_MAX_CHARS))
+
+        return [
+            {"text": f"<word_document_outline>{outline}</word_document_outline>"},
+            {"cachePoint": {"type": "default"}},
+            # nosemgrep: python.django.security.injection.raw-html-format.raw-html-format
+            {"text": f"{highlighted_section}\n<user_input>{user_input}</user_input>\n\n<note>The document is too large to include in full. Use read_document and search_document to read the paragraphs you need before answering or proposing changes.</note>"},
+        ]
+    else:
+        # Document changed or first message — send full content
+        logger.info("Document changed or first message — sending full document content")
+
+        # Convert problematic characters to placeholders before sending to LLM
+        word_document = convert_to_placeholders(word_document)
+
+        # nosemgrep: python.django.security.injection.raw-html-format.raw-html-format
+        return [
+            {"text": f"<word_document>{word_document}</word_document>"},
+            {"cachePoint": {"type": "default"}},
+            # nosemgrep: python.django.security.injection.raw-html-format.raw-html-format
+            {"text": f"{highlighted_section}\n<user_input>{user_input}</user_input>"},
+        ]
+
+
+async def watch_disconnect(request: Request, lease) -> None:
+    """Cancel the lease once the client goes away, so the agent stops generating for nobody."""
+    while not lease.cancelled:
+        if await request.is_disconnected():
+            lease.cancel("client disconnected")
+            return
+        await asyncio.sleep(SSE_DISCONNECT_POLL_SECONDS)
 
 
 @router.post("/invoke")
 async def invoke(request: Request):
     body = await request.json()
     session_id = request.headers.get("x-session-id", "default")
+    # Client-chosen id for POST /invoke/{request_id}/cancel; generated if absent
+    request_id = request.headers.get("x-request-id") or None
+    # Admission queues are fair across users (or sessions, when no user is given)
+    fair_key = request.headers.get("x-user-id") or session_id
     auto_approve = request.headers.get("x-auto-approve-tools", "false") == "true"
-
-    # Set environment variable for tool consent based on user preference
-    if auto_approve:
-        os.environ["BYPASS_TOOL_CONSENT"] = "true"
-    else:
-        os.environ["BYPASS_TOOL_CONSENT"] = "false"
+    bind_log_context(session_id=session_id)
 
     user_input = body.get("prompt", "")
     word_document = body.get("word_document", "")
@@ -116,54 +355,104 @@ async def invoke(request: Request):
     logger.info("Session: %s | Model: %s | Prompt length: %d | Document length: %d",
                 session_id, model_id, len(user_input), len(word_document))
 
+    # Large microsoft_actions payloads are gzipped only for clients that ask for it
+    gzip_min_bytes = SSE_GZIP_MIN_BYTES if accepts_gzip_events(request) else None
+
     if MOCK_MODE:
         logger.info("MOCK MODE — returning hardcoded response")
 
         async def mock_sse():
             async for event in mock_stream(word_document, model_id):
-                yield f"data: {json.dumps(event)}\n\n"
-
-        return StreamingResponse(mock_sse(), media_type="text/event-stream")
-
-    agent = get_or_create_agent(session_id, model_id)
-
-    # Check if document unchanged since last message in this session
-    last_doc_hash = getattr(agent, '_last_doc_hash', None)
-    doc_unchanged = (current_hash and last_doc_hash and current_hash == last_doc_hash)
-
-    # Store current hash for next request
-    agent._last_doc_hash = current_hash
-
-    if doc_unchanged:
-        # Document hasn't changed — skip sending full content, just send user input
-        logger.info("Document unchanged (hash match) — skipping document content")
-
-        # Still convert highlighted text (user may have selected different text)
-        highlighted = convert_to_placeholders(highlighted)
-        # nosemgrep: python.django.security.injection.raw-html-format.raw-html-format
-        highlighted_section = f"<highlighted>{highlighted}</highlighted>" if highlighted else ""
-
-        # nosemgrep: python.django.security.injection.raw-html-format.raw-html-format
-        user_message = f"{highlighted_section}\n<user_input>{user_input}</user_input>\n\n<note>The Word document content is unchanged since your last response. Refer to the previous <word_document> in this conversation.</note>"
-    else:
-        # Document changed or first message — send full content
-        logger.info("Document changed or first message — sending full document content")
-
-        # Convert problematic characters to placeholders before sending to LLM
-        word_document = convert_to_placeholders(word_document)
-        highlighted = convert_to_placeholders(highlighted)
-
-        # nosemgrep: python.django.security.injection.raw-html-format.raw-html-format
-        highlighted_section = f"<highlighted>{highlighted}</highlighted>" if highlighted else ""
-
-        # nosemgrep: python.django.security.injection.raw-html-format.raw-html-format
-        user_message = f"<word_document>{word_document}</word_document>\n{highlighted_section}\n<user_input>{user_input}</user_input>"
+                yield format_event(event, gzip_min_bytes)
+
+        return StreamingResponse(mock_sse(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+    # One request per session at a time — queue, reject or cancel per SESSION_CONCURRENCY_POLICY
+    try:
+        lease = await session_locks.acquire(session_id, request_id)
+    except SessionBusyError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    bind_log_context(request_id=lease.request_id)
+
+    try:
+        agent = await get_or_create_agent(session_id, model_id)
+        # Document copies the new message supersedes are stubbed out once it is added to the history
+        user_message = build_user_message(agent, user_input, word_document, highlighted, current_hash)
+        message_chars = sum(len(block.get("text", "")) for block in user_message)
+        estimated_tokens = estimate_tokens(estimate_agent_bytes(agent) + message_chars)
+    except Exception:
+        lease.release()
+        raise
 
     async def sse_stream():
-        async for event in stream_agent_response(agent, user_message):
-            yield f"data: {json.dumps(event)}\n\n"
+        # Tool consent is scoped to this request's stream rather than the process environment
+        set_tool_consent(auto_approve)
+        disconnect_watcher = asyncio.create_task(watch_disconnect(request, lease))
+        # Wait for a slot on the model within its concurrency and TPM limits
+        ticket = admission_controller.enqueue(model_id, fair_key, estimated_tokens)
+        usage_before, ttft = None, None
+        try:
+            while not ticket.admitted:
+                downgraded = admission_controller.maybe_downgrade(ticket, allowed_models)
+                if downgraded is not None:
+                    yield format_event({"type": "model_downgraded", "from": ticket.model_id, "to": downgraded.model_id}, gzip_min_bytes)
+                    ticket = downgraded
+                    set_agent_model(session_id, agent, ticket.model_id)
+                    continue
+                yield format_event(ticket.status(), gzip_min_bytes)
+                await ticket.wait(MODEL_QUEUE_UPDATE_SECONDS, stop=lease.cancel_event)
+                if lease.cancelled:
+                    logger.info("Session %s: request %s while queued", session_id, lease.cancel_reason)
+                    return
+
+            usage_before = dict(agent.event_loop_metrics.accumulated_usage)
+            started = time.monotonic()
+            async with aclosing(stream_agent_response(agent, user_message, lease)) as events:
+                async for event in events:
+                    if ttft is None:
+                        ttft = time.monotonic() - started
+                    yield format_event(event, gzip_min_bytes)
+        finally:
+            used = None
+            if usage_before is not None:
+                # Token usage of this turn, including prompt-cache reads/writes reported by LiteLLM
+                usage = {
+                    field: count - usage_before.get(field, 0)
+                    for field, count in agent.event_loop_metrics.accumulated_usage.items()
+                }
+                used = usage.get("totalTokens") or None
+                usage_stats.record(ticket.model_id, usage, ttft)
+                logger.info("Session %s | Model %s | input %d (cache read %d, write %d) | output %d | first event %s",
+                            session_id, ticket.model_id, usage.get("inputTokens", 0),
+                            usage.get("cacheReadInputTokens", 0), usage.get("cacheWriteInputTokens", 0),
+                            usage.get("outputTokens", 0), f"{ttft:.2f}s" if ttft is not None else "-")
+            # Cancelled while queued, or failed before the message was added: the model never saw
+            # this document, so the agent keeps the state of the last one it did see
+            if discard_turn(agent):
+                logger.info("Session %s: user message was not sent — document state left unchanged", session_id)
+            # Charge the model's TPM budget with what the turn actually used
+            ticket.release(used)
+            disconnect_watcher.cancel()
+            try:
+                if usage_before is not None:
+                    # The turn is stored — let other workers know before the next request can start
+                    await asyncio.to_thread(publish_agent_state, session_id, agent, ticket.model_id)
+            finally:
+                lease.release()
 
     return StreamingResponse(
-        sse_stream(),
+        with_heartbeats(sse_stream(), SSE_HEARTBEAT_SECONDS),
         media_type="text/event-stream",
+        # Affinity hint — load balancers can pin the session to the worker that holds it
+        headers={**SSE_HEADERS, "x-request-id": lease.request_id, "x-session-worker": worker_id},
+        background=BackgroundTask(lease.release),
     )
+
+
+@router.post("/invoke/{request_id}/cancel")
+async def cancel_invoke(request_id: str):
+    """Stop a running /invoke stream. Its partial turn is closed off in the session history."""
+    if not session_locks.cancel_request(request_id, "cancelled by client"):
+        raise HTTPException(status_code=404, detail=f"No running request {request_id}")
+    logger.info("Cancel requested for %s", request_id)
+    return {"status": "cancelling", "request_id": request_id}
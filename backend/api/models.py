@@ -1,6 +1,8 @@
 import logging
 from fastapi import APIRouter
-from config import LITELLM_PROXY_URL, LITELLM_MASTER_KEY
+from models.model_catalog import model_catalog
+from models.admission import admission_controller
+from models.usage import usage_stats
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -9,34 +11,15 @@ router = APIRouter()
 @router.get("/models")
 async def list_models():
     """
-    Fetch available models from LiteLLM proxy or return static list.
+    Serve available models from the cached LiteLLM proxy catalog or return static list.
     Frontend uses this to populate the model picker dynamically.
     """
-    if LITELLM_PROXY_URL:
-        try:
-            import httpx
-            headers = {"Authorization": f"Bearer {LITELLM_MASTER_KEY}"} if LITELLM_MASTER_KEY else {}
-
-            async with httpx.AsyncClient() as client:
-                resp = await client.get(f"{LITELLM_PROXY_URL}/model/info", headers=headers, timeout=5.0)
-                resp.raise_for_status()
-                data = resp.json()
-
-                # Transform proxy response to frontend format
-                models = []
-                for model_info in data.get("data", []):
-                    # Use the litellm_params.model if available, otherwise model_name
-                    model_id = model_info.get("litellm_params", {}).get("model") or model_info["model_name"]
-                    models.append({
-                        "id": model_id,
-                        "label": model_id,
-                    })
-
-                logger.info(f"Served {len(models)} models from proxy")
-                return {"models": models}
-        except Exception as e:
-            logger.error(f"Failed to fetch models from proxy: {e}")
-            # Fall through to static list
+    model_ids = await model_catalog.get_model_ids()
+    if model_ids is not None:
+        # Transform catalog to frontend format
+        models = [{"id": model_id, "label": model_id} for model_id in model_ids]
+        logger.info(f"Served {len(models)} models from proxy")
+        return {"models": models}
 
     # Fallback: static list when proxy is unavailable
     return {
@@ -46,3 +29,15 @@ async def list_models():
             {"id": "anthropic/claude-opus-4-5", "label": "Claude Opus 4.5"},
         ]
     }
+
+
+@router.get("/models/admission")
+async def admission_stats():
+    """Per-model admission state: limits, running and queued requests, tokens used in the last minute."""
+    return admission_controller.stats()
+
+
+@router.get("/models/usage")
+async def model_usage():
+    """Token usage per model since startup, including prompt-cache reads/writes and time to first event."""
+    return usage_stats.stats()
@@ -1,63 +1,139 @@
-import os
+import re
 import json
-import shutil
+import asyncio
 import logging
-from fastapi import APIRouter
-from agent.manager import evict_agent
-from config import SESSIONS_DIR
+from typing import Literal
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import JSONResponse, StreamingResponse
+from agent.manager import evict_agent, get_cache_stats, get_or_create_agent
+from agent.concurrency import session_locks
+from agent.session_store import session_store
+from agent.shared_state import shared_state, worker_id
+from config import DEFAULT_MODEL_ID
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# Full document snapshots embedded in persisted user turns
+DOCUMENT_BLOCK_RE = re.compile(r"<(word_document|word_document_changes|word_document_outline)>(.*?)</\1>", re.DOTALL)
+DOCUMENT_TRUNCATE_CHARS = 500
+
 
 @router.get("/sessions")
-async def list_sessions():
-    results = []
-    if not os.path.isdir(SESSIONS_DIR):
-        return {"sessions": []}
+async def list_sessions(limit: int | None = None, cursor: str | None = None):
+    """
+    List sessions newest first from the session index.
+    Pass `limit` to paginate; follow `next_cursor` for the next page.
+    """
+    if limit is not None and limit < 1:
+        raise HTTPException(status_code=400, detail="limit must be positive")
+    try:
+        sessions, next_cursor = await asyncio.to_thread(session_store.list_sessions, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"sessions": sessions, "next_cursor": next_cursor}
+
+
+@router.get("/sessions/cache")
+async def agent_cache_stats():
+    """This worker's in-memory agent cache: entries and bytes against the limits, hits, misses and evictions by reason."""
+    return {"worker": worker_id, **get_cache_stats()}
+
+
+def _strip_documents(data: dict, mode: str) -> dict:
+    """Drop or truncate <word_document> blocks in a persisted message's text content."""
+    if mode == "keep":
+        return data
+
+    def replace(match: re.Match) -> str:
+        tag, body = match.group(1), match.group(2)
+        if mode == "truncate" and len(body) > DOCUMENT_TRUNCATE_CHARS:
+            body = body[:DOCUMENT_TRUNCATE_CHARS] + f"\n[... {len(body) - DOCUMENT_TRUNCATE_CHARS} characters truncated]"
+        elif mode == "drop":
+            body = "[omitted]"
+        return f"<{tag}>{body}</{tag}>"
+
+    for block in data.get("message", {}).get("content", []):
+        if "text" in block:
+            block["text"] = DOCUMENT_BLOCK_RE.sub(replace, block["text"])
+    return data
 
-    for entry in os.listdir(SESSIONS_DIR):
-        session_json = os.path.join(SESSIONS_DIR, entry, "session.json")
-        if os.path.isfile(session_json):
-            with open(session_json) as f:
-                data = json.load(f)
-            results.append({
-                "session_id": data["session_id"],
-                "created_at": data["created_at"],
-            })
 
-    results.sort(key=lambda s: s["created_at"], reverse=True)
-    return {"sessions": results}
+def _read_message(session_id: str, message_id: int, documents: str) -> dict | None:
+    data = session_store.read_message(session_id, message_id)
+    return _strip_documents(data, documents) if data else None
 
 
 @router.get("/sessions/{session_id}/messages")
-async def get_session_messages(session_id: str):
-    messages_dir = os.path.join(SESSIONS_DIR, f"session_{session_id}", "agents", "agent_default", "messages")
-    if not os.path.isdir(messages_dir):
-        return {"messages": []}
+async def get_session_messages(
+    session_id: str,
+    limit: int | None = None,
+    before_id: int | None = None,
+    documents: Literal["keep", "truncate", "drop"] = "keep",
+    format: Literal["json", "ndjson"] = "json",
+):
+    """
+    Return a session's messages in ascending message_id order.
 
-    messages = []
-    for filename in os.listdir(messages_dir):
-        if filename.startswith("message_") and filename.endswith(".json"):
-            with open(os.path.join(messages_dir, filename)) as f:
-                data = json.load(f)
-            messages.append(data)
+    - `limit` / `before_id`: return the latest `limit` messages older than `before_id`;
+      follow `next_before_id` to page further back
+    - `documents`: keep, truncate or drop embedded <word_document> blocks
+    - `format=ndjson`: stream one message per line instead of a single JSON body
+    """
+    if limit is not None and limit < 1:
+        raise HTTPException(status_code=400, detail="limit must be positive")
 
-    messages.sort(key=lambda m: m["message_id"])
-    return {"messages": messages}
+    # One extra id tells us whether an older page exists — only the selected messages are read
+    message_ids = await asyncio.to_thread(
+        session_store.list_message_ids, session_id, None if limit is None else limit + 1, before_id
+    )
+    next_before_id = None
+    if limit is not None and len(message_ids) > limit:
+        message_ids = message_ids[1:]
+        next_before_id = message_ids[0]
+
+    if format == "ndjson":
+        async def ndjson_stream():
+            for message_id in message_ids:
+                data = await asyncio.to_thread(_read_message, session_id, message_id, documents)
+                if data:
+                    yield json.dumps(data) + "\n"
+
+        headers = {"x-next-before-id": str(next_before_id)} if next_before_id is not None else {}
+        return StreamingResponse(ndjson_stream(), media_type="application/x-ndjson", headers=headers)
+
+    messages = await asyncio.to_thread(
+        lambda: [data for message_id in message_ids if (data := _read_message(session_id, message_id, documents))]
+    )
+    return {"messages": messages, "next_before_id": next_before_id}
 
 
 @router.delete("/sessions/{session_id}")
 async def delete_session(session_id: str):
-    session_dir = os.path.join(SESSIONS_DIR, f"session_{session_id}")
-
-    # Evict from in-memory cache if present
+    # Evict from in-memory cache if present, and drop the state shared with other workers
     evict_agent(session_id)
+    await asyncio.to_thread(shared_state.delete, session_id)
 
-    # Remove from disk
-    if os.path.isdir(session_dir):
-        shutil.rmtree(session_dir)
+    # Remove from the session store
+    if await asyncio.to_thread(session_store.delete_session, session_id):
         logger.info(f"Deleted session: {session_id}")
         return {"deleted": True, "session_id": session_id}
 
     return {"deleted": False, "session_id": session_id, "error": "Session not found"}
+
+
+@router.post("/sessions/{session_id}/warm")
+async def warm_session(session_id: str):
+    """
+    Load the session's agent on this worker ahead of its next /invoke (e.g. when the load
+    balancer moves the session here): rebuilt from the session store and warmed with the
+    shared document state, or reused if already current. Needs a shared SESSION_STATE_BACKEND.
+    """
+    state = await asyncio.to_thread(shared_state.get, session_id)
+    warmed = state is not None and not session_locks.is_busy(session_id)
+    if warmed:
+        await get_or_create_agent(session_id, state["model_id"] or DEFAULT_MODEL_ID)
+    return JSONResponse(
+        {"session_id": session_id, "worker": worker_id, "warmed": warmed, "revision": state["revision"] if state else None},
+        headers={"x-session-worker": worker_id},
+    )
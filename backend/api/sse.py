@@ -0,0 +1,156 @@
+"""
+Server-sent event helpers for /invoke: text batching, timer-driven iteration,
+heartbeats and optional gzip of large microsoft_actions payloads.
+"""
+
+import asyncio
+import base64
+import gzip
+import json
+import time
+from typing import AsyncIterator
+
+# Yielded by iterate_with_timeout when no item arrived within the timeout
+TIMEOUT = object()
+_DONE = object()
+
+HEARTBEAT = ": ping\n\n"
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    # Stop nginx-style proxies from buffering the stream
+    "X-Accel-Buffering": "no",
+}
+
+
+class TextBatcher:
+    """
+    Buffers text chunks until one of the flush triggers fires:
+    `max_chunks` chunks, `max_bytes` characters, or `max_delay` seconds since the first
+    buffered chunk. The delay trigger needs a timer — see `time_left` and `iterate_with_timeout`.
+    """
+
+    def __init__(self, max_delay: float, max_bytes: int, max_chunks: int):
+        self.max_delay = max_delay
+        self.max_bytes = max_bytes
+        self.max_chunks = max_chunks
+        self._chunks: list[str] = []
+        self._size = 0
+        self._first_at = 0.0
+
+    def __bool__(self) -> bool:
+        return bool(self._chunks)
+
+    def add(self, text: str) -> str | None:
+        """Buffer a chunk. Returns the batch if a size or count trigger fired."""
+        if not self._chunks:
+            self._first_at = time.monotonic()
+        self._chunks.append(text)
+        self._size += len(text)
+        if len(self._chunks) >= self.max_chunks or self._size >= self.max_bytes or self.time_left() == 0:
+            return self.flush()
+        return None
+
+    def time_left(self) -> float | None:
+        """Seconds until the delay trigger fires, or None while nothing is buffered."""
+        if not self._chunks:
+            return None
+        return max(0.0, self.max_delay - (time.monotonic() - self._first_at))
+
+    def flush(self) -> str | None:
+        if not self._chunks:
+            return None
+        text = "".join(self._chunks)
+        self._chunks.clear()
+        self._size = 0
+        return text
+
+
+async def iterate_with_timeout(
+    source: AsyncIterator, timeout_fn, stop: asyncio.Event | None = None, max_pending: int = 64
+) -> AsyncIterator:
+    """
+    Iterate `source`, yielding TIMEOUT whenever `timeout_fn()` seconds pass without an item
+    (None means wait indefinitely), and returning as soon as `stop` is set.
+
+    The source is drained by a single pump task so it always runs in one task and context;
+    the bounded queue gives it backpressure. Leaving the iteration (stop, aclose, or the
+    consumer being cancelled) cancels the pump, which closes the source.
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+
+    async def pump():
+        try:
+            async for item in source:
+                await queue.put(item)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            await queue.put(e)
+            return
+        finally:
+            # Cancelled while parked on queue.put — the source is still suspended mid-iteration
+            aclose = getattr(source, "aclose", None)
+            if aclose is not None:
+                await aclose()
+        await queue.put(_DONE)
+
+    task = asyncio.create_task(pump())
+    stop_waiter = asyncio.ensure_future(stop.wait()) if stop is not None else None
+    getter = None
+    try:
+        while True:
+            if getter is None:
+                getter = asyncio.ensure_future(queue.get())
+            waiters = {getter} if stop_waiter is None else {getter, stop_waiter}
+            done, _ = await asyncio.wait(waiters, timeout=timeout_fn(), return_when=asyncio.FIRST_COMPLETED)
+            if stop_waiter is not None and stop_waiter in done:
+                return
+            if getter not in done:
+                yield TIMEOUT
+                continue
+            item, getter = getter.result(), None
+            if item is _DONE:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        for waiter in (getter, stop_waiter):
+            if waiter is not None and not waiter.done():
+                waiter.cancel()
+        if not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                # Either the pump's own cancellation or ours — the pump finishes closing the source regardless
+                pass
+
+
+def format_event(event: dict, gzip_min_bytes: int | None = None) -> str:
+    """
+    Serialize one event as an SSE frame. If `gzip_min_bytes` is set (the client negotiated
+    gzip), microsoft_actions payloads at least that large are sent gzipped and base64-encoded
+    as {"type": "microsoft_actions", "encoding": "gzip", "data": ...}.
+    """
+    payload = json.dumps(event, ensure_ascii=False, separators=(",", ":"))
+    if gzip_min_bytes is not None and event.get("type") == "microsoft_actions" and len(payload) >= gzip_min_bytes:
+        compressed = base64.b64encode(gzip.compress(payload.encode("utf-8"), compresslevel=6)).decode("ascii")
+        if len(compressed) < len(payload):
+            payload = json.dumps({"type": "microsoft_actions", "encoding": "gzip", "data": compressed})
+    return f"data: {payload}\n\n"
+
+
+def accepts_gzip_events(request) -> bool:
+    """Whether the client opted in to gzipped event payloads via the x-sse-encoding header."""
+    return "gzip" in request.headers.get("x-sse-encoding", "").lower()
+
+
+async def with_heartbeats(frames: AsyncIterator[str], interval: float) -> AsyncIterator[str]:
+    """Pass SSE frames through, inserting a comment frame after `interval` idle seconds."""
+    if interval <= 0:
+        async for frame in frames:
+            yield frame
+        return
+    async for frame in iterate_with_timeout(frames, lambda: interval):
+        yield HEARTBEAT if frame is TIMEOUT else frame
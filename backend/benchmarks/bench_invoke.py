@@ -0,0 +1,224 @@
+"""
+End-to-end /invoke benchmark: starts the FastAPI app in a subprocess with ReplayModel in place
+of the LLM, drives concurrent clients against it and reports latency and server cost.
+
+Run from the backend directory:
+    uv run python -m benchmarks.bench_invoke [--clients 16] [--turns 3] [--tokens-per-second 80]
+        [--paragraphs 50,1000,6000] [--sessions sessions/] [--session-backend file|sqlite]
+
+Each client is one session sending --turns requests: the full document, then a one-paragraph
+edit (sent as a delta) and then the same document again (unchanged). Documents use
+"{i}.p{i}" addresses and some smart punctuation, like bench_placeholders. Sessions are written
+to a temporary directory; recorded turns are read from --sessions (or built in, if none).
+
+Per document size it prints:
+  ttfb         time to the first byte of the response body (queue status counts)
+  first model  time to the first content / tool_use / microsoft_action event
+  events/s     SSE events received per second of wall time, all clients together
+  cpu ms/req   server process CPU time (user + system) per request
+  rss MB       server resident memory growth over the run
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+
+import httpx
+
+from benchmarks.bench_placeholders import make_document
+
+MODEL_EVENTS = {"content", "tool_use", "microsoft_action", "microsoft_actions"}
+PROMPT = "Review this agreement and propose redlines for anything one-sided."
+
+
+def _rss_bytes() -> int:
+    """Current resident set size (peak on platforms without /proc)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def serve(args: argparse.Namespace) -> None:
+    """Server side: the real app with ReplayModel installed and a process stats route."""
+    import uvicorn
+    from agent.manager import set_model_factory
+    from benchmarks.replay_model import ReplayModel, load_recorded_turns
+    from main import app
+
+    turns = load_recorded_turns(args.sessions) if args.sessions else []
+    print(f"Replaying {len(turns) or 'built-in'} turns", file=sys.stderr)
+    set_model_factory(lambda model_id: ReplayModel(
+        model_id, turns, args.tokens_per_second, args.first_token_ms / 1000, args.tokens_per_delta,
+    ))
+
+    @app.get("/bench/process")
+    def process_stats():
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        return {"cpu_seconds": usage.ru_utime + usage.ru_stime, "rss_bytes": _rss_bytes()}
+
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def edit_document(document: str, turn: int) -> str:
+    """Change the text of one paragraph, so the next request is sent as a delta."""
+    lines = document.split("\n")
+    i = turn % len(lines)
+    lines[i] = lines[i] + f" Amended in turn {turn}."
+    return "\n".join(lines)
+
+
+async def invoke_once(client: httpx.AsyncClient, session_id: str, document: str, document_hash: str) -> dict:
+    body = {"prompt": PROMPT, "word_document": document, "highlighted": "", "document_hash": document_hash}
+    started = time.perf_counter()
+    ttfb = first_model = None
+    events, status = 0, None
+    async with client.stream("POST", "/invoke", json=body, headers={"x-session-id": session_id}) as response:
+        status = response.status_code
+        buffer = ""
+        async for chunk in response.aiter_text():
+            if ttfb is None:
+                ttfb = time.perf_counter() - started
+            buffer += chunk
+            *frames, buffer = buffer.split("\n\n")
+            for frame in frames:
+                if not frame.startswith("data: "):
+                    continue  # heartbeat comment
+                events += 1
+                if first_model is None and json.loads(frame[6:]).get("type") in MODEL_EVENTS:
+                    first_model = time.perf_counter() - started
+    return {"status": status, "ttfb": ttfb, "first_model": first_model, "events": events}
+
+
+async def run_client(client: httpx.AsyncClient, paragraphs: int, turns: int, seed: int) -> list[dict]:
+    session_id = f"bench-{uuid.uuid4().hex[:12]}"
+    document = make_document(paragraphs, special_density=0.01, seed=seed)
+    results = []
+    for turn in range(turns):
+        if turn % 3 == 1:
+            document = edit_document(document, turn)
+        # Unchanged turns resend the previous hash, as the task pane does
+        document_hash = str(hash(document))
+        results.append(await invoke_once(client, session_id, document, document_hash))
+    return results
+
+
+async def process_stats(client: httpx.AsyncClient) -> dict:
+    return (await client.get("/bench/process")).json()
+
+
+async def run_size(client: httpx.AsyncClient, paragraphs: int, clients: int, turns: int) -> dict:
+    before = await process_stats(client)
+    started = time.perf_counter()
+    per_client = await asyncio.gather(*(run_client(client, paragraphs, turns, seed) for seed in range(clients)))
+    wall = time.perf_counter() - started
+    after = await process_stats(client)
+
+    results = [result for client_results in per_client for result in client_results]
+    ok = [result for result in results if result["status"] == 200]
+    return {
+        "paragraphs": paragraphs,
+        "requests": len(results),
+        "errors": len(results) - len(ok),
+        "ttfb": [result["ttfb"] for result in ok if result["ttfb"] is not None],
+        "first_model": [result["first_model"] for result in ok if result["first_model"] is not None],
+        "events_per_second": sum(result["events"] for result in ok) / wall,
+        "cpu_ms_per_request": (after["cpu_seconds"] - before["cpu_seconds"]) * 1000 / max(1, len(results)),
+        "rss_growth_mb": (after["rss_bytes"] - before["rss_bytes"]) / 1e6,
+    }
+
+
+async def wait_until_ready(client: httpx.AsyncClient, server: subprocess.Popen, timeout: float = 60) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError("Benchmark server exited during startup")
+        try:
+            await process_stats(client)
+            return
+        except httpx.TransportError:
+            await asyncio.sleep(0.2)
+    raise RuntimeError("Benchmark server did not start")
+
+
+async def drive(args: argparse.Namespace) -> None:
+    sessions_dir = tempfile.mkdtemp(prefix="redliner-bench-")
+    env = {**os.environ, "SESSIONS_DIR": sessions_dir, "SESSION_BACKEND": args.session_backend,
+           "SESSION_DB_PATH": os.path.join(sessions_dir, "sessions.sqlite3")}
+    command = [sys.executable, "-m", "benchmarks.bench_invoke", "--serve", "--port", str(args.port),
+               "--tokens-per-second", str(args.tokens_per_second), "--first-token-ms", str(args.first_token_ms),
+               "--tokens-per-delta", str(args.tokens_per_delta)]
+    if args.sessions:
+        command += ["--sessions", os.path.abspath(args.sessions)]
+    # Strands' default callback handler prints every streamed chunk to stdout
+    server = subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL)
+
+    timeout = httpx.Timeout(300, connect=10)
+    limits = httpx.Limits(max_connections=args.clients + 4)
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", timeout=timeout, limits=limits) as client:
+            await wait_until_ready(client, server)
+            baseline = await process_stats(client)
+            # Warm-up: imports, tool loading and first-request paths stay out of the numbers
+            await run_size(client, 20, 1, 1)
+
+            print(f"clients={args.clients} turns={args.turns} tokens/s={args.tokens_per_second or 'unlimited'} "
+                  f"first token={args.first_token_ms}ms sessions={args.session_backend}")
+            print(f"{'paras':>6}{'reqs':>6}{'err':>5}{'ttfb p50/p95/p99 ms':>24}{'first model p50/p95/p99 ms':>30}"
+                  f"{'events/s':>10}{'cpu ms/req':>12}{'rss MB':>8}")
+            for paragraphs in args.paragraphs:
+                row = await run_size(client, paragraphs, args.clients, args.turns)
+                ttfb = "/".join(f"{percentile(row['ttfb'], p) * 1000:.0f}" for p in (50, 95, 99))
+                first_model = "/".join(f"{percentile(row['first_model'], p) * 1000:.0f}" for p in (50, 95, 99))
+                print(f"{paragraphs:>6}{row['requests']:>6}{row['errors']:>5}{ttfb:>24}{first_model:>30}"
+                      f"{row['events_per_second']:>10.0f}{row['cpu_ms_per_request']:>12.1f}{row['rss_growth_mb']:>+8.1f}")
+
+            final = await process_stats(client)
+            print(f"server RSS {baseline['rss_bytes'] / 1e6:.0f} MB -> {final['rss_bytes'] / 1e6:.0f} MB")
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+        shutil.rmtree(sessions_dir, ignore_errors=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=16, help="concurrent sessions")
+    parser.add_argument("--turns", type=int, default=3, help="requests per session")
+    parser.add_argument("--paragraphs", type=lambda value: [int(n) for n in value.split(",")], default=[50, 1000, 6000],
+                        help="document sizes to run, in paragraphs (~250 chars each)")
+    parser.add_argument("--tokens-per-second", type=float, default=80, help="replay output rate (0 = unlimited)")
+    parser.add_argument("--first-token-ms", type=float, default=300, help="replay delay before each model response")
+    parser.add_argument("--tokens-per-delta", type=int, default=4, help="tokens per streamed delta")
+    parser.add_argument("--sessions", default="sessions/" if os.path.isdir("sessions") else None,
+                        help="directory of recorded sessions to replay")
+    parser.add_argument("--session-backend", default="file", choices=["file", "sqlite"])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args)
+    else:
+        asyncio.run(drive(args))
+
+
+if __name__ == "__main__":
+    main()
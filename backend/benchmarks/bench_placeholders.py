@@ -0,0 +1,87 @@
+"""
+Micro-benchmark: placeholder codec vs the previous per-character str.replace chain.
+
+Run from the backend directory:
+    uv run python -m benchmarks.bench_placeholders
+"""
+
+import random
+import time
+
+from agent.utils import CHAR_PLACEHOLDERS, PLACEHOLDER_CODEC
+
+PLAIN_WORDS = "the supplier shall indemnify the customer against all claims arising from breach of this agreement".split()
+SPECIAL_WORDS = ["“indemnify”", "Customer’s", "–", "…", "—", "end\r"]
+
+
+def legacy_encode(text: str) -> str:
+    for char, placeholder in CHAR_PLACEHOLDERS.items():
+        text = text.replace(char, placeholder)
+    return text
+
+
+def legacy_decode(text: str) -> str:
+    for char, placeholder in CHAR_PLACEHOLDERS.items():
+        text = text.replace(placeholder, char)
+    return text
+
+
+def make_document(paragraphs: int, special_density: float, seed: int = 0) -> str:
+    """Build a {docPosition}.p{n} document; special_density is the share of words with smart punctuation."""
+    rng = random.Random(seed)
+    lines = []
+    for i in range(paragraphs):
+        words = (
+            rng.choice(SPECIAL_WORDS) if rng.random() < special_density else rng.choice(PLAIN_WORDS)
+            for _ in range(40)
+        )
+        lines.append(f"{i}.p{i}: " + " ".join(words))
+    return "\n".join(lines)
+
+
+def timed(fn, arg, repeat: int = 5) -> float:
+    """Best-of-N wall time in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(arg)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def stream_chunks(text: str, size: int = 24) -> list[str]:
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def main() -> None:
+    print(f"{'case':<28}{'MB':>6}{'legacy ms':>12}{'codec ms':>12}{'speedup':>10}")
+    for paragraphs in (6_000, 24_000):
+        for density in (0.0, 0.005, 0.05):
+            document = make_document(paragraphs, density)
+            encoded = legacy_encode(document)
+            assert PLACEHOLDER_CODEC.encode(document) == encoded
+            assert PLACEHOLDER_CODEC.decode(encoded) == document
+            size_mb = len(document.encode("utf-8")) / 1e6
+
+            chunks = stream_chunks(encoded)
+
+            def codec_stream(chunks):
+                decoder = PLACEHOLDER_CODEC.incremental_decoder()
+                return "".join(decoder.decode(chunk) for chunk in chunks) + decoder.decode("", final=True)
+
+            def legacy_stream(chunks):
+                return "".join(legacy_decode(chunk) for chunk in chunks)
+
+            for name, legacy, codec, arg in (
+                ("encode", legacy_encode, PLACEHOLDER_CODEC.encode, document),
+                ("decode", legacy_decode, PLACEHOLDER_CODEC.decode, encoded),
+                ("stream decode", legacy_stream, codec_stream, chunks),
+            ):
+                legacy_ms = timed(legacy, arg)
+                codec_ms = timed(codec, arg)
+                label = f"{name} d={density}"
+                print(f"{label:<28}{size_mb:>6.1f}{legacy_ms:>12.1f}{codec_ms:>12.1f}{legacy_ms / codec_ms:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Startup benchmark: an `-X importtime` digest of `import main`, plus how long a fresh server
+takes to answer /healthz (serving) and /readyz (background warm-up done).
+
+Run from the backend directory:
+    uv run python -m benchmarks.bench_startup [--top 25] [--json] [--no-server]
+
+The digest lists the modules with the largest cumulative import time, i.e. what uvicorn
+waits for before it can serve. Anything heavy in it (litellm, strands_tools, ddgs, ...)
+should be imported lazily or by the warm-up in main.py instead. --json prints the
+numbers as one object for tracking across commits.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+
+def import_profile() -> tuple[float, list[tuple[float, float, str]]]:
+    """Total import time of `main` in seconds and (cumulative, self, module) rows, largest first."""
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {**os.environ, "SESSIONS_DIR": tmp, "LOG_FILE": os.path.join(tmp, "bench.log")}
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"],
+                                env=env, capture_output=True, text=True, check=True)
+
+    rows, total = [], 0.0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line.split(":", 1)[1].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        row = (int(cumulative_us) / 1e6, int(self_us) / 1e6, name.strip())
+        rows.append(row)
+        if depth == 0:
+            total += row[0]
+    rows.sort(reverse=True)
+    return total, rows
+
+
+def server_startup(port: int, timeout: float = 120) -> dict:
+    """Seconds from process start until /healthz and /readyz first return 200."""
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {**os.environ, "SESSIONS_DIR": tmp, "LOG_FILE": os.path.join(tmp, "bench.log")}
+        started = time.perf_counter()
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+            env=env, stdout=subprocess.DEVNULL,
+        )
+        timings = {}
+        try:
+            with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=5) as client:
+                deadline = started + timeout
+                for endpoint in ("/healthz", "/readyz"):
+                    while time.perf_counter() < deadline:
+                        if server.poll() is not None:
+                            raise RuntimeError("Server exited during startup")
+                        try:
+                            if client.get(endpoint).status_code == 200:
+                                timings[endpoint] = time.perf_counter() - started
+                                break
+                        except httpx.TransportError:
+                            pass
+                        time.sleep(0.05)
+                    else:
+                        raise RuntimeError(f"{endpoint} did not return 200 within {timeout}s")
+                timings["warm_up"] = client.get("/readyz").json()
+        finally:
+            server.terminate()
+            server.wait(timeout=10)
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--top", type=int, default=25, help="modules to list")
+    parser.add_argument("--json", action="store_true", help="print one JSON object instead of tables")
+    parser.add_argument("--no-server", action="store_true", help="skip the /healthz and /readyz timing")
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+
+    total, rows = import_profile()
+    timings = None if args.no_server else server_startup(args.port)
+
+    if args.json:
+        print(json.dumps({
+            "import_main_seconds": round(total, 3),
+            "top_modules": [{"module": name, "cumulative_seconds": round(cumulative, 3)}
+                            for cumulative, _, name in rows[:args.top]],
+            "healthz_seconds": round(timings["/healthz"], 3) if timings else None,
+            "readyz_seconds": round(timings["/readyz"], 3) if timings else None,
+        }))
+        return
+
+    print(f"import main: {total * 1000:.0f} ms")
+    print(f"{'cumulative ms':>14}{'self ms':>10}  module")
+    for cumulative, self_time, name in rows[:args.top]:
+        print(f"{cumulative * 1000:>14.0f}{self_time * 1000:>10.1f}  {name}")
+    if timings:
+        print(f"\n/healthz after {timings['/healthz'] * 1000:.0f} ms, /readyz after {timings['/readyz'] * 1000:.0f} ms")
+        print(f"warm-up: {timings['warm_up']}")
+
+
+if __name__ == "__main__":
+    main()
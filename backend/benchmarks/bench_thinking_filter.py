@@ -0,0 +1,144 @@
+"""
+Replay harness for the streaming <thinking> filter: checks recorded chunk sequences against
+their expected output, re-chunks every case at random boundaries, and times the filter
+against the previous per-chunk implementation.
+
+Run from the backend directory:
+    uv run python -m benchmarks.bench_thinking_filter [--log .logs/redliner.log]
+
+--log replays the text chunks of every "Raw stream event" line in a backend log
+(one sequence per log file) through the filter and reports any tag fragments that leak.
+Raw events are only logged with LOG_RAW_STREAM_EVENTS=1 and LOG_FORMAT=text.
+"""
+
+import argparse
+import ast
+import random
+import re
+import time
+
+from agent.utils import ThinkingTagFilter
+
+# (name, chunks as streamed, expected visible text)
+CASES = [
+    ("plain", ["Hello ", "world"], "Hello world"),
+    ("single chunk", ["a<thinking>x</thinking>b"], "ab"),
+    ("block across chunks", ["Sure. <thinking>let me", " check the ", "clause</thinking> Done."], "Sure.  Done."),
+    ("open tag split", ["a<thi", "nking>hidden</thinking>b"], "ab"),
+    ("close tag split", ["a<thinking>hidden</th", "ink", "ing>b"], "ab"),
+    ("tag split per char", list("x<thinking>y</thinking>z"), "xz"),
+    ("nested", ["<thinking>a<thinking>b</thinking>c</thinking>visible"], "visible"),
+    ("two blocks", ["<thinking>a</thinking>1<thinking>b</thinking>2"], "12"),
+    ("unterminated", ["keep <thinking>never", " closed"], "keep "),
+    ("stray close", ["a</thinking>b"], "ab"),
+    ("lookalike tags", ["x < y and <think> or <thinkingcap", " stays"], "x < y and <think> or <thinkingcap stays"),
+    ("trailing lt", ["ends with <"], "ends with <"),
+    ("partial tag at end", ["ends with <thin"], "ends with <thin"),
+]
+
+
+def legacy_remove_thinking_tags(response_str):
+    """The previous per-chunk implementation, kept for comparison."""
+    if "<thinking>" in response_str and "</thinking>" in response_str:
+        thinking_start = response_str.find("<thinking>")
+        thinking_end = response_str.find("</thinking>") + len("</thinking>")
+        return response_str[:thinking_start] + response_str[thinking_end:]
+    return response_str
+
+
+def replay(chunks: list[str]) -> str:
+    thinking_filter = ThinkingTagFilter()
+    return "".join(thinking_filter.feed(chunk) for chunk in chunks) + thinking_filter.feed("", final=True)
+
+
+def rechunk(text: str, rng: random.Random, max_size: int = 12) -> list[str]:
+    chunks, pos = [], 0
+    while pos < len(text):
+        size = rng.randint(1, max_size)
+        chunks.append(text[pos:pos + size])
+        pos += size
+    return chunks
+
+
+def check_cases(rounds: int = 200) -> int:
+    rng = random.Random(0)
+    failures = 0
+    for name, chunks, expected in CASES:
+        results = {"recorded": replay(chunks)}
+        for i in range(rounds):
+            results[f"rechunk {i}"] = replay(rechunk("".join(chunks), rng))
+        legacy = "".join(legacy_remove_thinking_tags(chunk) for chunk in chunks)
+        bad = {label: out for label, out in results.items() if out != expected}
+        status = "ok" if not bad else f"FAIL {next(iter(bad.items()))!r}"
+        failures += bool(bad)
+        print(f"{name:<22} {status:<8} legacy {'ok' if legacy == expected else 'leaks'}")
+    return failures
+
+
+def make_stream(paragraphs: int, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    words = "the supplier shall indemnify the customer against all claims arising from breach".split()
+    parts = []
+    for _ in range(paragraphs):
+        if rng.random() < 0.2:
+            parts.append("<thinking>" + " ".join(rng.choice(words) for _ in range(60)) + "</thinking>")
+        parts.append(" ".join(rng.choice(words) for _ in range(40)) + " < 5 days.\n")
+    return rechunk("".join(parts), rng, max_size=24)
+
+
+def timed(fn, arg, repeat: int = 5) -> float:
+    """Best-of-N wall time in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(arg)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def bench() -> None:
+    print(f"\n{'chunks':>10}{'MB':>8}{'legacy ms':>12}{'filter ms':>12}")
+    for paragraphs in (2_000, 20_000):
+        chunks = make_stream(paragraphs)
+        size_mb = sum(len(chunk) for chunk in chunks) / 1e6
+        legacy_ms = timed(lambda cs: [legacy_remove_thinking_tags(c) for c in cs], chunks)
+        filter_ms = timed(replay, chunks)
+        print(f"{len(chunks):>10}{size_mb:>8.1f}{legacy_ms:>12.1f}{filter_ms:>12.1f}")
+
+
+RAW_EVENT_RE = re.compile(r"Raw stream event: (\{'data': .*\})$")
+
+
+def replay_log(path: str) -> None:
+    chunks = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            match = RAW_EVENT_RE.search(line.rstrip("\n"))
+            if not match:
+                continue
+            try:
+                event = ast.literal_eval(match.group(1))
+            except (ValueError, SyntaxError):
+                continue
+            if isinstance(event.get("data"), str):
+                chunks.append(event["data"])
+    output = replay(chunks)
+    leaks = output.count("<thinking>") + output.count("</thinking>")
+    print(f"\n{path}: {len(chunks)} chunks, {sum(map(len, chunks))} chars in, {len(output)} out, {leaks} leaked tags")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--log", action="append", default=[], help="backend log file to replay")
+    args = parser.parse_args()
+
+    failures = check_cases()
+    bench()
+    for path in args.log:
+        replay_log(path)
+    if failures:
+        raise SystemExit(f"{failures} case(s) failed")
+
+
+if __name__ == "__main__":
+    main()
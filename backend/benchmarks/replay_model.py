@@ -0,0 +1,204 @@
+"""
+Fake Strands model that replays recorded assistant turns instead of calling an LLM.
+
+Turns come from the message files / database of real sessions (see load_recorded_turns) or,
+when none are available, from BUILTIN_TURNS. Text and tool input are streamed as Strands
+events at a configurable token rate, so everything after the model — the event loop, tools,
+stream_agent_response, the placeholder codec and session writes — runs as in production.
+
+Install in a server process with agent.manager.set_model_factory (see bench_invoke).
+"""
+
+import asyncio
+import glob
+import itertools
+import json
+import os
+import sqlite3
+import uuid
+from typing import Any
+
+from strands.models.model import Model
+
+# Tools the replay keeps — local and side-effect free. Other recorded tool calls are dropped.
+REPLAY_TOOLS = {"microsoft_actions_tool", "read_document", "search_document", "search_playbooks"}
+
+CHARS_PER_TOKEN = 4
+
+# Used when no recorded sessions are found. Locations exist in benchmark documents
+# ("{i}.p{i}" paragraphs containing "the"), so the actions pass validation.
+BUILTIN_TURNS = [
+    [
+        {"role": "assistant", "content": [
+            {"text": "I reviewed the agreement. The indemnity is one-sided and the opening paragraph "
+                     "needs a clearer statement of the parties' obligations. Proposing changes now."},
+            {"toolUse": {"toolUseId": "replay", "name": "microsoft_actions_tool", "input": {"actions": json.dumps([
+                {"task": "Clarify obligations", "action": "replace", "loc": "0.p0",
+                 "new_text": "Each party shall perform its obligations under this agreement in good faith."},
+                {"task": "Flag one-sided term", "action": "highlight", "loc": "1.p1",
+                 "withinPara": {"find": "the", "occurrence": 0}},
+                {"task": "Soften wording", "action": "replace", "loc": "2.p2", "new_text": "reasonable",
+                 "withinPara": {"find": "the", "occurrence": 0}},
+            ])}}},
+        ]},
+        {"role": "assistant", "content": [{"text": "Done."}]},
+    ],
+    [
+        {"role": "assistant", "content": [
+            {"text": "The limitation of liability clause caps damages at fees paid in the prior twelve "
+                     "months, which is standard. I do not see other issues that need a redline."},
+        ]},
+    ],
+]
+
+
+def _is_user_text(message: dict) -> bool:
+    return message.get("role") == "user" and any("text" in block for block in message.get("content", []))
+
+
+def split_turns(messages: list[dict]) -> list[list[dict]]:
+    """
+    Assistant messages of each user turn, with tool calls outside REPLAY_TOOLS removed.
+    A turn ends at the first assistant message that no longer calls a tool.
+    """
+    turns, current, closed = [], None, False
+    for message in messages:
+        if _is_user_text(message):
+            if current:
+                turns.append(current)
+            current, closed = [], False
+        elif message.get("role") == "assistant" and current is not None and not closed:
+            content = [
+                block for block in message.get("content", [])
+                if "text" in block or block.get("toolUse", {}).get("name") in REPLAY_TOOLS
+            ]
+            if content:
+                current.append({"role": "assistant", "content": content})
+                closed = not any("toolUse" in block for block in content)
+    if current:
+        turns.append(current)
+    return turns
+
+
+def load_recorded_turns(sessions_dir: str) -> list[list[dict]]:
+    """Replayable turns from file sessions and the SQLite session database under `sessions_dir`."""
+    turns = []
+    for session_dir in sorted(glob.glob(os.path.join(sessions_dir, "session_*"))):
+        files = glob.glob(os.path.join(session_dir, "agents", "agent_*", "messages", "message_*.json"))
+        files.sort(key=lambda path: int(path.rsplit("_", 1)[1].split(".")[0]))
+        messages = []
+        for path in files:
+            with open(path, encoding="utf-8") as f:
+                messages.append(json.load(f)["message"])
+        turns.extend(split_turns(messages))
+
+    db_path = os.path.join(sessions_dir, "sessions.sqlite3")
+    if os.path.exists(db_path):
+        # Read-only — never touch a database the app may be using
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        try:
+            rows = conn.execute("SELECT session_id, data FROM messages ORDER BY session_id, agent_id, message_id").fetchall()
+        finally:
+            conn.close()
+        for _, group in itertools.groupby(rows, key=lambda row: row[0]):
+            turns.extend(split_turns([json.loads(data)["message"] for _, data in group]))
+    return turns
+
+
+def _chunks(text: str, size: int) -> list[str]:
+    return [text[i:i + size] for i in range(0, len(text), size)] or [""]
+
+
+class ReplayModel(Model):
+    """
+    Streams the next recorded turn on each new user message, one assistant message per model call.
+
+    tokens_per_second: output rate (0 streams as fast as possible)
+    first_token_seconds: delay before the first event of each model call
+    tokens_per_delta: tokens per contentBlockDelta (Anthropic streams a few at a time)
+    """
+
+    _turn_counter = itertools.count()
+
+    def __init__(self, model_id: str, turns: list[list[dict]], tokens_per_second: float = 0,
+                 first_token_seconds: float = 0, tokens_per_delta: int = 4):
+        self.config = {"model_id": model_id}
+        self.turns = turns or BUILTIN_TURNS
+        self.tokens_per_second = tokens_per_second
+        self.first_token_seconds = first_token_seconds
+        self.tokens_per_delta = tokens_per_delta
+        self._turn: list[dict] = []
+
+    def update_config(self, **model_config: Any) -> None:
+        self.config.update(model_config)
+
+    def get_config(self) -> dict:
+        return self.config
+
+    async def structured_output(self, output_model, prompt, system_prompt=None, **kwargs):
+        """
+        Replay a recorded structured response: the input of the first recorded tool call named
+        after `output_model` (structured output is returned as such a tool call). /invoke never
+        asks for structured output, so the benchmarks do not reach this.
+        """
+        for turn in self.turns:
+            for message in turn:
+                for block in message["content"]:
+                    tool_use = block.get("toolUse", {})
+                    if tool_use.get("name") == output_model.__name__:
+                        yield {"output": output_model(**tool_use["input"])}
+                        return
+        raise ValueError(f"No recorded {output_model.__name__} response to replay")
+
+    def _next_message(self, messages: list[dict]) -> dict:
+        # Model calls since the latest user message pick the step within the turn
+        step = 0
+        for message in reversed(messages):
+            if _is_user_text(message):
+                break
+            step += message.get("role") == "assistant"
+        if step == 0:
+            # Shared across sessions so concurrent clients get a mix of turns
+            self._turn = self.turns[next(self._turn_counter) % len(self.turns)]
+        if step < len(self._turn):
+            return self._turn[step]
+        return {"role": "assistant", "content": [{"text": "Done."}]}
+
+    async def _pace(self, chars: int) -> None:
+        if self.tokens_per_second > 0:
+            await asyncio.sleep(chars / CHARS_PER_TOKEN / self.tokens_per_second)
+
+    async def stream(self, messages, tool_specs=None, system_prompt=None, **kwargs):
+        message = self._next_message(messages)
+        if self.first_token_seconds > 0:
+            await asyncio.sleep(self.first_token_seconds)
+
+        delta_chars = CHARS_PER_TOKEN * self.tokens_per_delta
+        output_chars, stop_reason = 0, "end_turn"
+        yield {"messageStart": {"role": "assistant"}}
+        for block in message["content"]:
+            if "text" in block:
+                yield {"contentBlockStart": {"start": {}}}
+                for chunk in _chunks(block["text"], delta_chars):
+                    await self._pace(len(chunk))
+                    yield {"contentBlockDelta": {"delta": {"text": chunk}}}
+                output_chars += len(block["text"])
+                yield {"contentBlockStop": {}}
+            elif "toolUse" in block:
+                tool_use = block["toolUse"]
+                payload = json.dumps(tool_use.get("input", {}))
+                yield {"contentBlockStart": {"start": {"toolUse": {"name": tool_use["name"], "toolUseId": f"tooluse_{uuid.uuid4().hex[:12]}"}}}}
+                for chunk in _chunks(payload, delta_chars):
+                    await self._pace(len(chunk))
+                    yield {"contentBlockDelta": {"delta": {"toolUse": {"input": chunk}}}}
+                output_chars += len(payload)
+                stop_reason = "tool_use"
+                yield {"contentBlockStop": {}}
+        yield {"messageStop": {"stopReason": stop_reason}}
+
+        input_tokens = len(json.dumps(messages)) // CHARS_PER_TOKEN
+        output_tokens = output_chars // CHARS_PER_TOKEN
+        yield {"metadata": {
+            "usage": {"inputTokens": input_tokens, "outputTokens": output_tokens, "totalTokens": input_tokens + output_tokens},
+            "metrics": {"latencyMs": 0},
+        }}
@@ -1,3 +1,4 @@
+import json
 import os
 from dotenv import load_dotenv
 
@@ -13,6 +14,10 @@ LITELLM_MASTER_KEY = os.environ.get("LITELLM_MASTER_KEY", "")
 # Model Configuration
 DEFAULT_MODEL_ID = os.environ.get("DEFAULT_MODEL_ID", "anthropic/claude-haiku-4-5")
 
+# Model catalog cache — entries older than the TTL are served while refreshing in the background
+MODEL_CATALOG_TTL_SECONDS = float(os.environ.get("MODEL_CATALOG_TTL_SECONDS", "60"))
+MODEL_CATALOG_REFRESH_SECONDS = float(os.environ.get("MODEL_CATALOG_REFRESH_SECONDS", "60"))
+
 # Model IDs will be validated dynamically against proxy catalog
 # Keep this as fallback when proxy is unavailable
 FALLBACK_MODEL_IDS = {
@@ -21,8 +26,110 @@ FALLBACK_MODEL_IDS = {
     "anthropic/claude-opus-4-5",
 }
 
+# Model admission — per-model concurrency and tokens-per-minute limits (0 = unlimited)
+MODEL_DEFAULT_CONCURRENCY = int(os.environ.get("MODEL_DEFAULT_CONCURRENCY", "8"))
+MODEL_DEFAULT_TPM = int(os.environ.get("MODEL_DEFAULT_TPM", "0"))
+# Per-model overrides as JSON, e.g. {"anthropic/claude-opus-4-5": {"concurrency": 2, "tpm": 400000}}
+MODEL_ADMISSION_LIMITS = json.loads(os.environ.get("MODEL_ADMISSION_LIMITS", "") or "{}")
+# Faster model a queued request may switch to, as JSON, e.g. {"anthropic/claude-opus-4-5": "anthropic/claude-haiku-4-5"}
+MODEL_DOWNGRADES = json.loads(os.environ.get("MODEL_DOWNGRADES", "") or "{}")
+# Switch once the estimated wait exceeds this many seconds (0 disables downgrades)
+MODEL_DOWNGRADE_WAIT_SECONDS = float(os.environ.get("MODEL_DOWNGRADE_WAIT_SECONDS", "0"))
+# How often a queued request sends its queue position to the client
+MODEL_QUEUE_UPDATE_SECONDS = float(os.environ.get("MODEL_QUEUE_UPDATE_SECONDS", "2"))
+
+# What a second /invoke on a busy session does: "queue", "reject" (HTTP 409) or "cancel" (stop the older request)
+SESSION_CONCURRENCY_POLICY = os.environ.get("SESSION_CONCURRENCY_POLICY", "queue").strip().lower()
+
+# SSE text batching — a batch is sent after this delay, size or chunk count, whichever comes first
+SSE_FLUSH_MAX_DELAY_SECONDS = float(os.environ.get("SSE_FLUSH_MAX_DELAY_SECONDS", "0.05"))
+SSE_FLUSH_MAX_BYTES = int(os.environ.get("SSE_FLUSH_MAX_BYTES", "1024"))
+SSE_FLUSH_MAX_CHUNKS = int(os.environ.get("SSE_FLUSH_MAX_CHUNKS", "8"))
+# Idle seconds before a ": ping" comment keeps proxies from buffering the stream (0 disables)
+SSE_HEARTBEAT_SECONDS = float(os.environ.get("SSE_HEARTBEAT_SECONDS", "15"))
+# How often a running stream checks whether its client has disconnected
+SSE_DISCONNECT_POLL_SECONDS = float(os.environ.get("SSE_DISCONNECT_POLL_SECONDS", "1.0"))
+# microsoft_actions payloads at least this large are gzipped for clients that send x-sse-encoding: gzip
+SSE_GZIP_MIN_BYTES = int(os.environ.get("SSE_GZIP_MIN_BYTES", "8192"))
+
+# Extra characters to protect with [u+XXXX] placeholders, as comma-separated hex code points (e.g. "00A0,00A7")
+EXTRA_PLACEHOLDER_CHARS = [c.strip() for c in os.environ.get("EXTRA_PLACEHOLDER_CHARS", "").split(",") if c.strip()]
+
 # Mock Mode
 MOCK_MODE = os.environ.get("MOCK", "").strip() == "1"
 
-# Session Storage
-SESSIONS_DIR = "sessions/"
+# Session Storage — "file" (one JSON file per message), "sqlite" (single WAL database) or
+# "redis" (a Redis-compatible server at REDIS_URL, shared by every host)
+SESSION_BACKEND = os.environ.get("SESSION_BACKEND", "file").strip().lower()
+SESSIONS_DIR = os.environ.get("SESSIONS_DIR", "sessions/")
+SESSION_INDEX_PATH = os.path.join(SESSIONS_DIR, "index.sqlite3")
+SESSION_DB_PATH = os.environ.get("SESSION_DB_PATH", os.path.join(SESSIONS_DIR, "sessions.sqlite3"))
+# SQLite only: writes inside a batch (e.g. a compaction) are committed every N writes, and at
+# most this many seconds after the first uncommitted one
+SESSION_WRITE_BATCH_SIZE = int(os.environ.get("SESSION_WRITE_BATCH_SIZE", "32"))
+SESSION_WRITE_BATCH_MAX_DELAY = float(os.environ.get("SESSION_WRITE_BATCH_MAX_DELAY", "1.0"))
+
+# Multi-worker deployments — where the per-session state needed to rebuild an agent on another
+# worker lives: "local" (this process only), "sqlite" (every worker on one host) or "redis"
+SESSION_STATE_BACKEND = os.environ.get("SESSION_STATE_BACKEND", "local").strip().lower()
+SESSION_STATE_DB_PATH = os.environ.get("SESSION_STATE_DB_PATH", os.path.join(SESSIONS_DIR, "state.sqlite3"))
+# Shared state expires after this many idle seconds (0 = never)
+SESSION_STATE_TTL_SECONDS = float(os.environ.get("SESSION_STATE_TTL_SECONDS", str(7 * 24 * 3600)))
+# Used by SESSION_BACKEND=redis and SESSION_STATE_BACKEND=redis ("fake://" = in-process fake, for tests)
+REDIS_URL = os.environ.get("REDIS_URL", "redis://localhost:6379/0")
+REDIS_KEY_PREFIX = os.environ.get("REDIS_KEY_PREFIX", "redliner:")
+# Name reported in the x-session-worker affinity header (default: hostname:pid)
+WORKER_ID = os.environ.get("WORKER_ID", "")
+
+# MCP servers — started lazily on first use; health checks restart crashed servers (0 disables)
+MCP_STARTUP_TIMEOUT_SECONDS = int(os.environ.get("MCP_STARTUP_TIMEOUT_SECONDS", "30"))
+MCP_HEALTH_CHECK_SECONDS = float(os.environ.get("MCP_HEALTH_CHECK_SECONDS", "30"))
+# A server that fails to start is retried after this many seconds, doubling per failure up to the max
+MCP_RETRY_BACKOFF_SECONDS = float(os.environ.get("MCP_RETRY_BACKOFF_SECONDS", "5"))
+MCP_RETRY_BACKOFF_MAX_SECONDS = float(os.environ.get("MCP_RETRY_BACKOFF_MAX_SECONDS", "300"))
+
+# Large-document mode — above this many characters the model gets an outline and reads
+# paragraphs on demand with read_document / search_document (0 disables)
+LARGE_DOCUMENT_MIN_CHARS = int(os.environ.get("LARGE_DOCUMENT_MIN_CHARS", "150000"))
+LARGE_DOCUMENT_OUTLINE_MAX_CHARS = int(os.environ.get("LARGE_DOCUMENT_OUTLINE_MAX_CHARS", "8000"))
+
+# History compaction — replace <word_document> copies superseded by a later snapshot with a stub
+HISTORY_COMPACT_DOCUMENTS = os.environ.get("HISTORY_COMPACT_DOCUMENTS", "1").strip() != "0"
+# Also cut tool results of at least MIN_CHARS once they are more than this many turns old (0 disables)
+HISTORY_TRIM_TOOL_RESULTS_AFTER_TURNS = int(os.environ.get("HISTORY_TRIM_TOOL_RESULTS_AFTER_TURNS", "0"))
+HISTORY_TRIM_TOOL_RESULTS_MIN_CHARS = int(os.environ.get("HISTORY_TRIM_TOOL_RESULTS_MIN_CHARS", "2000"))
+
+# Agent Cache — bounds the in-memory agents kept between requests
+# Max bytes and idle TTL are disabled when set to 0
+AGENT_CACHE_MAX_ENTRIES = int(os.environ.get("AGENT_CACHE_MAX_ENTRIES", "64"))
+AGENT_CACHE_MAX_BYTES = int(os.environ.get("AGENT_CACHE_MAX_BYTES", "0"))
+AGENT_CACHE_IDLE_TTL_SECONDS = float(os.environ.get("AGENT_CACHE_IDLE_TTL_SECONDS", "1800"))
+# How often idle agents are dropped when no request arrives to trigger it (0 = only on requests)
+AGENT_CACHE_SWEEP_SECONDS = float(os.environ.get("AGENT_CACHE_SWEEP_SECONDS", "60"))
+
+# Logging — written off the event loop by a background thread to a size-capped rotating file
+LOG_FILE = os.environ.get("LOG_FILE", ".logs/redliner.log")
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").strip().upper()
+# "text" (human-readable) or "json" (one object per line, with request and session ids)
+LOG_FORMAT = os.environ.get("LOG_FORMAT", "text").strip().lower()
+LOG_MAX_BYTES = int(os.environ.get("LOG_MAX_BYTES", str(20 * 1024 * 1024)))
+LOG_BACKUP_COUNT = int(os.environ.get("LOG_BACKUP_COUNT", "5"))
+# Write one file per process ("redliner.<pid>.log"). Several workers must not share one rotating
+# file — each would rotate it on its own and lose records. On by default when WEB_CONCURRENCY > 1
+LOG_FILE_PER_PROCESS = os.environ.get(
+    "LOG_FILE_PER_PROCESS", "1" if int(os.environ.get("WEB_CONCURRENCY") or 1) > 1 else "0"
+).strip().lower() in ("1", "true", "yes")
+# Log every Nth raw Strands stream event (0 = off, 1 = every event — verbose, for debugging)
+LOG_RAW_STREAM_EVENTS = int(os.environ.get("LOG_RAW_STREAM_EVENTS", "0"))
+
+# Skills whose instructions are included in the (cached) system prompt, comma-separated —
+# saves the agent a file_read round-trip before first using them ("" = list skills only)
+SKILLS_INLINE = [s.strip() for s in os.environ.get("SKILLS_INLINE", "microsoft_actions_tool").split(",") if s.strip()]
+
+# Web search (fetch tool) — "ddgs" (DuckDuckGo) or "fake" (local canned results, for tests)
+FETCH_BACKEND = os.environ.get("FETCH_BACKEND", "ddgs").strip().lower()
+# Results are cached per normalized query; searches run at most N at a time and callers give up after the timeout
+FETCH_CACHE_TTL_SECONDS = float(os.environ.get("FETCH_CACHE_TTL_SECONDS", "3600"))
+FETCH_CACHE_MAX_ENTRIES = int(os.environ.get("FETCH_CACHE_MAX_ENTRIES", "512"))
+FETCH_MAX_CONCURRENCY = int(os.environ.get("FETCH_MAX_CONCURRENCY", "4"))
+FETCH_TIMEOUT_SECONDS = float(os.environ.get("FETCH_TIMEOUT_SECONDS", "10"))
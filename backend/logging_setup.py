@@ -0,0 +1,108 @@
+"""
+Root logger setup: records are put on a queue by the calling thread and written to a
+rotating file by a QueueListener thread, so log I/O never blocks the event loop.
+
+With several workers each process writes and rotates its own file (LOG_FILE_PER_PROCESS),
+since RotatingFileHandler is only safe with a single writer.
+
+Request handlers call bind_log_context(request_id=..., session_id=...); the ids are attached
+to every record logged in that request's context and included in the JSON format.
+"""
+
+import atexit
+import copy
+import json
+import logging
+import os
+import queue
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from config import LOG_FILE, LOG_LEVEL, LOG_FORMAT, LOG_MAX_BYTES, LOG_BACKUP_COUNT, LOG_FILE_PER_PROCESS
+
+TEXT_FORMAT = "%(asctime)s %(levelname)s | %(message)s"
+CONTEXT_FIELDS = ("request_id", "session_id")
+
+_log_context: ContextVar[dict] = ContextVar("log_context", default={})
+
+
+def bind_log_context(**fields) -> None:
+    """Attach fields (request_id, session_id) to records logged from the current context."""
+    _log_context.set({**_log_context.get(), **fields})
+
+
+class ContextFilter(logging.Filter):
+    """
+    Copies the bound context onto the record. Attached to the queue handler, so it runs in the
+    thread that logged, before the record is queued — which is why the ContextVars are visible.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        context = _log_context.get()
+        for field in CONTEXT_FIELDS:
+            setattr(record, field, context.get(field))
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message and the bound ids."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for field in CONTEXT_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class _QueueHandler(QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merge args into the message here (they may not be safe to read later), but leave
+        # formatting — timestamps, JSON, tracebacks — to the listener thread
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def log_file_path() -> str:
+    """LOG_FILE, or with LOG_FILE_PER_PROCESS this process's own copy of it (pid before the extension)."""
+    if not LOG_FILE_PER_PROCESS:
+        return LOG_FILE
+    root, ext = os.path.splitext(LOG_FILE)
+    return f"{root}.{os.getpid()}{ext}"
+
+
+def configure_logging() -> QueueListener:
+    """Route the root logger through a queue to the rotating log file. Returns the running listener."""
+    path = log_file_path()
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    file_handler = RotatingFileHandler(path, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding="utf-8")
+    file_handler.setFormatter(JsonFormatter() if LOG_FORMAT == "json" else logging.Formatter(TEXT_FORMAT))
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = _QueueHandler(log_queue)
+    queue_handler.addFilter(ContextFilter())
+
+    root_logger = logging.getLogger()
+    root_logger.setLevel(LOG_LEVEL)
+    root_logger.addHandler(queue_handler)
+
+    listener = QueueListener(log_queue, file_handler)
+    listener.start()
+    # Flush what is still queued on shutdown
+    atexit.register(listener.stop)
+    return listener
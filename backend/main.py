@@ -1,22 +1,78 @@
+import asyncio
+import importlib
 import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from api import invoke_router, models_router, sessions_router, config_router
+from logging_setup import configure_logging
+from api import invoke_router, models_router, sessions_router, config_router, health_router
+from api.health import readiness
+from models.model_catalog import model_catalog
+from agent.playbook_index import playbook_index
+from agent.skill_registry import skill_registry
+from agent.mcp_pool import mcp_pool
+from agent.session_store import session_store
+from agent.manager import get_tools, start_cache_sweeps, stop_cache_sweeps
+
+# Logging — file only, written by a background thread (configure root logger to capture all modules)
+configure_logging()
+logger = logging.getLogger(__name__)
+
+# Slow first-use work done in the background after startup, in order — the server accepts
+# requests meanwhile (anything that needs a step early just does it itself)
+WARM_UP_STEPS = {
+    # litellm alone takes seconds to import
+    "model_client": lambda: importlib.import_module("models.litellm_client"),
+    "tools": get_tools,
+    # MCP servers start here rather than when the first agent is created
+    "mcp_servers": mcp_pool.start_servers,
+    # Parse skills and build the shared system prompt before the first agent needs it
+    "skills": skill_registry.refresh,
+    # Build the playbook search index up front so the first search is fast
+    "playbooks": playbook_index.refresh,
+}
+
+
+async def warm_up() -> None:
+    for step in WARM_UP_STEPS:
+        readiness.add(step)
+    for step, run in WARM_UP_STEPS.items():
+        try:
+            await asyncio.to_thread(run)
+        except Exception as e:
+            logger.exception("Startup step '%s' failed", step)
+            readiness.fail(step, str(e))
+        else:
+            readiness.done(step)
+    logger.info("Startup warm-up finished: %s", readiness.status())
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Shared proxy client + background model catalog refresh
+    await model_catalog.start()
+    # Restarts started MCP servers that crashed
+    mcp_pool.start_health_checks()
+    # Frees agents idle past AGENT_CACHE_IDLE_TTL_SECONDS even when no request comes in
+    start_cache_sweeps()
+    # Imports and indexes load in the background — GET /readyz reports when they are done
+    warm_up_task = asyncio.create_task(warm_up())
+    yield
+    warm_up_task.cancel()
+    stop_cache_sweeps()
+    await mcp_pool.close()
+    await model_catalog.close()
+    await asyncio.to_thread(session_store.flush)
 
-# Logging — file only (configure root logger to capture all modules)
-root_logger = logging.getLogger()
-root_logger.setLevel(logging.INFO)
-_handler = logging.FileHandler(".logs/redliner.log")
-_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s | %(message)s"))
-root_logger.addHandler(_handler)
 
 # FastAPI app
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["https://localhost:3000"],
     allow_methods=["GET", "POST", "DELETE"],
-    allow_headers=["Content-Type", "x-session-id", "x-auto-approve-tools"],
+    allow_headers=["Content-Type", "x-session-id", "x-auto-approve-tools", "x-sse-encoding", "x-request-id", "x-user-id"],
+    expose_headers=["x-request-id", "x-session-worker"],
 )
 
 # Register route modules
@@ -24,3 +80,4 @@ app.include_router(invoke_router)
 app.include_router(models_router)
 app.include_router(sessions_router)
 app.include_router(config_router)
+app.include_router(health_router)
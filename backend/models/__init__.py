@@ -1,4 +1,12 @@
-from .litellm_client import create_litellm_model
-from .model_catalog import get_allowed_models
+from .model_catalog import get_allowed_models, model_catalog
+from .admission import admission_controller
 
-__all__ = ["create_litellm_model", "get_allowed_models"]
+__all__ = ["create_litellm_model", "get_allowed_models", "model_catalog", "admission_controller"]
+
+
+def __getattr__(name):
+    # litellm takes seconds to import — load the client only when it is asked for
+    if name == "create_litellm_model":
+        from .litellm_client import create_litellm_model
+        return create_litellm_model
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
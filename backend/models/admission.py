@@ -0,0 +1,287 @@
+"""
+Admission control in front of the LiteLLM proxy.
+
+Each model has a concurrency limit and an optional tokens-per-minute budget. Requests over
+the limit wait in a fair queue: waiting requests are grouped by key (user or session) and
+served round-robin across keys, so one busy session cannot starve the others. While waiting,
+a request can report its queue position and estimated wait, and — if a downgrade model is
+configured — move to the faster model once the estimated wait passes a threshold.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict, deque
+from config import (
+    MODEL_ADMISSION_LIMITS,
+    MODEL_DEFAULT_CONCURRENCY,
+    MODEL_DEFAULT_TPM,
+    MODEL_DOWNGRADES,
+    MODEL_DOWNGRADE_WAIT_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+TPM_WINDOW_SECONDS = 60.0
+# Assumed request duration until real ones have been measured
+INITIAL_DURATION_SECONDS = 20.0
+# Rough prompt size conversion, and the output a request is assumed to use before it reports usage
+CHARS_PER_TOKEN = 4
+OUTPUT_TOKEN_ALLOWANCE = 2048
+
+
+def estimate_tokens(prompt_chars: int) -> int:
+    """Tokens a request is charged against the TPM budget when admitted."""
+    return prompt_chars // CHARS_PER_TOKEN + OUTPUT_TOKEN_ALLOWANCE
+
+
+class AdmissionTicket:
+    """One request's place in a model's queue, and its slot once admitted."""
+
+    def __init__(self, gate: "ModelGate", key: str, tokens: int):
+        self.gate = gate
+        self.key = key
+        self.tokens = tokens
+        self.enqueued_at = time.monotonic()
+        self.admitted_at: float | None = None
+        self._admitted = asyncio.get_running_loop().create_future()
+        self._done = False
+
+    @property
+    def model_id(self) -> str:
+        return self.gate.model_id
+
+    @property
+    def admitted(self) -> bool:
+        return self._admitted.done() and not self._admitted.cancelled()
+
+    async def wait(self, timeout: float | None = None, stop: asyncio.Event | None = None) -> bool:
+        """
+        Wait up to `timeout` seconds for admission, returning early if `stop` is set.
+        Returns whether the ticket was admitted.
+        """
+        if self.admitted:
+            return True
+        waiters = {self._admitted}
+        stop_waiter = asyncio.ensure_future(stop.wait()) if stop is not None else None
+        if stop_waiter is not None:
+            waiters.add(stop_waiter)
+        try:
+            await asyncio.wait(waiters, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            if stop_waiter is not None:
+                stop_waiter.cancel()
+        return self.admitted
+
+    def status(self) -> dict:
+        position = self.gate.position(self)
+        return {
+            "type": "queue",
+            "model": self.model_id,
+            "position": position,
+            "estimated_wait": round(self.gate.estimated_wait(position, self.tokens), 1),
+        }
+
+    def release(self, actual_tokens: int | None = None) -> None:
+        """Give back the slot (or leave the queue). Safe to call more than once."""
+        if self._done:
+            return
+        self._done = True
+        if self.admitted:
+            self.gate._finish(self, actual_tokens)
+        else:
+            self._admitted.cancel()
+            self.gate._leave_queue(self)
+
+
+class ModelGate:
+    """Concurrency + TPM limits and the fair queue for one model."""
+
+    def __init__(self, model_id: str, concurrency: int, tpm: int):
+        self.model_id = model_id
+        self.concurrency = concurrency
+        self.tpm = tpm
+        self.active = 0
+        self.avg_duration = INITIAL_DURATION_SECONDS
+        self._window: deque[tuple[float, int]] = deque()
+        self._window_tokens = 0
+        self._queues: OrderedDict[str, deque[AdmissionTicket]] = OrderedDict()
+        self._timer: asyncio.TimerHandle | None = None
+
+    @property
+    def queued(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    def enqueue(self, key: str, tokens: int) -> AdmissionTicket:
+        ticket = AdmissionTicket(self, key, tokens)
+        self._queues.setdefault(key, deque()).append(ticket)
+        self._dispatch()
+        return ticket
+
+    def position(self, ticket: AdmissionTicket) -> int:
+        """Requests that will be admitted before this one under round-robin order (0 = next)."""
+        if ticket.admitted or ticket.key not in self._queues:
+            return 0
+        own_index = self._queues[ticket.key].index(ticket)
+        position, before_own_key = 0, True
+        for key, queue in self._queues.items():
+            if key == ticket.key:
+                position += own_index
+                before_own_key = False
+            else:
+                position += min(len(queue), own_index + (1 if before_own_key else 0))
+        return position
+
+    def estimated_wait(self, position: int, tokens: int = 0) -> float:
+        """Rough seconds until the request at `position` (needing `tokens`) is admitted."""
+        wait = 0.0
+        if 0 < self.concurrency <= self.active:
+            # Each freed slot admits one request; slots free up every avg_duration / concurrency seconds
+            wait = self.avg_duration * (position + 1) / self.concurrency
+        return max(wait, self._tpm_wait(tokens))
+
+    def _tpm_wait(self, tokens: int) -> float:
+        """Seconds until `tokens` more fit in the TPM budget."""
+        if self.tpm <= 0:
+            return 0.0
+        self._expire_window()
+        excess = self._window_tokens + tokens - self.tpm
+        if excess <= 0 or not self._window:
+            return 0.0
+        freed, now = 0, time.monotonic()
+        for timestamp, used in self._window:
+            freed += used
+            if freed >= excess:
+                return max(0.0, timestamp + TPM_WINDOW_SECONDS - now)
+        return TPM_WINDOW_SECONDS
+
+    def _expire_window(self) -> None:
+        cutoff = time.monotonic() - TPM_WINDOW_SECONDS
+        while self._window and self._window[0][0] <= cutoff:
+            self._window_tokens -= self._window.popleft()[1]
+
+    def _dispatch(self) -> None:
+        while self._queues and (self.concurrency <= 0 or self.active < self.concurrency):
+            key, queue = next(iter(self._queues.items()))
+            ticket = queue[0]
+            tpm_wait = self._tpm_wait(ticket.tokens)
+            if tpm_wait > 0:
+                # Head of the line waits for the budget (no skipping, so large requests are not starved)
+                self._schedule(tpm_wait)
+                return
+            queue.popleft()
+            if queue:
+                self._queues.move_to_end(key)
+            else:
+                del self._queues[key]
+            self.active += 1
+            ticket.admitted_at = time.monotonic()
+            self._window.append((ticket.admitted_at, ticket.tokens))
+            self._window_tokens += ticket.tokens
+            ticket._admitted.set_result(None)
+
+    def _schedule(self, delay: float) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = asyncio.get_running_loop().call_later(delay, self._on_timer)
+
+    def _on_timer(self) -> None:
+        self._timer = None
+        self._dispatch()
+
+    def _leave_queue(self, ticket: AdmissionTicket) -> None:
+        queue = self._queues.get(ticket.key)
+        if queue is not None and ticket in queue:
+            queue.remove(ticket)
+            if not queue:
+                del self._queues[ticket.key]
+        self._dispatch()
+
+    def _finish(self, ticket: AdmissionTicket, actual_tokens: int | None) -> None:
+        self.active -= 1
+        duration = time.monotonic() - ticket.admitted_at
+        self.avg_duration = 0.8 * self.avg_duration + 0.2 * duration
+        if actual_tokens is not None and actual_tokens != ticket.tokens:
+            # Replace the estimate with what the request actually used, if it is still in the window
+            for i, (timestamp, used) in enumerate(self._window):
+                if timestamp == ticket.admitted_at and used == ticket.tokens:
+                    self._window[i] = (timestamp, actual_tokens)
+                    self._window_tokens += actual_tokens - used
+                    break
+        self._dispatch()
+
+    def stats(self) -> dict:
+        self._expire_window()
+        return {
+            "concurrency": self.concurrency,
+            "tpm": self.tpm,
+            "active": self.active,
+            "queued": self.queued,
+            "tokens_last_minute": self._window_tokens,
+            "avg_duration": round(self.avg_duration, 2),
+        }
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        limits: dict[str, dict],
+        default_concurrency: int,
+        default_tpm: int,
+        downgrades: dict[str, str],
+        downgrade_wait: float,
+    ):
+        self.limits = limits
+        self.default_concurrency = default_concurrency
+        self.default_tpm = default_tpm
+        self.downgrades = downgrades
+        self.downgrade_wait = downgrade_wait
+        self._gates: dict[str, ModelGate] = {}
+
+    def gate(self, model_id: str) -> ModelGate:
+        gate = self._gates.get(model_id)
+        if gate is None:
+            limits = self.limits.get(model_id, {})
+            gate = ModelGate(
+                model_id,
+                concurrency=int(limits.get("concurrency", self.default_concurrency)),
+                tpm=int(limits.get("tpm", self.default_tpm)),
+            )
+            self._gates[model_id] = gate
+        return gate
+
+    def enqueue(self, model_id: str, key: str, tokens: int) -> AdmissionTicket:
+        return self.gate(model_id).enqueue(key, tokens)
+
+    def maybe_downgrade(self, ticket: AdmissionTicket, allowed_models=None) -> AdmissionTicket | None:
+        """
+        If the ticket is still queued, its estimated wait is over the threshold and the
+        downgrade model would be faster, move it to that model. Returns the new ticket or None.
+        """
+        target = self.downgrades.get(ticket.model_id)
+        if ticket.admitted or not target or self.downgrade_wait <= 0:
+            return None
+        if allowed_models is not None and target not in allowed_models:
+            return None
+        gate = ticket.gate
+        wait = gate.estimated_wait(gate.position(ticket), ticket.tokens)
+        if wait <= self.downgrade_wait:
+            return None
+        target_gate = self.gate(target)
+        if target_gate.estimated_wait(target_gate.queued, ticket.tokens) >= wait:
+            return None
+        logger.info("Downgrading queued request %s -> %s (estimated wait %.1fs)", ticket.model_id, target, wait)
+        ticket.release()
+        return target_gate.enqueue(ticket.key, ticket.tokens)
+
+    def stats(self) -> dict:
+        return {model_id: gate.stats() for model_id, gate in self._gates.items()}
+
+
+admission_controller = AdmissionController(
+    limits=MODEL_ADMISSION_LIMITS,
+    default_concurrency=MODEL_DEFAULT_CONCURRENCY,
+    default_tpm=MODEL_DEFAULT_TPM,
+    downgrades=MODEL_DOWNGRADES,
+    downgrade_wait=MODEL_DOWNGRADE_WAIT_SECONDS,
+)
@@ -1,11 +1,51 @@
+from typing import Any
 from strands.models.litellm import LiteLLMModel
+from strands.types.content import ContentBlock, Messages
 from config import LITELLM_PROXY_URL, LITELLM_MASTER_KEY
 import os
 
+# Anthropic allows four cache breakpoints per request; the system prompt uses one
+MAX_MESSAGE_CACHE_POINTS = 2
+# Private marker set on a shallow copy of the block that precedes a honoured cachePoint
+_CACHE_CONTROL = "_cache_control"
+
+
+class CachingLiteLLMModel(LiteLLMModel):
+    """
+    LiteLLMModel that also honours cachePoint blocks inside messages (the base class only
+    handles them in the system prompt). The block before the point gets cache_control.
+    Only the latest MAX_MESSAGE_CACHE_POINTS points are sent; older ones are dropped.
+    """
+
+    @classmethod
+    def _format_regular_messages(cls, messages: Messages, **kwargs: Any) -> list[dict[str, Any]]:
+        remaining = MAX_MESSAGE_CACHE_POINTS
+        marked = []
+        for message in reversed(messages):
+            if any("cachePoint" in block for block in message["content"]):
+                content = []
+                for block in message["content"]:
+                    if "cachePoint" not in block:
+                        content.append(block)
+                    elif content and "text" in content[-1] and remaining > 0 and not content[-1].get(_CACHE_CONTROL):
+                        content[-1] = {**content[-1], _CACHE_CONTROL: True}
+                        remaining -= 1
+                message = {**message, "content": content}
+            marked.append(message)
+        return super()._format_regular_messages(list(reversed(marked)), **kwargs)
+
+    @classmethod
+    def format_request_message_content(cls, content: ContentBlock, **kwargs: Any) -> dict[str, Any]:
+        if _CACHE_CONTROL in content:
+            formatted = super().format_request_message_content({"text": content["text"]}, **kwargs)
+            formatted["cache_control"] = {"type": "ephemeral"}
+            return formatted
+        return super().format_request_message_content(content, **kwargs)
+
 
 def create_litellm_model(model_id: str) -> LiteLLMModel:
     """Create a LiteLLM model using the proxy or direct provider."""
-    return LiteLLMModel(
+    return CachingLiteLLMModel(
         client_args={
             "api_key": LITELLM_MASTER_KEY or os.getenv("ANTHROPIC_API_KEY", "dummy-key"),
             "api_base": LITELLM_PROXY_URL,
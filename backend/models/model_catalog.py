@@ -1,27 +1,127 @@
+import asyncio
 import logging
-from config import LITELLM_PROXY_URL, LITELLM_MASTER_KEY, FALLBACK_MODEL_IDS
+import time
+import httpx
+from config import (
+    LITELLM_PROXY_URL,
+    LITELLM_MASTER_KEY,
+    FALLBACK_MODEL_IDS,
+    MODEL_CATALOG_TTL_SECONDS,
+    MODEL_CATALOG_REFRESH_SECONDS,
+)
 
 logger = logging.getLogger(__name__)
 
 
-async def get_allowed_models() -> set[str]:
+class ModelCatalog:
     """
-    Fetch allowed model IDs from LiteLLM proxy or return fallback set.
-    Used for validating user-submitted model IDs.
+    Process-wide cache of the model IDs served by the LiteLLM proxy.
+
+    Reads never wait on the proxy once the catalog has been loaded: stale entries are
+    served while a single background refresh runs (stale-while-revalidate), and
+    concurrent refreshes share one in-flight request.
     """
-    if LITELLM_PROXY_URL:
+
+    def __init__(self, proxy_url: str, master_key: str, ttl: float, refresh_interval: float):
+        self.proxy_url = proxy_url
+        self.master_key = master_key
+        self.ttl = ttl
+        self.refresh_interval = refresh_interval
+        self._client: httpx.AsyncClient | None = None
+        self._model_ids: list[str] | None = None
+        self._fetched_at = 0.0
+        self._attempted = False
+        self._inflight: asyncio.Task | None = None
+        self._refresh_task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        """Open the pooled HTTP client and start the background refresh loop."""
+        if not self.proxy_url:
+            return
+        self._ensure_client()
+        self._refresh_task = asyncio.create_task(self._refresh_loop())
+
+    async def close(self) -> None:
+        if self._refresh_task:
+            self._refresh_task.cancel()
+            self._refresh_task = None
+        if self._client:
+            await self._client.aclose()
+            self._client = None
+
+    async def get_model_ids(self) -> list[str] | None:
+        """Cached model IDs, or None if the proxy has never answered."""
+        if not self.proxy_url:
+            return None
+
+        if self._model_ids is None:
+            if not self._attempted:
+                # Cold start — the only reads that wait on the proxy; concurrent ones join the
+                # same in-flight request until it has finished
+                await self.refresh()
+            else:
+                self._refresh_in_background()
+            return self._model_ids
+
+        if time.monotonic() - self._fetched_at > self.ttl:
+            self._refresh_in_background()
+        return self._model_ids
+
+    async def refresh(self) -> None:
+        """Refresh the catalog, joining any refresh already in flight."""
+        if self._inflight is None or self._inflight.done():
+            self._inflight = asyncio.create_task(self._fetch())
+        await asyncio.shield(self._inflight)
+
+    def _refresh_in_background(self) -> None:
+        if self._inflight is None or self._inflight.done():
+            self._inflight = asyncio.create_task(self._fetch())
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            await self.refresh()
+            await asyncio.sleep(self.refresh_interval)
+
+    def _ensure_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            headers = {"Authorization": f"Bearer {self.master_key}"} if self.master_key else {}
+            self._client = httpx.AsyncClient(base_url=self.proxy_url, headers=headers, timeout=5.0)
+        return self._client
+
+    async def _fetch(self) -> None:
         try:
-            import httpx
-            headers = {"Authorization": f"Bearer {LITELLM_MASTER_KEY}"} if LITELLM_MASTER_KEY else {}
-
-            async with httpx.AsyncClient() as client:
-                resp = await client.get(f"{LITELLM_PROXY_URL}/model/info", headers=headers, timeout=5.0)
-                resp.raise_for_status()
-                data = resp.json()
-                model_ids = {m.get("litellm_params", {}).get("model") or m["model_name"] for m in data.get("data", [])}  
-                logger.info(f"Fetched {len(model_ids)} models from proxy")
-                return model_ids
+            resp = await self._ensure_client().get("/model/info")
+            resp.raise_for_status()
+            data = resp.json()
+            # Use the litellm_params.model if available, otherwise model_name
+            self._model_ids = [
+                m.get("litellm_params", {}).get("model") or m["model_name"] for m in data.get("data", [])
+            ]
+            self._fetched_at = time.monotonic()
+            logger.info(f"Fetched {len(self._model_ids)} models from proxy")
         except Exception as e:
-            logger.warning(f"Failed to fetch models from proxy: {e}, using fallback")
+            # Keep serving the last known catalog (if any) until the proxy recovers
+            logger.warning(f"Failed to fetch models from proxy: {e}")
+        finally:
+            # Only once the first fetch is over do reads stop waiting for it
+            self._attempted = True
+
+
+model_catalog = ModelCatalog(
+    proxy_url=LITELLM_PROXY_URL,
+    master_key=LITELLM_MASTER_KEY,
+    ttl=MODEL_CATALOG_TTL_SECONDS,
+    refresh_interval=MODEL_CATALOG_REFRESH_SECONDS,
+)
 
-    return FALLBACK_MODEL_IDS
+
+async def get_allowed_models() -> set[str]:
+    """
+    Return allowed model IDs from the cached proxy catalog or the fallback set.
+    Used for validating user-submitted model IDs.
+    """
+    model_ids = await model_catalog.get_model_ids()
+    if model_ids is None:
+        logger.warning("Model catalog unavailable, using fallback")
+        return FALLBACK_MODEL_IDS
+    return set(model_ids)
@@ -0,0 +1,46 @@
+"""
+Per-model token usage, including prompt-cache reads and writes reported by LiteLLM,
+and time to first token. Aggregated in memory since startup.
+"""
+
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+USAGE_FIELDS = ("inputTokens", "outputTokens", "cacheReadInputTokens", "cacheWriteInputTokens")
+
+
+class UsageStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._models: dict[str, dict] = {}
+
+    def record(self, model_id: str, usage: dict, ttft: float | None) -> None:
+        with self._lock:
+            totals = self._models.setdefault(
+                model_id, {"requests": 0, **{field: 0 for field in USAGE_FIELDS}, "ttft_total": 0.0, "ttft_count": 0}
+            )
+            totals["requests"] += 1
+            for field in USAGE_FIELDS:
+                totals[field] += usage.get(field, 0)
+            if ttft is not None:
+                totals["ttft_total"] += ttft
+                totals["ttft_count"] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            result = {}
+            for model_id, totals in self._models.items():
+                # LiteLLM reports OpenAI-style usage: cached tokens are included in inputTokens
+                input_tokens = totals["inputTokens"]
+                result[model_id] = {
+                    "requests": totals["requests"],
+                    **{field: totals[field] for field in USAGE_FIELDS},
+                    "cache_hit_ratio": round(totals["cacheReadInputTokens"] / input_tokens, 3) if input_tokens else 0.0,
+                    "avg_ttft": round(totals["ttft_total"] / totals["ttft_count"], 3) if totals["ttft_count"] else None,
+                }
+            return result
+
+
+usage_stats = UsageStats()
@@ -0,0 +1,73 @@
+"""
+Copy file-based sessions (sessions/session_<id>/...) into the SQLite session store.
+
+Run from the backend directory, then start the backend with SESSION_BACKEND=sqlite:
+    uv run python -m scripts.migrate_sessions [--sessions-dir sessions/] [--db sessions/sessions.sqlite3]
+
+Sessions already present in the database are skipped, so the script can be re-run.
+The source directories are left untouched.
+"""
+
+import argparse
+import logging
+import os
+from strands.session.file_session_manager import FileSessionManager
+from agent.sqlite_session_repository import SQLiteSessionRepository
+from config import SESSIONS_DIR, SESSION_DB_PATH
+
+logger = logging.getLogger(__name__)
+
+
+class _FileSessionReader(FileSessionManager):
+    """FileSessionManager's repository methods, without creating a session on init."""
+
+    def __init__(self, storage_dir: str):
+        self.storage_dir = storage_dir
+
+
+def migrate(sessions_dir: str, db_path: str) -> tuple[int, int]:
+    """Returns (migrated, skipped) session counts."""
+    source = _FileSessionReader(sessions_dir)
+    os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+    target = SQLiteSessionRepository(db_path, batch_size=500)
+
+    migrated = skipped = 0
+    for entry in sorted(os.listdir(sessions_dir)):
+        if not entry.startswith("session_") or not os.path.isdir(os.path.join(sessions_dir, entry)):
+            continue
+        session_id = entry[len("session_"):]
+        session = source.read_session(session_id)
+        if session is None or target.read_session(session_id) is not None:
+            skipped += 1
+            continue
+
+        with target.batch():
+            target.create_session(session)
+            agents_dir = os.path.join(sessions_dir, entry, "agents")
+            for agent_entry in sorted(os.listdir(agents_dir)) if os.path.isdir(agents_dir) else []:
+                agent_id = agent_entry[len("agent_"):]
+                session_agent = source.read_agent(session_id, agent_id)
+                if session_agent is None:
+                    continue
+                target.create_agent(session_id, session_agent)
+                for session_message in source.list_messages(session_id, agent_id):
+                    target.create_message(session_id, agent_id, session_message)
+        migrated += 1
+        logger.info("Migrated session %s", session_id)
+
+    return migrated, skipped
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions-dir", default=SESSIONS_DIR)
+    parser.add_argument("--db", default=SESSION_DB_PATH)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    migrated, skipped = migrate(args.sessions_dir, args.db)
+    logger.info("Done: %d migrated, %d skipped", migrated, skipped)
+
+
+if __name__ == "__main__":
+    main()
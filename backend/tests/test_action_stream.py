@@ -0,0 +1,84 @@
+import json
+import random
+import pytest
+from agent.action_stream import IncrementalActionParser
+
+ACTIONS = [
+    {"task": "Clarify obligations", "action": "replace", "loc": "0.p0",
+     "new_text": "Each party shall perform its \"obligations\" in good faith {see 1.p1}."},
+    {"task": "Flag term", "action": "highlight", "loc": "1.t0.r0.c0.p0",
+     "withinPara": {"find": "C:\\fees\\[u+2019]", "occurrence": 0}},
+    {"task": "Smart quotes and emoji", "action": "replace", "loc": "2.p2",
+     "new_text": "\u201cSupplier\u201d \u2014 caf\u00e9 \U0001F600\nnext line\ttab ] } ["},
+    {"task": "Delete", "action": "delete", "loc": "3.p3"},
+]
+
+TOOL_INPUTS = {
+    # The actions array as a JSON string, escaped again inside the tool input
+    "string": json.dumps({"actions": json.dumps(ACTIONS)}),
+    "string, ascii escapes": json.dumps({"actions": json.dumps(ACTIONS, ensure_ascii=True)}, ensure_ascii=True),
+    "string, other field first": json.dumps({"note": "x \"actions\": [", "actions": json.dumps(ACTIONS, ensure_ascii=False)}),
+    "bare array": json.dumps({"actions": ACTIONS}),
+}
+
+
+def parse(chunks: list[str]) -> list[tuple[int, dict]]:
+    """(index, action) pairs in the order the parser emitted them, as the frontend sees them."""
+    parser = IncrementalActionParser()
+    events = []
+    for chunk in chunks:
+        for action in parser.feed(chunk):
+            events.append((len(events), action))
+    assert parser.count == len(events)
+    return events
+
+
+def expected(tool_input: str) -> list[tuple[int, dict]]:
+    actions = json.loads(tool_input)["actions"]
+    if isinstance(actions, str):
+        actions = json.loads(actions)
+    return list(enumerate(actions))
+
+
+@pytest.mark.parametrize("name", TOOL_INPUTS)
+def test_unsplit_matches_json_loads(name):
+    tool_input = TOOL_INPUTS[name]
+    assert parse([tool_input]) == expected(tool_input) == list(enumerate(ACTIONS))
+
+
+@pytest.mark.parametrize("name", TOOL_INPUTS)
+def test_every_split_point_matches_json_loads(name):
+    tool_input = TOOL_INPUTS[name]
+    for i in range(len(tool_input) + 1):
+        assert parse([tool_input[:i], tool_input[i:]]) == expected(tool_input), f"split at {i}"
+
+
+@pytest.mark.parametrize("name", TOOL_INPUTS)
+def test_one_character_deltas_match_json_loads(name):
+    tool_input = TOOL_INPUTS[name]
+    assert parse(list(tool_input)) == expected(tool_input)
+
+
+@pytest.mark.parametrize("name", TOOL_INPUTS)
+def test_random_fragments_match_json_loads(name):
+    tool_input = TOOL_INPUTS[name]
+    rng = random.Random(0)
+    for _ in range(200):
+        cuts = sorted(rng.sample(range(1, len(tool_input)), rng.randint(1, 30)))
+        chunks = [tool_input[start:end] for start, end in zip([0] + cuts, cuts + [len(tool_input)])]
+        assert parse(chunks) == expected(tool_input)
+
+
+def test_actions_are_emitted_as_soon_as_complete():
+    tool_input = TOOL_INPUTS["string"]
+    # Closing brace of the first object (the braces inside its new_text are part of a string)
+    first_end = tool_input.index("}, {")
+    parser = IncrementalActionParser()
+    assert parser.feed(tool_input[:first_end]) == []
+    assert parser.feed(tool_input[first_end:first_end + 1]) == [ACTIONS[0]]
+
+
+def test_input_after_the_array_is_ignored():
+    parser = IncrementalActionParser()
+    assert len(parser.feed(TOOL_INPUTS["string"])) == len(ACTIONS)
+    assert parser.feed('{"actions": "[{}]"}') == []
@@ -0,0 +1,70 @@
+from agent.action_validation import validate_action, validate_actions
+from agent.document import parse_word_document
+from agent.document_index import DocumentIndex
+
+INDEX = DocumentIndex(parse_word_document("\n".join([
+    "0.p0: Master Services Agreement",
+    "1.p1: The Supplier shall invoice the Customer monthly. The Customer shall pay.",
+    "2.t0.r0.c0.p0: Fee",
+    "3.t0.r0.c1.p0: $5,000",
+    "4.t0.r1.c0.p0: Term",
+    "5.t0.r1.c1.p0: 12 months",
+    "6.p6: Signed by the parties.",
+])))
+
+
+def test_valid_actions_have_no_problems():
+    assert validate_actions([
+        {"action": "replace", "loc": "1.p1", "new_text": "Supplier", "withinPara": {"find": "Supplier", "occurrence": 0}},
+        {"action": "highlight", "loc": "3.t0.r0.c1.p0"},
+        {"action": "delete_row", "loc": "2.t0.r1"},
+        {"action": "delete_table", "loc": "2.t0"},
+        {"action": "create_table", "loc": "6.p6", "rowCount": 2, "columnCount": 3},
+    ], INDEX) == []
+
+
+def test_unknown_action():
+    errors = validate_action({"action": "rewrite", "loc": "1.p1"}, INDEX)
+    assert len(errors) == 1 and errors[0].startswith("unknown action 'rewrite'")
+
+
+def test_shorthand_and_missing_paragraph_locs_are_rejected():
+    assert validate_action({"action": "delete", "loc": "p1"}, INDEX) == ["'p1' is not a paragraph in the document"]
+    assert validate_action({"action": "delete", "loc": "9.p9"}, INDEX) == ["'9.p9' is not a paragraph in the document"]
+    assert validate_action({"action": "delete"}, INDEX) == ["missing 'loc'"]
+
+
+def test_bad_table_locs_are_rejected():
+    assert validate_action({"action": "delete_row", "loc": "t0.r1"}, INDEX) == [
+        "'t0.r1' is not a table row location (docPosition.tN.rM)"
+    ]
+    assert validate_action({"action": "delete_row", "loc": "2.t0.r5"}, INDEX) == ["table row '2.t0.r5' does not exist"]
+    assert validate_action({"action": "delete_table", "loc": "2.t3"}, INDEX) == ["table '2.t3' does not exist"]
+
+
+def test_create_table_must_anchor_on_a_paragraph_outside_a_table():
+    errors = validate_action({"action": "create_table", "loc": "3.t0.r0.c1.p0", "rowCount": 1, "columnCount": 1}, INDEX)
+    assert errors == ["'3.t0.r0.c1.p0' is not a paragraph outside a table to insert the table after"]
+
+
+def test_within_para_find_missing_from_the_paragraph():
+    errors = validate_action({"action": "replace", "loc": "1.p1", "new_text": "x", "withinPara": {"find": "Vendor"}}, INDEX)
+    assert errors == ["'withinPara.find' text 'Vendor' does not appear in the paragraph"]
+
+
+def test_within_para_occurrence_out_of_range():
+    action = {"action": "highlight", "loc": "1.p1", "withinPara": {"find": "Customer", "occurrence": 2}}
+    assert validate_action(action, INDEX) == [
+        "'withinPara.occurrence' 2 is out of range — the text appears 2 time(s) (0-based)"
+    ]
+
+
+def test_replace_requires_new_text():
+    assert validate_action({"action": "replace", "loc": "0.p0"}, INDEX) == ["'replace' requires 'new_text'"]
+
+
+def test_problems_are_labelled_by_action_number():
+    assert validate_actions([{"action": "delete", "loc": "0.p0"}, {"action": "delete", "loc": "p3"}], INDEX) == [
+        "action 1 (delete p3): 'p3' is not a paragraph in the document"
+    ]
+    assert validate_actions({"action": "delete"}, INDEX) == ["'actions' must be a JSON array of action objects"]
@@ -0,0 +1,56 @@
+import asyncio
+from models.admission import AdmissionController, ModelGate
+
+
+def test_queued_requests_are_admitted_round_robin_across_keys():
+    async def run():
+        gate = ModelGate("model", concurrency=1, tpm=0)
+        running = gate.enqueue("blocker", 1)
+        tickets = [gate.enqueue(key, 1) for key in ("a", "a", "a", "b", "b", "c")]
+        assert [gate.position(ticket) for ticket in tickets] == [0, 3, 5, 1, 4, 2]
+
+        order = []
+        for _ in tickets:
+            running.release()
+            running = next(ticket for ticket in tickets if ticket.admitted and ticket not in order)
+            order.append(running)
+        return [tickets.index(ticket) for ticket in order]
+
+    # a1, b1, c1, a2, b2, a3
+    assert asyncio.run(run()) == [0, 3, 5, 1, 4, 2]
+
+
+def test_request_over_the_tpm_budget_waits_then_moves_to_the_downgrade_model():
+    async def run():
+        controller = AdmissionController(
+            limits={"big": {"concurrency": 0, "tpm": 10_000}},
+            default_concurrency=0,
+            default_tpm=0,
+            downgrades={"big": "small"},
+            downgrade_wait=5,
+        )
+        first = controller.enqueue("big", "a", 9_000)
+        second = controller.enqueue("big", "b", 5_000)
+        assert first.admitted and not second.admitted
+        # Admitted once the first request's tokens leave the one-minute window
+        assert 55 < controller.gate("big").estimated_wait(0, second.tokens) <= 60
+
+        moved = controller.maybe_downgrade(second)
+        assert moved is not None and moved.model_id == "small" and moved.admitted
+        assert moved.key == "b" and moved.tokens == 5_000
+        assert controller.gate("big").queued == 0
+        first.release()
+        moved.release()
+
+    asyncio.run(run())
+
+
+def test_no_downgrade_while_the_wait_is_short():
+    async def run():
+        controller = AdmissionController({"big": {"concurrency": 0, "tpm": 10_000}}, 0, 0, {"big": "small"}, 120)
+        controller.enqueue("big", "a", 9_000)
+        second = controller.enqueue("big", "b", 5_000)
+        assert controller.maybe_downgrade(second) is None
+        second.release()
+
+    asyncio.run(run())
@@ -0,0 +1,74 @@
+import hashlib
+from types import SimpleNamespace
+from agent.compaction import STALE_DOCUMENT_STUB, compact_messages
+from api.invoke import _build_user_content
+
+DOCUMENT = "\n".join([
+    "0.p0: Master Services Agreement",
+    "1.p1: The Supplier shall provide the Services described in Schedule 1.",
+    "2.p2: Payment is due within 30 days of invoice.",
+    "3.p3: Either party may terminate this agreement on 90 days' written notice.",
+    "4.p4: This agreement is governed by the laws of England.",
+])
+EDITED = DOCUMENT.replace("30 days", "45 days")
+REWRITTEN = "\n".join(f"{i}.p{i}: Clause {i} has been rewritten." for i in range(5))
+
+
+def conversation(*documents: str) -> list[dict]:
+    """User turns built the way /invoke builds them, one per document, with an assistant reply after each."""
+    agent = SimpleNamespace()
+    messages = []
+    for document in documents:
+        doc_state = {}
+        current_hash = hashlib.sha256(document.encode()).hexdigest()
+        content = _build_user_content(agent, "Review this", document, "", current_hash, doc_state)
+        for name, value in doc_state.items():
+            setattr(agent, name, value)
+        messages += [{"role": "user", "content": content}, {"role": "assistant", "content": [{"text": "Done."}]}]
+    return messages
+
+
+def first_text(message: dict) -> str:
+    return message["content"][0]["text"]
+
+
+def test_fixtures_cover_each_kind_of_user_turn():
+    messages = conversation(DOCUMENT, DOCUMENT, EDITED, REWRITTEN)
+    assert first_text(messages[0]).startswith("<word_document>0.p0: Master Services Agreement\n")
+    assert first_text(messages[2]).startswith("\n<user_input>") and "unchanged" in first_text(messages[2])
+    assert first_text(messages[4]) == (
+        "<word_document_changes>\n"
+        "<changed>\n2.p2: Payment is due within 45 days of invoice.\n</changed>\n"
+        "</word_document_changes>"
+    )
+    assert first_text(messages[6]).startswith("<word_document>0.p0: Clause 0")
+
+
+def test_unchanged_notes_keep_the_snapshot():
+    messages = conversation(DOCUMENT, DOCUMENT, DOCUMENT)
+    assert compact_messages(messages, False, trim_after_turns=0) == []
+    assert first_text(messages[0]) == f"<word_document>{DOCUMENT}</word_document>"
+
+
+def test_deltas_keep_the_snapshot():
+    messages = conversation(DOCUMENT, EDITED, DOCUMENT)
+    delta = first_text(messages[2])
+    assert compact_messages(messages, False, trim_after_turns=0) == []
+    assert first_text(messages[0]) == f"<word_document>{DOCUMENT}</word_document>"
+    assert first_text(messages[2]) == delta
+
+
+def test_new_snapshot_stubs_earlier_copies():
+    messages = conversation(DOCUMENT, EDITED)
+    assert compact_messages(messages, True, trim_after_turns=0) == [0, 2]
+    assert first_text(messages[0]) == STALE_DOCUMENT_STUB
+    assert first_text(messages[2]).startswith("<word_document_changes>[Earlier changes removed")
+
+
+def test_stubbed_snapshot_is_not_live():
+    messages = conversation(DOCUMENT, REWRITTEN, REWRITTEN)
+    assert compact_messages(messages, False, trim_after_turns=0) == [0]
+    assert first_text(messages[0]) == STALE_DOCUMENT_STUB
+    # The stub is not mistaken for the latest snapshot on the next pass
+    assert compact_messages(messages, False, trim_after_turns=0) == []
+    assert first_text(messages[2]) == f"<word_document>{REWRITTEN}</word_document>"
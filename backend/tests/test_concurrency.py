@@ -0,0 +1,124 @@
+import asyncio
+import pytest
+from agent.concurrency import SessionBusyError, SessionLocks
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_queue_policy_admits_waiting_requests_in_order():
+    async def run():
+        locks = SessionLocks("queue")
+        first = await locks.acquire("s1", "r1")
+        waiting = [asyncio.create_task(locks.acquire("s1", f"r{i}")) for i in (2, 3)]
+        await settle()
+        assert not any(task.done() for task in waiting) and not first.cancelled
+
+        first.release()
+        await settle()
+        assert waiting[0].done() and not waiting[1].done()
+        assert locks.holder("s1").request_id == "r2"
+
+        waiting[0].result().release()
+        await settle()
+        assert locks.holder("s1").request_id == "r3"
+        waiting[1].result().release()
+        assert not locks.is_busy("s1") and locks._slots == {}
+
+    asyncio.run(run())
+
+
+def test_reject_policy_fails_while_busy():
+    async def run():
+        locks = SessionLocks("reject")
+        first = await locks.acquire("s1")
+        with pytest.raises(SessionBusyError):
+            await locks.acquire("s1")
+        # Other sessions are unaffected
+        (await locks.acquire("s2")).release()
+
+        first.release()
+        (await locks.acquire("s1")).release()
+        assert locks._slots == {}
+
+    asyncio.run(run())
+
+
+def test_cancel_policy_cancels_the_running_request_and_takes_over():
+    async def run():
+        locks = SessionLocks("cancel")
+        first = await locks.acquire("s1", "r1")
+        second = asyncio.create_task(locks.acquire("s1", "r2"))
+        await settle()
+        assert first.cancelled and first.cancel_reason == "superseded"
+        # The newer request still waits for the running one to wind down
+        assert not second.done()
+
+        first.release()
+        lease = await second
+        assert lease.request_id == "r2" and not lease.cancelled
+        lease.release()
+
+    asyncio.run(run())
+
+
+def test_cancel_request_by_id():
+    async def run():
+        locks = SessionLocks("queue")
+        lease = await locks.acquire("s1", "r1")
+        assert locks.cancel_request("r1", "cancelled by client")
+        assert lease.cancelled and lease.cancel_reason == "cancelled by client"
+        # The first reason is kept
+        lease.cancel("client disconnected")
+        assert lease.cancel_reason == "cancelled by client"
+        lease.release()
+        assert not locks.cancel_request("r1")
+
+    asyncio.run(run())
+
+
+def test_double_release_does_not_free_the_next_holder():
+    async def run():
+        locks = SessionLocks("queue")
+        first = await locks.acquire("s1", "r1")
+        second = asyncio.create_task(locks.acquire("s1", "r2"))
+        third = asyncio.create_task(locks.acquire("s1", "r3"))
+        await settle()
+
+        # /invoke releases in its finally block and again in the response's BackgroundTask
+        first.release()
+        await settle()
+        first.release()
+        await settle()
+        assert locks.holder("s1").request_id == "r2" and not third.done()
+
+        lease = second.result()
+        lease.release()
+        lease.release()
+        await settle()
+        assert locks.holder("s1").request_id == "r3"
+        third.result().release()
+        assert locks._slots == {} and locks._requests == {}
+
+    asyncio.run(run())
+
+
+def test_cancelled_waiter_drops_the_idle_slot():
+    async def run():
+        locks = SessionLocks("queue")
+        first = await locks.acquire("s1")
+        waiter = asyncio.create_task(locks.acquire("s1"))
+        await settle()
+        waiter.cancel()
+        await settle()
+        first.release()
+        assert locks._slots == {}
+
+    asyncio.run(run())
+
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError, match="Unknown session concurrency policy"):
+        SessionLocks("drop")
@@ -0,0 +1,94 @@
+from agent.document import build_document_delta, parse_word_document
+
+PREVIOUS = "\n".join([
+    "0.p0: Master Services Agreement",
+    "1.p1: Payment is due within 30 days of invoice.",
+    "2.t0.r0.c0.p0: Fee",
+    "3.p3: This agreement is governed by the laws of England.",
+])
+
+
+def delta(current: str, full_size: int = 10_000) -> str | None:
+    return build_document_delta(parse_word_document(PREVIOUS), parse_word_document(current), full_size)
+
+
+def test_parse_joins_continuation_lines():
+    assert parse_word_document("0.p0: Title\n1.p1: First line\nsecond line\n2.t0.r1.c2.p0:") == [
+        ("0.p0", "Title"),
+        ("1.p1", "First line\nsecond line"),
+        ("2.t0.r1.c2.p0", ""),
+    ]
+
+
+def test_unchanged_document_is_empty_delta():
+    assert delta(PREVIOUS) == ""
+
+
+def test_changed_paragraph():
+    assert delta(PREVIOUS.replace("30 days", "45 days")) == (
+        "<word_document_changes>\n"
+        "<changed>\n1.p1: Payment is due within 45 days of invoice.\n</changed>\n"
+        "</word_document_changes>"
+    )
+
+
+def test_added_paragraph_remaps_the_ones_after_it():
+    current = "\n".join([
+        "0.p0: Master Services Agreement",
+        "1.p1: Each party shall act in good faith.",
+        "2.p2: Payment is due within 30 days of invoice.",
+        "3.t0.r0.c0.p0: Fee",
+        "4.p4: This agreement is governed by the laws of England.",
+    ])
+    assert delta(current) == (
+        "<word_document_changes>\n"
+        "<remapped>\n1.p1..3.p3 -> 2.p2..4.p4\n</remapped>\n"
+        "<added>\n1.p1: Each party shall act in good faith.\n</added>\n"
+        "</word_document_changes>"
+    )
+
+
+def test_removed_paragraph_remaps_the_ones_after_it():
+    current = "\n".join([
+        "0.p0: Master Services Agreement",
+        "1.t0.r0.c0.p0: Fee",
+        "2.p2: This agreement is governed by the laws of England.",
+    ])
+    assert delta(current) == (
+        "<word_document_changes>\n"
+        "<remapped>\n2.t0.r0.c0.p0..3.p3 -> 1.t0.r0.c0.p0..2.p2\n</remapped>\n"
+        "<removed>\n1.p1\n</removed>\n"
+        "</word_document_changes>"
+    )
+
+
+def test_changed_paragraph_at_new_address_is_also_remapped():
+    # A paragraph turned into a table cell keeps its position but gets a new address
+    current = PREVIOUS.replace("1.p1: Payment is due within 30 days of invoice.", "1.t1.r0.c0.p0: Payment terms")
+    assert delta(current) == (
+        "<word_document_changes>\n"
+        "<remapped>\n1.p1 -> 1.t1.r0.c0.p0\n</remapped>\n"
+        "<changed>\n1.t1.r0.c0.p0: Payment terms\n</changed>\n"
+        "</word_document_changes>"
+    )
+
+
+def test_replaced_run_pairs_changes_by_position():
+    # One paragraph replaced by two: the first is reported as changed, the extra one as added
+    current = PREVIOUS.replace(
+        "1.p1: Payment is due within 30 days of invoice.",
+        "1.p1: Each party shall act in good faith.\n2.p2: Payment is due within 45 days of invoice.",
+    ).replace("2.t0.r0.c0.p0", "3.t0.r0.c0.p0").replace("3.p3", "4.p4")
+    assert delta(current) == (
+        "<word_document_changes>\n"
+        "<remapped>\n2.t0.r0.c0.p0..3.p3 -> 3.t0.r0.c0.p0..4.p4\n</remapped>\n"
+        "<changed>\n1.p1: Each party shall act in good faith.\n</changed>\n"
+        "<added>\n2.p2: Payment is due within 45 days of invoice.\n</added>\n"
+        "</word_document_changes>"
+    )
+
+
+def test_delta_not_smaller_than_full_document_falls_back():
+    current = PREVIOUS.replace("30 days", "45 days")
+    assert delta(current, full_size=len(current)) is not None
+    assert delta(current, full_size=40) is None
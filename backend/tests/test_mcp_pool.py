@@ -0,0 +1,107 @@
+import asyncio
+from types import SimpleNamespace
+from mcp.types import Tool
+from strands import tool
+from strands.tools.mcp.mcp_client import MCPClientInitializationError
+from strands.tools.registry import ToolRegistry
+import agent.mcp_pool as mcp_pool
+from agent.mcp_pool import McpClientPool
+
+
+class Page(list):
+    pagination_token = None
+
+
+class FakeClient:
+    """Stands in for MCPClient: the pool only uses start, stop, list_tools_sync and call_tool_async."""
+
+    def __init__(self, tool_names: list[str]):
+        self.tool_names = tool_names
+        self.connected = False
+        self.stopped = False
+
+    def start(self):
+        self.connected = True
+
+    def stop(self, *exc_info):
+        self.stopped = True
+
+    def list_tools_sync(self, pagination_token=None):
+        if not self.connected:
+            raise RuntimeError("Connection to the MCP server was closed")
+        return Page(SimpleNamespace(mcp_tool=Tool(name=name, inputSchema={"type": "object"})) for name in self.tool_names)
+
+    async def call_tool_async(self, tool_use_id, name, arguments):
+        if not self.connected:
+            raise MCPClientInitializationError("the client session is not running")
+        return {"toolUseId": tool_use_id, "status": "success", "content": [{"text": name}]}
+
+
+def make_pool(monkeypatch, servers: dict[str, list[str]]) -> tuple[McpClientPool, list[FakeClient]]:
+    clients = []
+
+    def create_client(config, startup_timeout):
+        clients.append(FakeClient(config["tools"]))
+        return clients[-1]
+
+    monkeypatch.setattr(mcp_pool, "create_mcp_client", create_client)
+    pool = McpClientPool(lambda: {name: {"tools": tools} for name, tools in servers.items()}, retry_backoff=0)
+    return pool, clients
+
+
+def call(pool_tool) -> dict:
+    async def run():
+        return [event async for event in pool_tool.stream({"toolUseId": "t1", "name": pool_tool.tool_name, "input": {}}, {})]
+
+    return asyncio.run(run())[-1].tool_result
+
+
+def test_failed_ping_marks_the_server_dead_and_the_health_check_restarts_it(monkeypatch):
+    pool, clients = make_pool(monkeypatch, {"docs": ["search"]})
+    pool.start_servers()
+    server = pool._get_servers()["docs"]
+    asyncio.run(pool.check_health())
+    assert len(clients) == 1 and server.is_alive()
+
+    clients[0].connected = False
+    asyncio.run(pool.check_health())
+    assert len(clients) == 2 and clients[0].stopped
+    assert server.is_alive() and server.restarts == 1
+
+
+def test_call_on_a_closed_session_marks_the_server_dead_and_the_next_call_restarts_it(monkeypatch):
+    pool, clients = make_pool(monkeypatch, {"docs": ["search"]})
+    pool.start_servers()
+    [search] = pool.get_tools()
+    clients[0].connected = False
+
+    result = call(search)
+    assert result["status"] == "error" and "disconnected" in result["content"][0]["text"]
+    assert not pool._get_servers()["docs"].is_alive()
+
+    assert call(search)["status"] == "success"
+    assert len(clients) == 2
+
+
+def test_sync_agent_tools_drops_removed_mcp_tools_and_keeps_the_rest(monkeypatch):
+    servers = {"docs": ["search", "fetch"]}
+    pool, _ = make_pool(monkeypatch, servers)
+    pool.start_servers()
+
+    @tool
+    def read_document() -> str:
+        """Read the document."""
+        return ""
+
+    registry = ToolRegistry()
+    registry.process_tools([read_document])
+    agent = SimpleNamespace(tool_registry=registry)
+    pool.sync_agent_tools(agent)
+    assert set(registry.registry) == {"read_document", "search", "fetch"}
+
+    servers["docs"] = ["search"]
+    pool.reload()
+    pool.start_servers()
+    pool.sync_agent_tools(agent)
+    assert set(registry.registry) == {"read_document", "search"}
+    assert registry.registry["search"] is pool.get_tools()[0]
@@ -0,0 +1,36 @@
+import os
+from agent.playbook_index import PlaybookIndex
+
+PLAYBOOK = """# Limitation of liability
+
+## Cap
+Cap liability at 12 months of fees.
+
+## Exclusions
+Exclude indirect and consequential loss.
+"""
+
+
+def test_empty_directory_is_not_rebuilt_on_every_search(tmp_path):
+    index = PlaybookIndex(str(tmp_path))
+    snapshot = index._snapshot
+    assert index.search("liability cap") == []
+    assert index.search("liability cap") == []
+    assert index._snapshot is snapshot
+
+
+def test_index_is_rebuilt_only_when_a_playbook_changes(tmp_path):
+    path = tmp_path / "liability.md"
+    path.write_text(PLAYBOOK, encoding="utf-8")
+    index = PlaybookIndex(str(tmp_path))
+    [(_, section)] = index.search("consequential loss", top_k=1)
+    assert section["heading"] == "Exclusions"
+
+    snapshot = index._snapshot
+    index.search("cap")
+    assert index._snapshot is snapshot
+
+    path.write_text(PLAYBOOK.replace("12 months", "24 months"), encoding="utf-8")
+    os.utime(path, ns=(0, path.stat().st_mtime_ns + 1_000_000))
+    [(_, section)] = index.search("24 months", top_k=1)
+    assert index._snapshot is not snapshot and "24 months" in section["text"]
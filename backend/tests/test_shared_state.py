@@ -0,0 +1,64 @@
+from types import SimpleNamespace
+import pytest
+from agent.document import parse_word_document
+from agent.shared_state import FakeRedis, RedisStateBackend, SQLiteStateBackend, SharedSessionState
+
+DOCUMENT = parse_word_document("0.p0: Master Services Agreement\n1.p1: Payment is due within 30 days of invoice.")
+EDITED = parse_word_document("0.p0: Master Services Agreement\n1.p1: Payment is due within 45 days of invoice.")
+
+
+@pytest.fixture(params=["redis", "sqlite"])
+def shared_state(request, tmp_path) -> SharedSessionState:
+    if request.param == "redis":
+        backend = RedisStateBackend(FakeRedis(), "redliner:")
+    else:
+        backend = SQLiteStateBackend(str(tmp_path / "state.db"))
+    return SharedSessionState(backend, ttl=3600)
+
+
+def agent(paragraphs=None, doc_hash=None) -> SimpleNamespace:
+    """An agent as the turn leaves it: the document it last saw, and no revision before its first publish."""
+    return SimpleNamespace(_last_doc_paragraphs=paragraphs, _last_doc_hash=doc_hash)
+
+
+def test_stale_publish_is_rejected_and_a_fresh_one_accepted(shared_state):
+    winner, loser = agent(DOCUMENT, "h1"), agent(EDITED, "h2")
+    assert shared_state.publish("s1", winner, "model") == 1
+
+    # Both agents started from revision 0; the second to publish lost the race
+    assert shared_state.publish("s1", loser, "model") is None
+    assert loser._state_revision is None
+    state = shared_state.get("s1")
+    assert (state["revision"], state["doc_hash"]) == (1, "h1")
+    # The loser wrote nothing, so the winner's document (same revision) is intact
+    assert shared_state.get_document("s1", state) == DOCUMENT
+    assert shared_state.publish("s1", loser, "model") is None
+
+    # A rebuilt agent starts from the published state and may publish again
+    fresh = agent()
+    shared_state.warm(fresh, state, shared_state.get_document("s1", state))
+    fresh._last_doc_paragraphs, fresh._last_doc_hash = EDITED, "h2"
+    assert shared_state.publish("s1", fresh, "model") == 2
+    state = shared_state.get("s1")
+    assert (state["revision"], state["document_revision"], state["doc_hash"]) == (2, 2, "h2")
+    assert shared_state.get_document("s1", state) == EDITED
+
+
+def test_unchanged_document_is_not_stored_again(shared_state):
+    current = agent(DOCUMENT, "h1")
+    assert shared_state.publish("s1", current, "model") == 1
+    assert shared_state.publish("s1", current, "model") == 2
+    assert shared_state.get("s1")["document_revision"] == 1
+
+    current._last_doc_paragraphs = EDITED
+    assert shared_state.publish("s1", current, "model") == 3
+    # The superseded document is removed once the new state is published
+    assert shared_state.backend.get("document:s1:1") is None
+    assert shared_state.get_document("s1", shared_state.get("s1")) == EDITED
+
+
+def test_sessions_are_independent(shared_state):
+    assert shared_state.publish("s1", agent(DOCUMENT), "model") == 1
+    assert shared_state.publish("s2", agent(DOCUMENT), "model") == 1
+    shared_state.delete("s1")
+    assert shared_state.get("s1") is None and shared_state.get("s2")["revision"] == 1
@@ -0,0 +1,36 @@
+import sqlite3
+import threading
+import time
+from strands.types.session import Session, SessionType
+from agent.sqlite_session_repository import SQLiteSessionRepository
+
+
+def _committed_sessions(db_path: str) -> int:
+    # A second connection only sees committed rows
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+
+def _create(repository: SQLiteSessionRepository, session_id: str) -> None:
+    repository.create_session(Session(session_id=session_id, session_type=SessionType.AGENT))
+
+
+def test_batched_writes_are_committed_by_the_timer(tmp_path):
+    db_path = str(tmp_path / "sessions.sqlite3")
+    repository = SQLiteSessionRepository(db_path, batch_size=100, batch_max_delay=0.05)
+    with repository.batch():
+        _create(repository, "a")
+        assert _committed_sessions(db_path) == 0
+        time.sleep(0.2)
+        # Still inside the batch, with no further write
+        assert _committed_sessions(db_path) == 1
+
+
+def test_open_batch_does_not_defer_other_threads(tmp_path):
+    db_path = str(tmp_path / "sessions.sqlite3")
+    repository = SQLiteSessionRepository(db_path, batch_size=100, batch_max_delay=60)
+    with repository.batch():
+        thread = threading.Thread(target=_create, args=(repository, "b"))
+        thread.start()
+        thread.join()
+        assert _committed_sessions(db_path) == 1
@@ -0,0 +1,45 @@
+import pytest
+from agent.utils import ThinkingTagFilter, remove_thinking_tags
+
+TEXTS = [
+    "Hello world",
+    "Sure. <thinking>let me check the clause</thinking> Done.",
+    "a<thinking>x<thinking>nested</thinking>y</thinking>b",
+    "<thinking>a</thinking>1<thinking>b</thinking>2",
+    "keep <thinking>never closed",
+    "a</thinking>b",
+    "x < y and <think> or <thinkingcap stays <",
+    "ends with <thin",
+]
+
+
+def feed_chunks(chunks: list[str]) -> str:
+    thinking_filter = ThinkingTagFilter()
+    return "".join(thinking_filter.feed(chunk) for chunk in chunks) + thinking_filter.feed("", final=True)
+
+
+@pytest.mark.parametrize("text", TEXTS)
+def test_every_single_split_matches_unsplit(text):
+    expected = remove_thinking_tags(text)
+    for i in range(len(text) + 1):
+        assert feed_chunks([text[:i], text[i:]]) == expected, f"split at {i}"
+
+
+@pytest.mark.parametrize("text", TEXTS)
+def test_every_pair_of_splits_matches_unsplit(text):
+    expected = remove_thinking_tags(text)
+    for i in range(len(text) + 1):
+        for j in range(i, len(text) + 1):
+            assert feed_chunks([text[:i], text[i:j], text[j:]]) == expected, f"splits at {i}, {j}"
+
+
+@pytest.mark.parametrize("text", TEXTS)
+def test_one_character_chunks_match_unsplit(text):
+    assert feed_chunks(list(text)) == remove_thinking_tags(text)
+
+
+def test_unsplit_results():
+    assert remove_thinking_tags(TEXTS[1]) == "Sure.  Done."
+    assert remove_thinking_tags(TEXTS[2]) == "ab"
+    assert remove_thinking_tags(TEXTS[4]) == "keep "
+    assert remove_thinking_tags(TEXTS[6]) == TEXTS[6]
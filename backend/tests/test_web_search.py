@@ -0,0 +1,99 @@
+import asyncio
+import time
+import pytest
+from agent.web_search import FakeSearchBackend, WebSearch
+
+HITS = [{"title": "Indemnity caps", "href": "https://example.com/caps", "body": "Caps are usually 12 months of fees."}]
+
+
+def make_search(backend: FakeSearchBackend, ttl: float = 60, timeout: float = 5, max_entries: int = 8) -> WebSearch:
+    return WebSearch(backend, ttl=ttl, max_entries=max_entries, max_concurrency=4, timeout=timeout)
+
+
+class FailingBackend(FakeSearchBackend):
+    def search(self, query: str, max_results: int) -> list[dict]:
+        self.calls += 1
+        raise RuntimeError("provider down")
+
+
+def test_identical_concurrent_searches_share_one_call():
+    backend = FakeSearchBackend({"indemnity cap": HITS}, delay=0.2)
+    web_search = make_search(backend)
+
+    async def run():
+        return await asyncio.gather(*(web_search.search(query) for query in ("indemnity cap", "Indemnity  CAP", " indemnity cap ")))
+
+    assert asyncio.run(run()) == [HITS, HITS, HITS]
+    assert backend.calls == 1
+    stats = web_search.stats()
+    assert (stats["misses"], stats["joined"], stats["inflight"]) == (1, 2, 0)
+
+
+def test_results_are_cached_until_the_ttl():
+    backend = FakeSearchBackend({"indemnity cap": HITS})
+    web_search = make_search(backend, ttl=0.2)
+
+    async def run():
+        await web_search.search("indemnity cap")
+        await web_search.search("INDEMNITY cap")
+        assert backend.calls == 1 and web_search.hits == 1
+        await asyncio.sleep(0.3)
+        await web_search.search("indemnity cap")
+        assert backend.calls == 2
+
+    asyncio.run(run())
+
+
+def test_cache_is_bounded_least_recently_used_first():
+    backend = FakeSearchBackend()
+    web_search = make_search(backend, max_entries=2)
+
+    async def run():
+        for query in ("a", "b", "a", "c"):
+            await web_search.search(query)
+        await web_search.search("a")
+        assert backend.calls == 3
+        await web_search.search("b")
+        assert backend.calls == 4
+
+    asyncio.run(run())
+
+
+def test_errors_are_raised_and_not_cached():
+    backend = FailingBackend()
+    web_search = make_search(backend)
+
+    async def run():
+        for _ in range(2):
+            with pytest.raises(RuntimeError, match="provider down"):
+                await web_search.search("indemnity cap")
+
+    asyncio.run(run())
+    assert backend.calls == 2 and web_search.errors == 2 and web_search.stats()["entries"] == 0
+
+
+def test_timed_out_search_keeps_running_and_fills_the_cache():
+    backend = FakeSearchBackend({"indemnity cap": HITS}, delay=0.3)
+    web_search = make_search(backend, timeout=0.05)
+
+    async def run():
+        with pytest.raises(TimeoutError):
+            await web_search.search("indemnity cap")
+        await asyncio.sleep(0.4)
+        return await web_search.search("indemnity cap")
+
+    assert asyncio.run(run()) == HITS
+    assert backend.calls == 1 and web_search.timeouts == 1 and web_search.hits == 1
+
+
+def test_searches_run_off_the_event_loop():
+    web_search = make_search(FakeSearchBackend(delay=0.2))
+
+    async def run():
+        started = time.monotonic()
+        task = asyncio.create_task(web_search.search("slow"))
+        await asyncio.sleep(0.01)
+        assert time.monotonic() - started < 0.1
+        await task
+
+    asyncio.run(run())
@@ -0,0 +1,56 @@
+from strands import tool, ToolContext
+from agent.utils import convert_to_placeholders, convert_from_placeholders
+
+MAX_PARAGRAPHS = 200
+MAX_SEARCH_RESULTS = 30
+
+NO_DOCUMENT = "No document is loaded for this session. Ask the user to send their message again."
+
+
+def _format(paragraphs: list[tuple[str, str]]) -> str:
+    return convert_to_placeholders("\n".join(f"{address}: {text}" for address, text in paragraphs))
+
+
+@tool(context=True)
+def read_document(start: str, end: str = "", tool_context: ToolContext = None) -> str:
+    """
+    Read paragraphs of the user's Word document by address, for large documents where only
+    an outline was provided.
+
+    Args:
+        start: First paragraph, as an address ("12.p12", "30.t0.r1.c0.p0") or a docPosition ("12")
+        end: Last paragraph to include (inclusive); omit to read only `start`. At most 200 paragraphs per call.
+
+    Returns:
+        The paragraphs as "{address}: {text}" lines.
+    """
+    index = getattr(tool_context.agent, "_document_index", None)
+    if index is None:
+        return NO_DOCUMENT
+    try:
+        paragraphs = index.read_range(start, end or None, MAX_PARAGRAPHS)
+    except KeyError as e:
+        return f"{e.args[0]}. The document has {len(index)} paragraphs (docPosition 0-{len(index) - 1})."
+    return _format(paragraphs)
+
+
+@tool(context=True)
+def search_document(query: str, max_results: int = 10, tool_context: ToolContext = None) -> str:
+    """
+    Find paragraphs of the user's Word document containing some text, for large documents
+    where only an outline was provided.
+
+    Args:
+        query: Text to look for (case-insensitive), e.g. "limitation of liability" or "30 days"
+        max_results: Maximum number of paragraphs to return (default 10, at most 30)
+
+    Returns:
+        Matching paragraphs as "{address}: {text}" lines.
+    """
+    index = getattr(tool_context.agent, "_document_index", None)
+    if index is None:
+        return NO_DOCUMENT
+    hits = index.search(convert_from_placeholders(query), max(1, min(max_results, MAX_SEARCH_RESULTS)))
+    if not hits:
+        return f"No paragraphs contain '{query}'."
+    return _format(hits)
@@ -1,10 +1,24 @@
-from ddgs import DDGS
 from strands import tool
+from agent.web_search import web_search
 
 import json
 
 
 @tool
-def fetch(search_string: str) -> str:
-    results = DDGS().text(search_string, max_results=5)
-    return json.dumps(results)
\ No newline at end of file
+async def fetch(search_string: str) -> str:
+    """
+    Search the web and return the top results.
+
+    Args:
+        search_string: What to search for, e.g. "market standard indemnity cap SaaS"
+
+    Returns:
+        JSON list of results, each with a title, link (href) and snippet (body).
+    """
+    try:
+        results = await web_search.search(search_string, max_results=5)
+    except TimeoutError:
+        return f"Web search timed out after {web_search.timeout:g}s. Continue without web results or try a shorter query."
+    except Exception as e:
+        return f"Web search failed: {e}"
+    return json.dumps(results)
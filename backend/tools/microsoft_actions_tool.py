@@ -1,13 +1,36 @@
+import json
 import logging
-from strands import tool
+from strands import tool, ToolContext
+from agent.action_validation import validate_actions
 
 logger = logging.getLogger(__name__)
 
 
-@tool
-def microsoft_actions_tool(actions: str) -> str:
+@tool(context=True)
+def microsoft_actions_tool(actions: str, tool_context: ToolContext = None) -> str | dict:
     """
     For drafting new content or modifying existing content in word documents
     """
     logger.info("microsoft_actions_tool called")
+
+    # Check the actions against the document the model was given, so mistakes are fixed in this turn
+    index = getattr(tool_context.agent, "_document_index", None) if tool_context else None
+    if index is not None:
+        try:
+            parsed = json.loads(actions) if isinstance(actions, str) else actions
+        except json.JSONDecodeError as e:
+            errors = [f"'actions' is not valid JSON: {e}"]
+        else:
+            errors = validate_actions(parsed, index)
+        if errors:
+            logger.info("microsoft_actions_tool rejected %d problem(s)", len(errors))
+            problems = "\n".join(f"- {error}" for error in errors)
+            return {
+                "status": "error",
+                "content": [{
+                    "text": "The actions were NOT submitted to the user. Fix these problems and call "
+                            "microsoft_actions_tool again with the complete corrected list:\n" + problems
+                }],
+            }
+
     return "Action submitted successfully. It is for the user to decide whether to accept or decline your proposed change. DO NOT RESPOND FURTHER."
@@ -0,0 +1,24 @@
+from strands import tool
+from agent.playbook_index import playbook_index
+
+
+@tool
+def search_playbooks(query: str, top_k: int = 3) -> str:
+    """
+    Search the legal playbooks and return only the most relevant clauses.
+
+    Args:
+        query: What to look for, e.g. "confidentiality survival period" or "termination for convenience notice"
+        top_k: Number of playbook sections to return (default 3)
+
+    Returns:
+        The best-matching playbook sections, each labelled with its playbook and heading.
+    """
+    results = playbook_index.search(query, top_k=max(1, min(top_k, 10)))
+    if not results:
+        return "No relevant playbook sections found."
+
+    return "\n\n".join(
+        f"[{section['title']} — {section['heading']}] ({section['file']})\n{section['text']}"
+        for _, section in results
+    )
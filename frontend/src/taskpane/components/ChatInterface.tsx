@@ -65,9 +65,20 @@ const ChatInterface: React.FC<ChatInterfaceProps> = ({ selectedModel, sessionId,
   const [pendingActions, setPendingActions] = React.useState<Action[]>([]);
   const [documentHashWhenSent, setDocumentHashWhenSent] = React.useState<string | null>(null);
   const [errorMessage, setErrorMessage] = React.useState<string | null>(null);
+  // Shown while the request waits for a model slot
+  const [queueStatus, setQueueStatus] = React.useState<string | null>(null);
   const prevModelRef = React.useRef(selectedModel);
 
-  const { sendMessage, fetchMessages } = useChatAPI();
+  const { sendMessage, cancelMessage, fetchMessages } = useChatAPI();
+
+  // Cancel the running response when switching session, unmounting or closing the task pane
+  React.useEffect(() => {
+    window.addEventListener("pagehide", cancelMessage);
+    return () => {
+      window.removeEventListener("pagehide", cancelMessage);
+      cancelMessage();
+    };
+  }, [sessionId, cancelMessage]);
 
   // Model changed — start a fresh session
   React.useEffect(() => {
@@ -109,6 +120,16 @@ const ChatInterface: React.FC<ChatInterfaceProps> = ({ selectedModel, sessionId,
   const handleChatResponse = (data: Record<string, unknown>) => {
     const type = data.type as string;
 
+    if (type === "queue") {
+      const wait = Math.ceil(data.estimated_wait as number);
+      setQueueStatus(`Waiting for ${data.model} — position ${(data.position as number) + 1}${wait > 0 ? `, about ${wait}s` : ""}`);
+      return;
+    } else if (type === "model_downgraded") {
+      setQueueStatus(`${data.from} is busy — switching to ${data.to}`);
+      return;
+    }
+    setQueueStatus(null);
+
     if (type === "content") {
       setMessages((prev) => {
         const lastMessage = prev[prev.length - 1];
@@ -131,6 +152,14 @@ const ChatInterface: React.FC<ChatInterfaceProps> = ({ selectedModel, sessionId,
         ...prev,
         { role: "tool_indicator", tool_name: data.tool_name as string, tool_input: data.input as Record<string, any> },
       ]);
+    } else if (type === "microsoft_action") {
+      // Streamed as soon as each action is generated; microsoft_actions below replaces the list
+      const index = data.index as number;
+      setPendingActions((prev) => {
+        const next = index === 0 ? [] : [...prev];
+        next[index] = data.action as Action;
+        return next;
+      });
     } else if (type === "microsoft_actions") {
       setPendingActions((data.actions as Action[]) || []);
     } else if (type === "end_turn") {
@@ -203,8 +232,12 @@ const ChatInterface: React.FC<ChatInterfaceProps> = ({ selectedModel, sessionId,
         },
         handleChatResponse
       );
+      // A cancelled stream ends without end_turn
+      setLoading(false);
+      setQueueStatus(null);
     } catch (err: unknown) {
       setLoading(false);
+      setQueueStatus(null);
       const message = err instanceof Error ? err.message : "Unknown error";
       setMessages((prev) => [
         ...prev,
@@ -235,6 +268,10 @@ const ChatInterface: React.FC<ChatInterfaceProps> = ({ selectedModel, sessionId,
         </div>
       )}
 
+      {queueStatus && (
+        <div className="text-xs text-muted-foreground">{queueStatus}</div>
+      )}
+
       <ChatMessageList
         messages={messages}
         loading={loading}
@@ -20,6 +20,7 @@ export type ModelId = string;
 export const DEFAULT_MODEL_ID = "anthropic/claude-haiku-4-5";
 const STORAGE_KEY = "redliner:model";
 const AUTO_APPROVE_KEY = "redliner:autoApproveTools";
+const USER_ID_KEY = "redliner:userId";
 
 export function getStoredModel(): ModelId {
   const stored = localStorage.getItem(STORAGE_KEY);
@@ -39,6 +40,16 @@ export function setAutoApproveTools(value: boolean) {
   localStorage.setItem(AUTO_APPROVE_KEY, String(value));
 }
 
+// Stable per-install id, so the backend queues this user's sessions fairly as one
+export function getUserId(): string {
+  let id = localStorage.getItem(USER_ID_KEY);
+  if (!id) {
+    id = crypto.randomUUID();
+    localStorage.setItem(USER_ID_KEY, id);
+  }
+  return id;
+}
+
 interface McpServer {
   name: string;
   command: string;
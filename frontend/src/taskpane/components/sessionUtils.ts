@@ -38,7 +38,9 @@ export function mapMessages(messages: PersistedMessage[]): RenderedMessage[] {
 
     if (role === "user") {
       // Skip toolResult messages (they have toolResult in content, not text)
-      const textBlock = content.find((block): block is { text: string } => "text" in block && typeof block.text === "string");
+      const textBlocks = content.filter((block): block is { text: string } => "text" in block && typeof block.text === "string");
+      // The document may sit in its own block ahead of the one holding <user_input>
+      const textBlock = textBlocks.find((block) => block.text.includes("<user_input>")) || textBlocks[0];
       if (!textBlock) continue;
       result.push({ type: "user", text: extractUserInput(textBlock.text) });
     } else if (role === "assistant") {
@@ -1,5 +1,5 @@
-import { useState, useCallback } from "react";
-import { getAutoApproveTools } from "./Settings";
+import { useState, useCallback, useRef } from "react";
+import { getAutoApproveTools, getUserId } from "./Settings";
 
 interface MessagePayload {
   prompt: string;
@@ -11,6 +11,15 @@ interface MessagePayload {
 
 type OnResponseCallback = (event: Record<string, unknown>) => void;
 
+// Large microsoft_actions payloads may arrive gzipped + base64-encoded when we advertise support
+const SUPPORTS_GZIP_EVENTS = typeof DecompressionStream !== "undefined";
+
+const decodeGzipEvent = async (data: string): Promise<Record<string, unknown>> => {
+  const bytes = Uint8Array.from(atob(data), (c) => c.charCodeAt(0));
+  const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream("gzip"));
+  return JSON.parse(await new Response(stream).text());
+};
+
 export interface SessionSummary {
   session_id: string;
   created_at: string;
@@ -31,9 +40,13 @@ export interface PersistedMessage {
 
 export const useChatAPI = () => {
   const [error, setError] = useState<string | null>(null);
+  // Id of the /invoke stream in flight, so it can be cancelled server-side
+  const activeRequestRef = useRef<string | null>(null);
 
   const sendMessage = async (sessionId: string, payload: MessagePayload, onResponse: OnResponseCallback) => {
     setError(null);
+    const requestId = crypto.randomUUID();
+    activeRequestRef.current = requestId;
 
     try {
       const response = await fetch("https://localhost:8000/invoke", {
@@ -41,7 +54,10 @@ export const useChatAPI = () => {
         headers: {
           "Content-Type": "application/json",
           "x-session-id": sessionId,
+          "x-user-id": getUserId(),
+          "x-request-id": requestId,
           "x-auto-approve-tools": String(getAutoApproveTools()),
+          ...(SUPPORTS_GZIP_EVENTS ? { "x-sse-encoding": "gzip" } : {}),
         },
         body: JSON.stringify(payload),
       });
@@ -68,7 +84,10 @@ export const useChatAPI = () => {
           if (line.startsWith("data: ")) {
             const eventData = line.slice(6);
             try {
-              const event = JSON.parse(eventData);
+              let event = JSON.parse(eventData);
+              if (event.encoding === "gzip") {
+                event = await decodeGzipEvent(event.data);
+              }
               console.log("Received SSE event:", event);
               onResponse(event);
             } catch (parseError) {
@@ -84,9 +103,21 @@ export const useChatAPI = () => {
       console.error("sendMessage error:", err);
       setError(message);
       throw err;
+    } finally {
+      if (activeRequestRef.current === requestId) {
+        activeRequestRef.current = null;
+      }
     }
   };
 
+  // Stop the in-flight response (if any) so the backend stops generating and running tools
+  const cancelMessage = useCallback(() => {
+    const requestId = activeRequestRef.current;
+    if (!requestId) return;
+    activeRequestRef.current = null;
+    fetch(`https://localhost:8000/invoke/${requestId}/cancel`, { method: "POST", keepalive: true }).catch(() => {});
+  }, []);
+
   const fetchSessions = useCallback(async (): Promise<SessionSummary[]> => {
     const response = await fetch("https://localhost:8000/sessions");
     if (!response.ok) throw new Error(`Failed to fetch sessions: ${response.status}`);
@@ -95,7 +126,7 @@ export const useChatAPI = () => {
   }, []);
 
   const fetchMessages = useCallback(async (id: string): Promise<PersistedMessage[]> => {
-    const response = await fetch(`https://localhost:8000/sessions/${id}/messages`);
+    const response = await fetch(`https://localhost:8000/sessions/${id}/messages?documents=drop`);
     if (!response.ok) throw new Error(`Failed to fetch messages: ${response.status}`);
     const data = await response.json();
     return data.messages as PersistedMessage[];
@@ -108,5 +139,5 @@ export const useChatAPI = () => {
     if (!response.ok) throw new Error(`Failed to delete session: ${response.status}`);
   }, []);
 
-  return { sendMessage, error, fetchSessions, fetchMessages, deleteSession };
+  return { sendMessage, cancelMessage, error, fetchSessions, fetchMessages, deleteSession };
 };